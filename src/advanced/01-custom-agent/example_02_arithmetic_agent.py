@@ -14,7 +14,6 @@ The conversation continues until a maximum of 10 messages have been exchanged,
 and the output is streamed to the console.
 """
 import asyncio
-import os
 from typing import Callable, Sequence, List
 
 from autogen_agentchat.agents import BaseChatAgent
@@ -24,11 +23,10 @@ from autogen_agentchat.messages import BaseChatMessage, TextMessage
 from autogen_agentchat.teams import SelectorGroupChat
 from autogen_agentchat.ui import Console
 from autogen_core import CancellationToken
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
+from autogen_exploration.clients import get_model_client
+
 load_dotenv()
 
 
@@ -100,18 +98,7 @@ async def run_number_agents() -> None:
     # The termination condition is to stop after 10 messages.
     termination_condition = MaxMessageTermination(10)
 
-    token_provider = AzureTokenProvider(
-        DefaultAzureCredential(),
-        "https://cognitiveservices.azure.com/.default",
-    )
-
-    model_client = AzureOpenAIChatCompletionClient(
-        azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-        model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-        api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-        azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-        azure_ad_token_provider=token_provider
-    )
+    model_client = get_model_client()
 
     # Create a selector group chat.
     selector_group_chat = SelectorGroupChat(
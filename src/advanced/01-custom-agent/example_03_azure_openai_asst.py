@@ -8,7 +8,6 @@ Make sure to set the following environment variables before running the script:
 - AZURE_OPENAI_API_VERSION: The API version to use (e.g., 2023-05-15)
 """
 import asyncio
-import os
 from typing import Sequence, AsyncGenerator
 
 from autogen_agentchat.agents import BaseChatAgent
@@ -18,11 +17,10 @@ from autogen_agentchat.ui import Console
 from autogen_core import CancellationToken
 from autogen_core.model_context import UnboundedChatCompletionContext
 from autogen_core.models import AssistantMessage, UserMessage, SystemMessage
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
+from autogen_exploration.clients import get_model_client
+
 load_dotenv()
 
 
@@ -44,17 +42,8 @@ class AzureOpenAIAssistantAgent(BaseChatAgent):
         self._model_context = UnboundedChatCompletionContext()
         self._system_message = system_message
 
-        token_provider = AzureTokenProvider(
-            DefaultAzureCredential(),
-            "https://cognitiveservices.azure.com/.default",
-        )
-        self._model_client = AzureOpenAIChatCompletionClient(
-            azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-            model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-            api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-            azure_ad_token_provider=token_provider,
-            temperature=0.3)
+        # Every agent instance shares the same process-wide client and connection pool.
+        self._model_client = get_model_client(temperature=0.3)
 
     @property
     def produced_message_types(self) -> Sequence[type[BaseChatMessage]]:
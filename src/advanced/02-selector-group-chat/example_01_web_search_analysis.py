@@ -2,35 +2,24 @@
 An example of using a SelectorGroupChat with multiple agents to perform a complex task.
 """
 import asyncio
-import os
 
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
 from autogen_agentchat.teams import SelectorGroupChat
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-load_dotenv()
+from autogen_exploration.clients import get_model_client
+from autogen_exploration.tools import annotate_tool_events, cached_tool, tool_cache_report
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+load_dotenv()
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider
-)
+# Get the shared model client
+model_client = get_model_client()
 
 
 # Note: This example uses mock tools instead of real APIs for demonstration purposes
+@cached_tool(ttl=600, negative=["No data found."])
 def search_web_tool(query: str) -> str:
     """
     A mock web search tool that returns predefined results based on the query.
@@ -149,7 +138,8 @@ async def main():
             "rebounds between the 2007-2008 and 2008-2009 seasons?")
 
     # Use asyncio.run(...) if you are running this in a script.
-    await Console(team.run_stream(task=task))
+    await Console(annotate_tool_events(team.run_stream(task=task)))
+    print(tool_cache_report())
 
     await model_client.close()
 
@@ -8,7 +8,6 @@ function ensures that the planning agent is always the first to respond to a new
 and it selects the appropriate agents based on the planning agent's output.
 """
 import asyncio
-import os
 from typing import Sequence, List
 
 from autogen_agentchat.agents import AssistantAgent
@@ -16,29 +15,19 @@ from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermi
 from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage
 from autogen_agentchat.teams import SelectorGroupChat
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-load_dotenv()
+from autogen_exploration.clients import get_model_client
+from autogen_exploration.tools import cached_tool
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+load_dotenv()
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider
-)
+# Get the shared model client
+model_client = get_model_client()
 
 
 # Note: This example uses mock tools instead of real APIs for demonstration purposes
+@cached_tool(ttl=600, negative=["No data found."])
 def search_web_tool(query: str) -> str:
     """
     A mock web search tool that returns predefined results based on the query.
@@ -2,35 +2,30 @@
 An example of using a reasoning LLM to select agents in a group chat.
 """
 import asyncio
-import os
 
 from autogen_agentchat.agents import AssistantAgent, UserProxyAgent
 from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
 from autogen_agentchat.teams import SelectorGroupChat
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-load_dotenv()
+from autogen_exploration.clients import AzureOpenAISettings, get_model_client
+from autogen_exploration.tools import cached_tool
 
+load_dotenv()
 
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.getenv("AZURE_OPENAI_API_DEPLOYMENT_O_4_MINI"),
-    model=os.getenv("AZURE_OPENAI_API_DEPLOYMENT_O_4_MINI"),
-    api_version=os.getenv("AZURE_OPENAI_API_VERSION_O_4_MINI"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME_O_4_MINI"),
-    azure_ad_token_provider=token_provider
+# Get the shared model client for the o4-mini reasoning deployment
+model_client = get_model_client(
+    AzureOpenAISettings.from_env(
+        deployment_var="AZURE_OPENAI_API_DEPLOYMENT_O_4_MINI",
+        version_var="AZURE_OPENAI_API_VERSION_O_4_MINI",
+        endpoint_var="AZURE_OPENAI_API_INSTANCE_NAME_O_4_MINI",
+    )
 )
 
-
 # Note: This example uses mock tools instead of real APIs for demonstration purposes
+@cached_tool(ttl=600, negative=["No data found."])
 def search_web_tool(query: str) -> str:
     """
     A mock web search tool that returns predefined results based on the query.
@@ -3,33 +3,20 @@ An example of a swarm of agents working together to provide
 customer support for travel booking and refunding.
 """
 import asyncio
-import os
 
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.conditions import HandoffTermination, TextMentionTermination
 from autogen_agentchat.messages import HandoffMessage
 from autogen_agentchat.teams import Swarm
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-load_dotenv()
+from autogen_exploration.clients import get_model_client
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+load_dotenv()
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider
-)
+# Get the shared model client
+model_client = get_model_client()
 
 
 def refund_flight(flight_id: str) -> str:
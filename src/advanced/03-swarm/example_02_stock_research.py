@@ -2,33 +2,21 @@
 Example of a team of agents conducting market research for a stock.
 """
 import asyncio
-import os
 from typing import Dict, Any, List
 
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.conditions import TextMentionTermination
 from autogen_agentchat.teams import Swarm
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-load_dotenv()
+from autogen_exploration.clients import get_model_client
+from autogen_exploration.tools import cached_tool
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+load_dotenv()
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider
-)
+# Get the shared model client
+model_client = get_model_client()
 
 
 async def get_stock_data(symbol: str) -> Dict[str, Any]:
@@ -36,6 +24,7 @@ async def get_stock_data(symbol: str) -> Dict[str, Any]:
     return {"price": 180.25, "volume": 1000000, "pe_ratio": 65.4, "market_cap": "700B"}
 
 
+@cached_tool(ttl=900)
 async def get_news(query: str) -> List[Dict[str, str]]:
     """Get recent news articles about a company"""
     return [
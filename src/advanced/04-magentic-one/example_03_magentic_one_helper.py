@@ -3,31 +3,18 @@ Example of using MagenticOne with a helper agent (MultimodalWebSurfer) and
 an approval function for code execution.
 """
 import asyncio
-import os
 
 from autogen_agentchat.agents import ApprovalRequest, ApprovalResponse
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 from autogen_ext.teams.magentic_one import MagenticOne
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
+from autogen_exploration.clients import get_model_client
+
 load_dotenv()
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
-
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider
-)
+# Get the shared model client
+model_client = get_model_client()
 
 
 def approval_func(request: ApprovalRequest) -> ApprovalResponse:
@@ -0,0 +1,7 @@
+"""
+Shared building blocks for the AutoGen exploration examples.
+
+The example scripts under ``src/`` import from this package instead of wiring up
+their own Azure OpenAI clients, so that every script benefits from the same
+connection pool, credentials and runtime helpers.
+"""
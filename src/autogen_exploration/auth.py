@@ -0,0 +1,154 @@
+"""
+A caching Azure AD token provider that refreshes tokens in the background.
+
+``AzureTokenProvider`` asks the credential for a token on the calling thread, so
+the slow ``DefaultAzureCredential`` chain probe on cold start, and every later
+refresh, lands in the middle of a model call and blocks the event loop.
+:class:`CachingTokenProvider` fetches the token once, shares it with every model
+client in the process, and refreshes it on a background thread ahead of expiry,
+so a ``create()`` call only ever waits for the very first token.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from autogen_ext.auth.azure import AzureTokenProvider
+from azure.core.credentials import AccessToken, TokenCredential
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_MARGIN = 300.0
+DEFAULT_RETRY_INTERVAL = 30.0
+
+
+class CachingTokenProvider(AzureTokenProvider):
+    """
+    A drop-in replacement for ``AzureTokenProvider`` that caches the bearer token.
+
+    The first token is fetched in the background as soon as :meth:`start` is called
+    (or on the first call otherwise). A timer then refreshes the token
+    ``refresh_margin`` seconds before it expires, or halfway through the life of a
+    token that lives less than that, but not sooner than ``retry_interval`` seconds
+    unless the token expires first. Callers keep receiving the cached token while a
+    refresh runs, and failed refreshes are retried every ``retry_interval`` seconds
+    until the cached token actually expires.
+
+    Calling the provider blocks the calling thread until there is a valid token. The
+    OpenAI client calls it on the event loop, so a call made before the first token
+    arrives blocks the loop for the rest of the credential chain probe; ``await``
+    :meth:`ready` first to wait for it without blocking.
+
+    :param credential: The Azure credential to get tokens from.
+    :param scopes: The scopes to request.
+    :param refresh_margin: Seconds before expiry at which the token is refreshed.
+    :param retry_interval: Seconds to wait before retrying a failed refresh.
+    """
+
+    def __init__(self, credential: TokenCredential, *scopes: str,
+                 refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+                 retry_interval: float = DEFAULT_RETRY_INTERVAL) -> None:
+        super().__init__(credential, *scopes)
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.probe_seconds: Optional[float] = None
+        self.refreshes = 0
+        self._token: Optional[AccessToken] = None
+        self._lock = threading.Lock()
+        self._fetched = threading.Condition(self._lock)
+        self._fetching = False
+        self._timer: Optional[threading.Timer] = None
+
+    def start(self) -> "CachingTokenProvider":
+        """Start fetching the first token in the background, returning immediately."""
+        with self._lock:
+            if self._token is None and not self._fetching:
+                self._fetching = True
+                threading.Thread(target=self._refresh, name="token-prefetch", daemon=True).start()
+        return self
+
+    async def ready(self) -> "CachingTokenProvider":
+        """Wait for a valid token on a worker thread, so that calls stop blocking the event loop."""
+        self.start()
+        await asyncio.to_thread(self)
+        return self
+
+    def __call__(self) -> str:
+        with self._lock:
+            while not self._is_valid(self._token):
+                if not self._fetching:
+                    # Nothing usable and no refresh running: fetch on this thread.
+                    self._fetching = True
+                    self._lock.release()
+                    try:
+                        self._refresh(raise_errors=True)
+                    finally:
+                        self._lock.acquire()
+                else:
+                    self._fetched.wait()
+            return self._token.token
+
+    def close(self) -> None:
+        """Cancel the scheduled background refresh."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _is_valid(self, token: Optional[AccessToken]) -> bool:
+        return token is not None and token.expires_on > time.time()
+
+    def _refresh(self, raise_errors: bool = False) -> None:
+        start = time.perf_counter()
+        try:
+            token = self.credential.get_token(*self.scopes)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.warning("Token refresh failed, retrying in %.0fs", self.retry_interval,
+                           exc_info=True)
+            with self._lock:
+                self._fetching = False
+                self._fetched.notify_all()
+                if self._is_valid(self._token):
+                    self._schedule(self.retry_interval)
+            if raise_errors:
+                raise
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if self.probe_seconds is None:
+                self.probe_seconds = elapsed
+                source = getattr(self.credential, "_successful_credential", None)
+                logger.info("Credential chain probe took %.3fs%s", elapsed,
+                            f" ({type(source).__name__})" if source is not None else "")
+            else:
+                self.refreshes += 1
+            self._token = token
+            self._fetching = False
+            self._fetched.notify_all()
+            self._schedule(self._refresh_delay(token))
+
+    def _refresh_delay(self, token: AccessToken) -> float:
+        """Return the seconds until a token should be refreshed."""
+        lifetime = token.expires_on - time.time()
+        # A token that lives less than the margin would be refreshed at once, again and
+        # again; refresh it halfway through its life instead, and never in a tight loop.
+        # A refresh after expiry would block callers, so it always comes at least a tenth of
+        # the lifetime, or the margin if that is shorter, before it.
+        delay = max(lifetime - self.refresh_margin, lifetime / 2, self.retry_interval)
+        return max(min(delay, lifetime - min(self.refresh_margin, lifetime / 10)), 0.0)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None:
+        with self._lock:
+            if self._fetching:
+                return
+            self._fetching = True
+        self._refresh()
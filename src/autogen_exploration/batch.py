@@ -0,0 +1,310 @@
+"""
+High-throughput batch classification with packed structured output requests.
+
+The sentiment agent of example_07_structured_output.py classifies one text per
+run, and pays for a system prompt, a request and a response envelope each time.
+:class:`BatchClassifier` packs many inputs into one structured output request,
+whose schema is a list of the per-item response model with the index of each
+input, and calls the model client directly:
+
+- inputs are read lazily from a file, one per line, so millions of lines never
+  sit in memory;
+- at most ``max_concurrency`` packs are in flight at a time;
+- every result is appended to a JSON lines output file as soon as its pack is
+  done, and a restarted run skips the lines already in that file;
+- a pack whose answer is bad (invalid JSON, missing or unknown indices) is split
+  in halves that are retried on their own, down to single inputs, so one bad
+  input costs a few small requests instead of its whole pack. Request errors
+  such as rate limits, timeouts or dropped connections are not split: they end
+  the run, and a restarted run retries the inputs they left unanswered;
+- inputs that failed on their own are recorded with an ``error`` and classified
+  again by the next run, which appends a new record for the same line: the last
+  record of a line wins, and :func:`read_results` reads the file that way;
+- :attr:`BatchClassifier.stats` reports items per second and tokens per item.
+
+Usage:
+    uv run python -m autogen_exploration.batch lines.txt results.jsonl --pack-size 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import (Any, AsyncIterator, Dict, Iterable, Iterator, List, Literal, Optional, Set,
+                    Tuple, Type)
+
+from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError, create_model
+
+DEFAULT_PACK_SIZE = 20
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_SYSTEM_MESSAGE = (
+    "Categorize each numbered input as happy, sad, or neutral following the JSON format. "
+    "Return exactly one result per input, with the input's index."
+)
+
+Item = Tuple[int, str]
+
+
+class SentimentResponse(BaseModel):
+    """The response format of the structured output example, for one input."""
+    thoughts: str
+    response: Literal["happy", "sad", "neutral"]
+
+
+class PackError(Exception):
+    """An answer to a pack that does not hold one valid result per input."""
+
+
+@dataclass
+class BatchStats:
+    """Throughput and token counters of a :class:`BatchClassifier` run."""
+
+    items: int = 0
+    skipped: int = 0
+    failed: int = 0
+    requests: int = 0
+    splits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    seconds: float = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        """Items classified per second of the run."""
+        return self.items / self.seconds if self.seconds else 0.0
+
+    @property
+    def tokens_per_item(self) -> float:
+        """Prompt and completion tokens spent per classified item, retries included."""
+        tokens = self.prompt_tokens + self.completion_tokens
+        return tokens / self.items if self.items else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters and rates as a flat dictionary."""
+        return {
+            "items": self.items,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "requests": self.requests,
+            "splits": self.splits,
+            "items_per_s": round(self.items_per_second, 1),
+            "tokens_per_item": round(self.tokens_per_item, 1),
+        }
+
+
+def read_inputs(path: str) -> Iterator[Item]:
+    """
+    Yield the non-empty lines of a text file with their 1-based line numbers.
+
+    Args:
+        path (str): The input file, one text per line.
+
+    Yields:
+        Item: The line number and text of every non-empty line.
+    """
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            text = line.strip()
+            if text:
+                yield number, text
+
+
+def read_results(path: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Read an output file, keeping the last record of every line.
+
+    An input that failed has an ``error`` record, followed by its result once a
+    later run classified it.
+
+    Args:
+        path (str): The JSON lines output file of :meth:`BatchClassifier.run`.
+
+    Returns:
+        Dict[int, Dict[str, Any]]: The latest record of every input, by line number, or
+        none if the file is missing.
+    """
+    results: Dict[int, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+                results[record["line"]] = record
+            except (ValueError, KeyError, TypeError):
+                continue  # A line cut short by an interrupted run.
+    return results
+
+
+def read_checkpoint(path: str) -> Set[int]:
+    """Return the line numbers already answered in an output file, or none if it is missing."""
+    return {line for line, record in read_results(path).items() if "error" not in record}
+
+
+class BatchClassifier:
+    """
+    Classifies many inputs with one structured output request per pack of inputs.
+
+    :param model_client: The model client; use ``get_model_client(priority="batch")``
+        so that interactive requests go first when requests are scheduled.
+    :param item_model: The response model of one input.
+    :param pack_size: Inputs per request.
+    :param max_concurrency: Requests in flight at the same time.
+    :param system_message: The instructions, which must ask for one result per index.
+    """
+
+    def __init__(self, model_client: ChatCompletionClient,
+                 item_model: Type[BaseModel] = SentimentResponse,
+                 pack_size: int = DEFAULT_PACK_SIZE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 system_message: str = DEFAULT_SYSTEM_MESSAGE) -> None:
+        self.model_client = model_client
+        self.item_model = item_model
+        self.pack_size = pack_size
+        self.max_concurrency = max_concurrency
+        self.system_message = SystemMessage(content=system_message)
+        self.stats = BatchStats()
+        indexed = create_model(f"Indexed{item_model.__name__}", __base__=item_model, index=(int, ...))
+        self.pack_model: Type[BaseModel] = create_model(
+            f"{item_model.__name__}Pack", results=(List[indexed], ...))  # type: ignore[valid-type]
+
+    async def classify(self, items: List[Item]) -> Dict[int, BaseModel]:
+        """
+        Classify one pack of inputs with a single request.
+
+        Args:
+            items (List[Item]): Line numbers and texts.
+
+        Returns:
+            Dict[int, BaseModel]: The response of every input, by line number.
+
+        Raises:
+            PackError: If the answer does not hold exactly one valid result per input.
+        """
+        prompt = "\n".join(f"[{index}] {text}" for index, (_, text) in enumerate(items))
+        self.stats.requests += 1
+        result = await self.model_client.create(
+            [self.system_message, UserMessage(content=prompt, source="user")],
+            json_output=self.pack_model)
+        self.stats.prompt_tokens += result.usage.prompt_tokens
+        self.stats.completion_tokens += result.usage.completion_tokens
+        try:
+            pack = self.pack_model.model_validate_json(result.content)
+        except ValidationError as error:
+            raise PackError(f"invalid answer: {error.error_count()} validation errors") from error
+        responses: Dict[int, BaseModel] = {}
+        for entry in pack.results:  # type: ignore[attr-defined]
+            if not 0 <= entry.index < len(items) or entry.index in responses:
+                raise PackError(f"unexpected index {entry.index}")
+            responses[entry.index] = self.item_model.model_validate(
+                entry.model_dump(exclude={"index"}))
+        if len(responses) != len(items):
+            raise PackError(f"{len(items) - len(responses)} of {len(items)} results missing")
+        return {items[index][0]: response for index, response in responses.items()}
+
+    async def _classify_or_split(self, items: List[Item]
+                                 ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        try:
+            responses = await self.classify(items)
+        except (PackError, ValidationError) as error:
+            if len(items) == 1:
+                self.stats.failed += 1
+                yield items[0][0], {"error": f"{type(error).__name__}: {error}"}
+                return
+            self.stats.splits += 1
+            middle = len(items) // 2
+            for half in (items[:middle], items[middle:]):
+                async for record in self._classify_or_split(half):
+                    yield record
+            return
+        for line, response in responses.items():
+            yield line, response.model_dump()
+
+    async def run(self, inputs: Iterable[Item], output: str) -> BatchStats:
+        """
+        Classify inputs and append one JSON line per input to the output file.
+
+        Lines already in the output file are skipped, so an interrupted run resumes
+        where it stopped. A request error cancels the other requests and is raised
+        once they stopped, before the output file is closed.
+
+        Args:
+            inputs (Iterable[Item]): Line numbers and texts, such as :func:`read_inputs` yields.
+            output (str): The JSON lines file to append the results to.
+
+        Returns:
+            BatchStats: The statistics of this run.
+        """
+        done = read_checkpoint(output)
+        packs: asyncio.Queue[Optional[List[Item]]] = asyncio.Queue(self.max_concurrency)
+        start = time.perf_counter()
+
+        async def produce() -> None:
+            pack: List[Item] = []
+            for line, text in inputs:
+                if line in done:
+                    self.stats.skipped += 1
+                    continue
+                pack.append((line, text))
+                if len(pack) == self.pack_size:
+                    await packs.put(pack)
+                    pack = []
+            if pack:
+                await packs.put(pack)
+            for _ in range(self.max_concurrency):
+                await packs.put(None)
+
+        with open(output, "a", encoding="utf-8") as file:
+            async def work() -> None:
+                while (pack := await packs.get()) is not None:
+                    async for line, record in self._classify_or_split(pack):
+                        file.write(json.dumps({"line": line, **record}) + "\n")
+                        if "error" not in record:
+                            self.stats.items += 1
+                    file.flush()
+
+            tasks = [asyncio.ensure_future(produce())]
+            tasks.extend(asyncio.ensure_future(work()) for _ in range(self.max_concurrency))
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # gather leaves the other tasks running when one fails; they must not write
+                # to the file once it is closed.
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        self.stats.seconds += time.perf_counter() - start
+        return self.stats
+
+
+async def _main(args: argparse.Namespace) -> None:
+    # pylint: disable=import-outside-toplevel
+    from autogen_exploration.clients import close_shared_clients, get_model_client
+
+    classifier = BatchClassifier(get_model_client(priority="batch"), pack_size=args.pack_size,
+                                 max_concurrency=args.concurrency)
+    stats = await classifier.run(read_inputs(args.input), args.output)
+    print(json.dumps(stats.summary()))
+    await close_shared_clients()
+
+
+def main() -> None:
+    """Classify the lines of a text file into a JSON lines file."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="text file, one input per line")
+    parser.add_argument("output", help="JSON lines results file, appended to and resumed from")
+    parser.add_argument("--pack-size", type=int, default=DEFAULT_PACK_SIZE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    load_dotenv()
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
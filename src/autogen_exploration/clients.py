@@ -0,0 +1,464 @@
+"""
+Process-wide Azure OpenAI model clients backed by one keep-alive connection pool.
+
+Every example used to build its own ``AzureTokenProvider`` and
+``AzureOpenAIChatCompletionClient`` at import time, so each script (and each
+custom agent instance) paid for a fresh HTTP connection pool and a new TCP/TLS
+handshake. :func:`get_model_client` hands out clients that all share a single
+``httpx.AsyncClient``, so connections are reused by every agent and team that
+runs in the same process.
+
+The shared pool can be tuned with environment variables:
+
+- ``AUTOGEN_HTTP_POOL_SIZE``: maximum number of open connections (default 100).
+- ``AUTOGEN_HTTP_KEEPALIVE``: maximum number of idle keep-alive connections (default 20).
+- ``AUTOGEN_HTTP_KEEPALIVE_EXPIRY``: seconds an idle connection is kept open (default 30).
+- ``AUTOGEN_HTTP2``: ``1`` to negotiate HTTP/2, ``0`` to disable it. Defaults to
+  HTTP/2 when the optional ``h2`` package is installed.
+
+Other environment variables wrap the shared clients with extra behavior:
+
+- ``AZURE_OPENAI_API_BACKENDS``: a comma-separated list of ``deployment@endpoint``
+  entries. Requests are then balanced across these deployments, and
+  ``AUTOGEN_HEDGE=1`` duplicates slow requests to a second deployment.
+
+- ``AUTOGEN_RESPONSE_CACHE``: cache responses in this SQLite file (``memory`` for
+  an in-memory cache only). ``AUTOGEN_RESPONSE_CACHE_TTL`` sets the time to live in
+  seconds and ``AUTOGEN_RESPONSE_CACHE_ALL_TEMPERATURES=1`` also caches requests
+  sampled with a non-zero temperature.
+- ``AUTOGEN_SINGLE_FLIGHT=1``: send concurrent identical requests upstream only once.
+- ``AUTOGEN_CASSETTE``: record model exchanges to, or replay them from, this cassette
+  file. ``AUTOGEN_CASSETTE_MODE`` is ``replay`` (the default) or ``record``, and
+  ``AUTOGEN_REPLAY_SPEED`` speeds replay up (``0`` replays instantly). Replay needs
+  no network access and no Azure credentials.
+- ``AUTOGEN_RATE_LIMIT_RPM`` and ``AUTOGEN_RATE_LIMIT_TPM``: the deployment's request
+  and token quotas per minute. Setting either (or ``AUTOGEN_SCHEDULER=1`` when the
+  quotas are unknown) admits requests through one rate-limit-aware scheduler per
+  deployment, which adapts its concurrency to ``429`` answers and retries them
+  itself. Pass ``priority="batch"`` to :func:`get_model_client` for background work
+  that should yield to interactive agents.
+- ``AUTOGEN_DEFER_CLIENTS=1``: hand out clients that are only built, and import the
+  OpenAI SDK, when they are first used. ``python -m autogen_exploration.launch``
+  sets it. An agent with tools reads the client's ``model_info``, which builds the
+  client unless ``model_info`` is one of the create arguments.
+
+Usage:
+    from autogen_exploration.clients import get_model_client
+
+    model_client = get_model_client()
+"""
+
+import importlib.util
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+from autogen_core.models import ChatCompletionClient
+
+# The OpenAI SDK, azure.identity and the client wrappers take most of a second to
+# import, so they are only imported once a client is actually built.
+if TYPE_CHECKING:
+    from autogen_ext.auth.azure import AzureTokenProvider
+    from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+
+    from autogen_exploration.auth import CachingTokenProvider
+    from autogen_exploration.models.cache import ResponseCache
+    from autogen_exploration.models.replay import Cassette
+    from autogen_exploration.models.scheduler import Priority, RateLimitScheduler
+
+AZURE_COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+DEFAULT_POOL_SIZE = 100
+DEFAULT_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+@dataclass(frozen=True)
+class AzureOpenAISettings:
+    """
+    Connection settings for a single Azure OpenAI deployment.
+
+    :param deployment: The deployment name of the model.
+    :param api_version: The Azure OpenAI API version.
+    :param endpoint: The base URL of the Azure OpenAI resource.
+    :param model: The model name, defaults to the deployment name.
+    :param api_key: An API key to use instead of Azure AD authentication.
+    """
+
+    deployment: Optional[str]
+    api_version: Optional[str]
+    endpoint: Optional[str]
+    model: Optional[str] = None
+    api_key: Optional[str] = None
+
+    @classmethod
+    def from_env(
+            cls,
+            deployment_var: str = "AZURE_OPENAI_API_DEPLOYMENT_NAME",
+            version_var: str = "AZURE_OPENAI_API_VERSION",
+            endpoint_var: str = "AZURE_OPENAI_API_INSTANCE_NAME",
+    ) -> "AzureOpenAISettings":
+        """
+        Read the deployment settings from environment variables.
+
+        Args:
+            deployment_var (str): Variable holding the deployment name.
+            version_var (str): Variable holding the API version.
+            endpoint_var (str): Variable holding the resource endpoint.
+
+        Returns:
+            AzureOpenAISettings: The settings found in the environment.
+        """
+        return cls(
+            deployment=os.environ.get(deployment_var),
+            api_version=os.environ.get(version_var),
+            endpoint=os.environ.get(endpoint_var),
+            api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
+        )
+
+    @classmethod
+    def backends_from_env(
+            cls,
+            backends_var: str = "AZURE_OPENAI_API_BACKENDS",
+            version_var: str = "AZURE_OPENAI_API_VERSION",
+    ) -> List["AzureOpenAISettings"]:
+        """
+        Read a list of deployments serving the same model from an environment variable.
+
+        The variable holds comma-separated ``deployment@endpoint`` entries, for example
+        ``gpt-4o-mini@https://eastus2.example.com/,gpt-4o-mini@https://westus.example.com/``.
+
+        Args:
+            backends_var (str): Variable holding the deployments.
+            version_var (str): Variable holding the API version shared by the deployments.
+
+        Returns:
+            List[AzureOpenAISettings]: The deployments, empty when the variable is not set.
+        """
+        backends = []
+        for entry in os.environ.get(backends_var, "").split(","):
+            if entry.strip():
+                deployment, _, endpoint = entry.strip().partition("@")
+                backends.append(cls(deployment=deployment, endpoint=endpoint,
+                                    api_version=os.environ.get(version_var),
+                                    api_key=os.environ.get("AZURE_OPENAI_API_KEY")))
+        return backends
+
+    @property
+    def name(self) -> str:
+        """A short name for reports: the endpoint host and the deployment."""
+        return f"{urlparse(self.endpoint or '').netloc}/{self.deployment}"
+
+
+class SharedAsyncClient(httpx.AsyncClient):
+    """
+    An ``httpx.AsyncClient`` that survives ``close()`` calls from individual model clients.
+
+    The OpenAI SDK closes its HTTP client when a model client is closed. Since the
+    pool is shared by every model client in the process, those calls are ignored and
+    the pool is only torn down by :meth:`shutdown`.
+    """
+
+    async def aclose(self) -> None:
+        return None
+
+    async def shutdown(self) -> None:
+        """Close every pooled connection."""
+        await super().aclose()
+
+
+_lock = threading.Lock()
+_http_client: Optional[SharedAsyncClient] = None
+_token_provider: Optional["CachingTokenProvider"] = None
+_model_clients: Dict[str, ChatCompletionClient] = {}
+_response_cache: Optional["ResponseCache"] = None
+_cassette: Optional["Cassette"] = None
+_schedulers: Dict[str, "RateLimitScheduler"] = {}
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def http2_available() -> bool:
+    """Return True when the optional ``h2`` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client(
+        pool_size: Optional[int] = None,
+        keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+) -> SharedAsyncClient:
+    """
+    Create a keep-alive connection pool suitable for sharing between model clients.
+
+    Arguments left as None fall back to the ``AUTOGEN_HTTP_*`` environment variables.
+
+    Args:
+        pool_size (Optional[int]): Maximum number of open connections.
+        keepalive (Optional[int]): Maximum number of idle connections kept alive.
+        keepalive_expiry (Optional[float]): Seconds an idle connection is kept open.
+        http2 (Optional[bool]): Whether to negotiate HTTP/2. Ignored when ``h2`` is missing.
+
+    Returns:
+        SharedAsyncClient: The new connection pool.
+    """
+    if pool_size is None:
+        pool_size = int(_env_number("AUTOGEN_HTTP_POOL_SIZE", DEFAULT_POOL_SIZE))
+    if keepalive is None:
+        keepalive = int(_env_number("AUTOGEN_HTTP_KEEPALIVE", DEFAULT_KEEPALIVE))
+    if keepalive_expiry is None:
+        keepalive_expiry = _env_number("AUTOGEN_HTTP_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)
+    if http2 is None:
+        http2 = os.environ.get("AUTOGEN_HTTP2", "1") != "0"
+
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=min(keepalive, pool_size),
+        keepalive_expiry=keepalive_expiry,
+    )
+    # Same defaults as the OpenAI SDK: long reads for completions, quick connects.
+    timeout = httpx.Timeout(timeout=600.0, connect=5.0)
+    return SharedAsyncClient(limits=limits, timeout=timeout,
+                             http2=http2 and http2_available())
+
+
+def get_http_client() -> SharedAsyncClient:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _http_client  # pylint: disable=global-statement
+    with _lock:
+        if _http_client is None:
+            _http_client = create_http_client()
+        return _http_client
+
+
+def get_token_provider() -> "CachingTokenProvider":
+    """
+    Return the process-wide Azure AD token provider for Cognitive Services.
+
+    The first token is fetched in the background as soon as the provider is
+    created, so the credential chain probe overlaps with the rest of start-up.
+    """
+    global _token_provider  # pylint: disable=global-statement
+    from azure.identity import DefaultAzureCredential
+
+    from autogen_exploration.auth import CachingTokenProvider
+
+    with _lock:
+        if _token_provider is None:
+            _token_provider = CachingTokenProvider(
+                DefaultAzureCredential(),
+                AZURE_COGNITIVE_SERVICES_SCOPE,
+            ).start()
+        return _token_provider
+
+
+def get_response_cache() -> "ResponseCache":
+    """Return the process-wide response cache configured by ``AUTOGEN_RESPONSE_CACHE``."""
+    global _response_cache  # pylint: disable=global-statement
+    from autogen_exploration.models.cache import ResponseCache
+
+    with _lock:
+        if _response_cache is None:
+            path = os.environ.get("AUTOGEN_RESPONSE_CACHE", "memory")
+            ttl = os.environ.get("AUTOGEN_RESPONSE_CACHE_TTL")
+            _response_cache = ResponseCache(
+                path=None if path == "memory" else path,
+                ttl=float(ttl) if ttl else None,
+            )
+        return _response_cache
+
+
+def get_cassette() -> "Cassette":
+    """Return the process-wide cassette configured by ``AUTOGEN_CASSETTE``."""
+    global _cassette  # pylint: disable=global-statement
+    from autogen_exploration.models.replay import Cassette
+
+    with _lock:
+        if _cassette is None:
+            _cassette = Cassette(os.environ["AUTOGEN_CASSETTE"])
+        return _cassette
+
+
+def _scheduling() -> bool:
+    return any(os.environ.get(name) for name in (
+        "AUTOGEN_RATE_LIMIT_RPM", "AUTOGEN_RATE_LIMIT_TPM", "AUTOGEN_SCHEDULER"))
+
+
+def get_scheduler(settings: AzureOpenAISettings) -> "RateLimitScheduler":
+    """Return the process-wide request scheduler of a deployment."""
+    from autogen_exploration.models.scheduler import RateLimitScheduler
+
+    with _lock:
+        scheduler = _schedulers.get(settings.name)
+        if scheduler is None:
+            rpm = os.environ.get("AUTOGEN_RATE_LIMIT_RPM")
+            tpm = os.environ.get("AUTOGEN_RATE_LIMIT_TPM")
+            scheduler = RateLimitScheduler(
+                requests_per_minute=float(rpm) if rpm else None,
+                tokens_per_minute=float(tpm) if tpm else None,
+            )
+            _schedulers[settings.name] = scheduler
+        return scheduler
+
+
+def _replaying() -> bool:
+    return (bool(os.environ.get("AUTOGEN_CASSETTE"))
+            and os.environ.get("AUTOGEN_CASSETTE_MODE", "replay") == "replay")
+
+
+def _backend_client(settings: AzureOpenAISettings, priority: "Priority",
+                    create_args: Dict[str, Any]) -> ChatCompletionClient:
+    client: ChatCompletionClient = create_model_client(settings, **create_args)
+    if _scheduling():
+        from autogen_exploration.models.scheduler import ScheduledChatCompletionClient
+
+        client = ScheduledChatCompletionClient(client, get_scheduler(settings), priority=priority)
+    return client
+
+
+def _wrap_from_env(client: ChatCompletionClient) -> ChatCompletionClient:
+    if os.environ.get("AUTOGEN_CASSETTE"):
+        from autogen_exploration.models.replay import CassetteChatCompletionClient
+
+        client = CassetteChatCompletionClient(
+            client,
+            get_cassette(),
+            mode="replay" if _replaying() else "record",
+            speed=_env_number("AUTOGEN_REPLAY_SPEED", 1.0),
+        )
+    if os.environ.get("AUTOGEN_SINGLE_FLIGHT") == "1":
+        from autogen_exploration.models.singleflight import SingleFlightChatCompletionClient
+
+        client = SingleFlightChatCompletionClient(client)
+    if os.environ.get("AUTOGEN_RESPONSE_CACHE"):
+        from autogen_exploration.models.cache import CachingChatCompletionClient
+
+        client = CachingChatCompletionClient(
+            client,
+            get_response_cache(),
+            cache_nonzero_temperature=os.environ.get("AUTOGEN_RESPONSE_CACHE_ALL_TEMPERATURES") == "1",
+        )
+    return client
+
+
+def create_model_client(
+        settings: AzureOpenAISettings,
+        http_client: Optional[httpx.AsyncClient] = None,
+        token_provider: Optional["AzureTokenProvider"] = None,
+        **create_args: Any,
+) -> "AzureOpenAIChatCompletionClient":
+    """
+    Build a new Azure OpenAI chat completion client on top of a connection pool.
+
+    Args:
+        settings (AzureOpenAISettings): The deployment to talk to.
+        http_client (Optional[httpx.AsyncClient]): The pool to use, defaults to the shared one.
+        token_provider (Optional[AzureTokenProvider]): The Azure AD token provider to use when
+            the settings have no API key, defaults to the shared one.
+        **create_args: Extra client arguments such as ``temperature`` or ``parallel_tool_calls``.
+
+    Returns:
+        AzureOpenAIChatCompletionClient: The new model client.
+    """
+    from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+
+    auth: Dict[str, Any] = (
+        {"api_key": settings.api_key} if settings.api_key
+        else {"azure_ad_token_provider": token_provider or get_token_provider()}
+    )
+    return AzureOpenAIChatCompletionClient(
+        azure_deployment=settings.deployment,
+        model=settings.model or settings.deployment,
+        api_version=settings.api_version,
+        azure_endpoint=settings.endpoint,
+        http_client=http_client or get_http_client(),
+        **auth,
+        **create_args,
+    )
+
+
+def _build_client(backends: List[AzureOpenAISettings], priority: "Priority",
+                  create_args: Dict[str, Any]) -> ChatCompletionClient:
+    if len(backends) == 1:
+        client = _backend_client(backends[0], priority, create_args)
+    else:
+        from autogen_exploration.models.routing import RoutingChatCompletionClient
+
+        client = RoutingChatCompletionClient(
+            {backend.name: _backend_client(backend, priority, create_args)
+             for backend in backends},
+            hedge=os.environ.get("AUTOGEN_HEDGE") == "1",
+        )
+    return _wrap_from_env(client)
+
+
+def get_model_client(
+        settings: Optional[AzureOpenAISettings] = None,
+        *,
+        priority: "Priority" = "interactive",
+        **create_args: Any,
+) -> ChatCompletionClient:
+    """
+    Return the process-wide model client for a deployment and set of create arguments.
+
+    Calls with the same settings and arguments get the same client instance, and all
+    clients share one connection pool and token provider. The client is wrapped with
+    the behaviors switched on by the ``AUTOGEN_*`` environment variables.
+
+    Args:
+        settings (Optional[AzureOpenAISettings]): The deployment, defaults to the ones
+            configured by ``AZURE_OPENAI_API_BACKENDS`` or else the single deployment
+            configured by the ``AZURE_OPENAI_API_*`` environment variables.
+        priority (Priority): ``interactive`` or ``batch``, used when requests are scheduled.
+        **create_args: Extra client arguments such as ``temperature`` or ``parallel_tool_calls``.
+
+    Returns:
+        ChatCompletionClient: The shared model client.
+    """
+    backends = ([settings] if settings is not None
+                else AzureOpenAISettings.backends_from_env() or [AzureOpenAISettings.from_env()])
+    if _replaying():
+        # The real client is never called on replay: skip Azure AD and allow a missing endpoint.
+        backends = [replace(backend, api_key=backend.api_key or "replay",
+                            endpoint=backend.endpoint or "http://replay.invalid/")
+                    for backend in backends]
+    if _scheduling():
+        # The scheduler retries 429 answers, the SDK must not retry them on its own.
+        create_args.setdefault("max_retries", 0)
+    key = repr((backends, priority, sorted(create_args.items())))
+    with _lock:
+        client = _model_clients.get(key)
+    if client is None:
+        if os.environ.get("AUTOGEN_DEFER_CLIENTS") == "1":
+            from autogen_exploration.models.deferred import DeferredChatCompletionClient
+
+            client = DeferredChatCompletionClient(
+                lambda: _build_client(backends, priority, create_args),
+                model_info=create_args.get("model_info"))
+        else:
+            client = _build_client(backends, priority, create_args)
+        with _lock:
+            client = _model_clients.setdefault(key, client)
+    return client
+
+
+async def close_shared_clients() -> None:
+    """Forget every shared model client and close the shared connection pool."""
+    global _http_client, _response_cache, _cassette  # pylint: disable=global-statement
+    with _lock:
+        http_client, _http_client = _http_client, None
+        response_cache, _response_cache = _response_cache, None
+        _cassette = None
+        _model_clients.clear()
+        _schedulers.clear()
+    if response_cache is not None:
+        response_cache.close()
+    if http_client is not None:
+        await http_client.shutdown()
@@ -0,0 +1,310 @@
+"""
+A token-bounded model context that summarizes the older turns of a conversation.
+
+Each agent of a primary/critic team resends the whole conversation on every
+turn, so the prompt grows by a message per turn and the tokens of a long loop
+grow quadratically until the critic approves. With
+:class:`SummarizingChatCompletionContext` as its ``model_context``, an agent
+sends:
+
+- a running summary of the older turns, as one user message;
+- the last ``keep_turns`` messages verbatim, with tool results kept next to the
+  calls they answer.
+
+The summary is updated incrementally, off the critical path: once
+``fold_turns`` messages have left the verbatim window, a background task asks
+the model to fold them (and any others that left meanwhile) into the summary,
+while the agent carries on. Folding several messages at a time keeps the summary
+requests, which resend the summary, from costing more than they save.
+Messages whose fold has not finished are sent verbatim. A fold that fails is
+logged, and is not retried until another ``fold_turns`` messages have left the
+window. Whatever the state of the summary, the messages returned fit in
+``max_tokens``: the oldest unsummarized messages are left out first. The one
+exception is the newest message, which is always kept, even when it alone
+exceeds ``max_tokens``.
+
+Usage:
+    primary_agent = AssistantAgent(
+        "primary",
+        model_client=model_client,
+        model_context=SummarizingChatCompletionContext(model_client, keep_turns=6, max_tokens=4000),
+    )
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from autogen_core import Component, ComponentModel, FunctionCall, Image
+from autogen_core.model_context import ChatCompletionContext, ChatCompletionContextState
+from autogen_core.models import (
+    ChatCompletionClient,
+    FunctionExecutionResultMessage,
+    LLMMessage,
+    SystemMessage,
+    UserMessage,
+)
+from pydantic import BaseModel
+
+from autogen_exploration.models.budget import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP_TURNS = 6
+DEFAULT_FOLD_TURNS = 4
+DEFAULT_MAX_TOKENS = 4000
+DEFAULT_SUMMARY_TOKENS = 400
+DEFAULT_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between agents. Update the summary "
+    "with the new messages: keep decisions, open requests and the latest version of any work "
+    "in progress, and drop what has been superseded. Answer with the updated summary only, "
+    "in at most {tokens} tokens.")
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def _message_text(message: LLMMessage) -> str:
+    """Return a message as a transcript line."""
+    source = getattr(message, "source", "tool")
+    if isinstance(message.content, str):
+        return f"{source}: {message.content}"
+    parts = []
+    for part in message.content:
+        if isinstance(part, FunctionCall):
+            parts.append(f"called {part.name}({part.arguments})")
+        elif isinstance(part, Image):
+            parts.append("[image]")
+        else:
+            parts.append(str(getattr(part, "content", part)))
+    return f"{source}: " + "\n".join(parts)
+
+
+class SummarizingContextConfig(BaseModel):
+    """The component config of a :class:`SummarizingChatCompletionContext`."""
+
+    model_client: ComponentModel
+    keep_turns: int = DEFAULT_KEEP_TURNS
+    fold_turns: int = DEFAULT_FOLD_TURNS
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    summary_tokens: int = DEFAULT_SUMMARY_TOKENS
+    instructions: str = DEFAULT_INSTRUCTIONS
+    initial_messages: Optional[List[LLMMessage]] = None
+
+
+class SummarizingContextState(ChatCompletionContextState):
+    """The saved state of a :class:`SummarizingChatCompletionContext`."""
+
+    summary: str = ""
+    summarized: int = 0
+
+
+@dataclass
+class SummarizingContextStats:
+    """Counters of the summary updates and the prompts of a context."""
+
+    summaries: int = 0
+    errors: int = 0
+    folded: int = 0
+    trimmed: int = 0
+    summary_prompt_tokens: int = 0
+    summary_completion_tokens: int = 0
+    summary_seconds: float = 0.0
+    max_context_tokens: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters as a flat dictionary."""
+        return {
+            "summaries": self.summaries,
+            "errors": self.errors,
+            "folded": self.folded,
+            "trimmed": self.trimmed,
+            "summary_prompt_tokens": self.summary_prompt_tokens,
+            "summary_completion_tokens": self.summary_completion_tokens,
+            "summary_seconds": round(self.summary_seconds, 2),
+            "max_context_tokens": self.max_context_tokens,
+        }
+
+
+class SummarizingChatCompletionContext(ChatCompletionContext, Component[SummarizingContextConfig]):
+    """
+    A model context of the last turns verbatim and a running summary of the rest.
+
+    Every agent needs its own instance. The summary requests can use a cheaper
+    model client than the agent's.
+
+    :param model_client: The model client that writes the summaries.
+    :param keep_turns: The newest messages sent verbatim.
+    :param fold_turns: The messages out of the window that start a summary update.
+    :param max_tokens: The ceiling on the tokens of the messages returned, summary included,
+        unless the newest message alone exceeds it.
+    :param summary_tokens: The ceiling on the tokens of the summary; longer summaries are cut.
+    :param instructions: The system message of the summary requests, with a ``{tokens}`` field.
+    :param counter: The token counter, defaults to the shared counter of the model family.
+    :param initial_messages: Messages the context starts with.
+    """
+
+    component_config_schema = SummarizingContextConfig
+    component_provider_override = "autogen_exploration.context.SummarizingChatCompletionContext"
+
+    def __init__(self, model_client: ChatCompletionClient, keep_turns: int = DEFAULT_KEEP_TURNS,
+                 fold_turns: int = DEFAULT_FOLD_TURNS, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 summary_tokens: int = DEFAULT_SUMMARY_TOKENS,
+                 instructions: str = DEFAULT_INSTRUCTIONS, counter: Optional[TokenCounter] = None,
+                 initial_messages: Optional[List[LLMMessage]] = None) -> None:
+        if keep_turns < 1 or fold_turns < 1:
+            raise ValueError("keep_turns and fold_turns must be at least 1.")
+        if summary_tokens >= max_tokens:
+            raise ValueError("summary_tokens must be less than max_tokens.")
+        super().__init__(initial_messages)
+        self._model_client = model_client
+        self.keep_turns = keep_turns
+        self.fold_turns = fold_turns
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.instructions = instructions
+        self._counter = counter
+        self.stats = SummarizingContextStats()
+        self.summary = ""
+        # The messages at the start of self._messages that the summary covers.
+        self._summarized = 0
+        # The window start at which a failed fold is retried.
+        self._retry_at = 0
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def counter(self) -> TokenCounter:
+        """The token counter, resolved on first use so that a deferred client stays unbuilt."""
+        if self._counter is None:
+            self._counter = get_token_counter(self._model_client.model_info.get("family", "gpt-4o"))
+        return self._counter
+
+    def _fold_due(self) -> bool:
+        """Return whether enough messages have left the window to fold them into the summary."""
+        end = self._window_start()
+        return end - self._summarized >= self.fold_turns and end >= self._retry_at
+
+    def _window_start(self) -> int:
+        """Return the index of the first message kept verbatim."""
+        start = max(len(self._messages) - self.keep_turns, 0)
+        # Tool results must follow the message with their calls.
+        while start > 0 and isinstance(self._messages[start], FunctionExecutionResultMessage):
+            start -= 1
+        return start
+
+    async def add_message(self, message: LLMMessage) -> None:
+        """Add a message, and start folding the messages that left the window into the summary."""
+        await super().add_message(message)
+        if self._fold_due() and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._fold())
+
+    async def _fold(self) -> None:
+        while self._fold_due():
+            end = self._window_start()
+            messages = self._messages[self._summarized:end]
+            transcript = "\n\n".join(_message_text(message) for message in messages)
+            prompt = (f"{SUMMARY_PREFIX}{self.summary}\n\nNew messages:\n{transcript}"
+                      if self.summary else f"Messages:\n{transcript}")
+            start = time.perf_counter()
+            try:
+                result = await self._model_client.create([
+                    SystemMessage(content=self.instructions.format(tokens=self.summary_tokens)),
+                    UserMessage(content=prompt, source="user"),
+                ])
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # The messages stay verbatim, within max_tokens, until another fold_turns
+                # messages have left the window, rather than a request per added message.
+                self._retry_at = end + self.fold_turns
+                self.stats.errors += 1
+                logger.warning("Summary update failed: %s", error)
+                return
+            self.stats.summaries += 1
+            self.stats.folded += len(messages)
+            self.stats.summary_prompt_tokens += result.usage.prompt_tokens
+            self.stats.summary_completion_tokens += result.usage.completion_tokens
+            self.stats.summary_seconds += time.perf_counter() - start
+            self.summary = self._cut(str(result.content).strip(), self.summary_tokens)
+            self._summarized = end
+
+    def _cut(self, text: str, tokens: int) -> str:
+        """Return the longest prefix of a text, at a word boundary, of at most ``tokens`` tokens."""
+        count = self.counter.count_text(text)
+        while count > tokens:
+            text = text[:len(text) * tokens // count].rsplit(" ", 1)[0]
+            count = self.counter.count_text(text)
+        return text
+
+    async def get_messages(self) -> List[LLMMessage]:
+        """Return the summary and the newest unsummarized messages that fit in ``max_tokens``."""
+        messages: List[LLMMessage] = []
+        if self.summary:
+            messages.append(UserMessage(content=SUMMARY_PREFIX + self.summary, source="summary"))
+        tokens = sum(self.counter.count_message(message) for message in messages)
+        kept: List[LLMMessage] = []
+        pending = self._messages[self._summarized:]
+        for message in reversed(pending):
+            message_tokens = self.counter.count_message(message)
+            if kept and tokens + message_tokens > self.max_tokens:
+                break
+            kept.append(message)
+            tokens += message_tokens
+        if len(kept) < len(pending):
+            self.stats.trimmed += 1
+        kept.reverse()
+        while len(kept) > 1 and isinstance(kept[0], FunctionExecutionResultMessage):
+            tokens -= self.counter.count_message(kept.pop(0))
+        self.stats.max_context_tokens = max(self.stats.max_context_tokens, tokens)
+        return messages + kept
+
+    async def flush(self) -> None:
+        """Wait for the summary update in progress, if any."""
+        while self._task is not None and not self._task.done():
+            await self._task
+
+    def _cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def clear(self) -> None:
+        """Clear the messages and the summary."""
+        self._cancel()
+        await super().clear()
+        self.summary = ""
+        self._summarized = 0
+        self._retry_at = 0
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return SummarizingContextState(messages=self._messages, summary=self.summary,
+                                       summarized=self._summarized).model_dump()
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        self._cancel()
+        loaded = SummarizingContextState.model_validate(state)
+        self._messages = loaded.messages
+        self.summary = loaded.summary
+        self._summarized = min(loaded.summarized, len(self._messages))
+        self._retry_at = 0
+
+    def _to_config(self) -> SummarizingContextConfig:
+        return SummarizingContextConfig(
+            model_client=self._model_client.dump_component(),
+            keep_turns=self.keep_turns,
+            fold_turns=self.fold_turns,
+            max_tokens=self.max_tokens,
+            summary_tokens=self.summary_tokens,
+            instructions=self.instructions,
+            initial_messages=self._initial_messages,
+        )
+
+    @classmethod
+    def _from_config(cls, config: SummarizingContextConfig) -> "SummarizingChatCompletionContext":
+        return cls(
+            model_client=ChatCompletionClient.load_component(config.model_client),
+            keep_turns=config.keep_turns,
+            fold_turns=config.fold_turns,
+            max_tokens=config.max_tokens,
+            summary_tokens=config.summary_tokens,
+            instructions=config.instructions,
+            initial_messages=config.initial_messages,
+        )
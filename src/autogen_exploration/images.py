@@ -0,0 +1,346 @@
+"""
+An async image stage that prepares images for multimodal messages.
+
+AutoGen's ``Image`` keeps a full-size PIL image and encodes it to a PNG, then to
+base64, every time a request containing it is built, which for a conversation
+means every later turn too. Photos are sent far larger than the model looks at,
+in the format that compresses them worst.
+
+:class:`ImagePipeline` loads images from paths, URLs or bytes concurrently and,
+off the event loop:
+
+- downscales them to what the model uses at a detail level: 512x512 for
+  ``low``; for ``high`` (and ``auto``), 2048 on the long side and 768 on the short
+  side, beyond which the model scales them down itself;
+- encodes them as JPEG, WebP and, for flat images, PNG, and keeps the smallest;
+  images with transparency keep their alpha channel and are never sent as JPEG,
+  which would put them on a black background;
+- caches the base64 payload by the SHA-256 of the source bytes, so a repeated
+  image costs a hash and no decoding or encoding, and by URL or path (with the
+  file's size and modification time), so a repeated URL or file is not even
+  downloaded or read again. A URL is assumed to keep its content while it is
+  in the cache.
+
+The images it returns are :class:`EncodedImage` objects, which work wherever an
+``Image`` does and hand out the cached payload without encoding it again.
+
+Usage:
+    pipeline = ImagePipeline(detail="low")
+    image = await pipeline.load("https://picsum.photos/300/200")
+    message = MultiModalMessage(content=["Describe this image.", image], source="user")
+    print(pipeline.stats.summary())
+"""
+
+import asyncio
+import base64
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Sequence, Tuple, Union
+
+import httpx
+from autogen_core import Image
+from PIL import Image as PILImage
+
+Detail = Literal["low", "high", "auto"]
+ImageSource = Union[str, os.PathLike, bytes]
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_QUALITY = 85
+_MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+def vision_tokens(width: int, height: int, detail: Detail = "auto") -> int:
+    """
+    Return the prompt tokens of an image, as OpenAI bills and AutoGen counts them.
+
+    Args:
+        width (int): The image width in pixels.
+        height (int): The image height in pixels.
+        detail (Detail): The detail level the image is sent with.
+
+    Returns:
+        int: 85 for low detail, else 85 plus 170 per 512-pixel tile of the scaled image.
+    """
+    if detail == "low":
+        return 85
+    width, height = target_size(width, height, detail)
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def _fit(width: int, height: int, max_width: int, max_height: int) -> Tuple[int, int]:
+    """Return the size of an image scaled down, never up, to fit a box."""
+    scale = min(max_width / width, max_height / height, 1.0)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def target_size(width: int, height: int, detail: Detail) -> Tuple[int, int]:
+    """Return the largest size of an image the model still uses at a detail level."""
+    if detail == "low":
+        return _fit(width, height, 512, 512)
+    width, height = _fit(width, height, 2048, 2048)
+    if min(width, height) > 768:
+        scale = 768 / min(width, height)
+        width, height = int(width * scale), int(height * scale)
+    return width, height
+
+
+class EncodedImage(Image):
+    """
+    An image whose base64 payload was encoded once, in its smallest format.
+
+    The PIL image is only opened, lazily and without decoding its pixels, when
+    something asks for it (such as AutoGen's token count, which reads its size).
+
+    :param payload: The base64 encoded image file.
+    :param mime_type: Its MIME type.
+    """
+
+    # pylint: disable-next=super-init-not-called
+    def __init__(self, payload: str, mime_type: str) -> None:
+        self.payload = payload
+        self.mime_type = mime_type
+        self._image: Optional[PILImage.Image] = None
+
+    @property
+    def image(self) -> PILImage.Image:  # type: ignore[override]
+        if self._image is None:
+            self._image = PILImage.open(BytesIO(base64.b64decode(self.payload)))
+        return self._image
+
+    @image.setter
+    def image(self, value: PILImage.Image) -> None:
+        self._image = value
+
+    def to_base64(self) -> str:
+        return self.payload
+
+    @property
+    def data_uri(self) -> str:
+        return f"data:{self.mime_type};base64,{self.payload}"
+
+
+@dataclass
+class _Encoded:
+    payload: str
+    mime_type: str
+    size: Tuple[int, int]
+    source_size: Tuple[int, int]
+    source_bytes: int = 0
+
+
+@dataclass
+class _Encoding:
+    """An encoding in progress and the number of loads waiting for it."""
+
+    future: "asyncio.Future[_Encoded]"
+    waiters: int = 0
+
+
+def _file_key(path: Union[str, os.PathLike]) -> str:
+    """Return the key of a version of a file; touches the file system."""
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    return f"{resolved}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _has_alpha(image: PILImage.Image) -> bool:
+    """Return whether an image has transparent pixels."""
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        alpha = image.convert("RGBA").getchannel("A")
+        return alpha.getextrema()[0] < 255
+    return False
+
+
+@dataclass
+class ImageStats:
+    """Bytes and tokens of the images an :class:`ImagePipeline` prepared."""
+
+    images: int = 0
+    cache_hits: int = 0
+    source_bytes: int = 0
+    payload_bytes: int = 0
+    source_tokens: int = 0
+    tokens: int = 0
+
+    def summary(self) -> Dict[str, int]:
+        """Return the counters and the bytes and tokens saved as a flat dictionary."""
+        return {
+            "images": self.images,
+            "cache_hits": self.cache_hits,
+            "source_bytes": self.source_bytes,
+            "payload_bytes": self.payload_bytes,
+            "tokens": self.tokens,
+            "tokens_saved": self.source_tokens - self.tokens,
+        }
+
+
+class ImagePipeline:
+    """
+    Loads, downscales, re-encodes and caches images for multimodal messages.
+
+    :param detail: The detail level the model needs the images at.
+    :param formats: The formats to try, the smallest encoding wins.
+    :param quality: The JPEG and WebP quality.
+    :param max_concurrency: Images loaded and encoded at the same time.
+    :param max_entries: Encoded images kept in the cache.
+    """
+
+    def __init__(self, detail: Detail = "auto", formats: Sequence[str] = ("JPEG", "PNG", "WEBP"),
+                 quality: int = DEFAULT_QUALITY, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.detail = detail
+        self.formats = tuple(name.upper() for name in formats)
+        self.quality = quality
+        self.max_entries = max_entries
+        self.stats = ImageStats()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._cache: "OrderedDict[str, _Encoded]" = OrderedDict()
+        # The content key of each URL or file version already loaded.
+        self._sources: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, _Encoding] = {}
+        self._lock = threading.Lock()
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def read(self, source: ImageSource) -> bytes:
+        """Return the bytes of an image given as a path, an ``http(s)`` URL or bytes."""
+        if isinstance(source, bytes):
+            return source
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            if self._http is None:
+                self._http = httpx.AsyncClient(follow_redirects=True, timeout=30.0)
+            response = await self._http.get(source)
+            response.raise_for_status()
+            return response.content
+        return await asyncio.to_thread(Path(source).read_bytes)
+
+    @staticmethod
+    async def _source_key(source: ImageSource) -> Optional[str]:
+        """Return the key of a URL or a version of a file, or None for bytes."""
+        if isinstance(source, bytes):
+            return None
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            return source
+        return await asyncio.to_thread(_file_key, source)
+
+    async def load(self, source: ImageSource) -> EncodedImage:
+        """
+        Return an image ready for a ``MultiModalMessage``.
+
+        Args:
+            source (ImageSource): A file path, an ``http(s)`` URL or the image bytes.
+
+        Returns:
+            EncodedImage: The downscaled and encoded image.
+        """
+        source_key = await self._source_key(source)
+        with self._lock:
+            key = self._sources.get(source_key) if source_key is not None else None
+        encoded = self._cached(key) if key is not None else None
+        if encoded is not None:
+            self._record(encoded)
+            return EncodedImage(encoded.payload, encoded.mime_type)
+        async with self._slots:
+            data = await self.read(source)
+            key = f"{hashlib.sha256(data).hexdigest()}:{self.detail}:{self.quality}"
+            encoded = self._cached(key)
+            if encoded is None:
+                pending = self._pending.get(key)
+                joined = pending is not None
+                if pending is None:
+                    pending = _Encoding(asyncio.ensure_future(asyncio.to_thread(self.encode, data)))
+                    self._pending[key] = pending
+                    pending.future.add_done_callback(
+                        lambda future, key=key, pending=pending: self._store(key, pending, future))
+                encoded = await self._wait(pending)
+                if joined:
+                    self.stats.cache_hits += 1
+        if source_key is not None:
+            with self._lock:
+                self._sources[source_key] = key
+                while len(self._sources) > self.max_entries:
+                    self._sources.popitem(last=False)
+        self._record(encoded)
+        return EncodedImage(encoded.payload, encoded.mime_type)
+
+    @staticmethod
+    async def _wait(pending: _Encoding) -> _Encoded:
+        """Wait for a shared encoding; cancelling one load only detaches it."""
+        pending.waiters += 1
+        try:
+            return await asyncio.shield(pending.future)
+        except asyncio.CancelledError:
+            if pending.waiters == 1:
+                pending.future.cancel()
+            raise
+        finally:
+            pending.waiters -= 1
+
+    def _store(self, key: str, pending: _Encoding, future: "asyncio.Future[_Encoded]") -> None:
+        """Cache a finished encoding."""
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self._cache[key] = future.result()
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _record(self, encoded: _Encoded) -> None:
+        self.stats.images += 1
+        self.stats.source_bytes += encoded.source_bytes
+        self.stats.payload_bytes += len(encoded.payload)
+        self.stats.source_tokens += vision_tokens(*encoded.source_size)
+        self.stats.tokens += vision_tokens(*encoded.size, detail=self.detail)
+
+    async def load_many(self, sources: Sequence[ImageSource]) -> List[EncodedImage]:
+        """Load images concurrently, up to the pipeline's limit, in the order given."""
+        return list(await asyncio.gather(*(self.load(source) for source in sources)))
+
+    def _cached(self, key: str) -> Optional[_Encoded]:
+        with self._lock:
+            encoded = self._cache.get(key)
+            if encoded is not None:
+                self._cache.move_to_end(key)
+                self.stats.cache_hits += 1
+            return encoded
+
+    def encode(self, data: bytes) -> _Encoded:
+        """Decode, downscale and encode image bytes in the smallest format; CPU-bound."""
+        with PILImage.open(BytesIO(data)) as source:
+            source_size = source.size
+            source.draft("RGB", target_size(*source_size, self.detail))  # Cheap JPEG downscale.
+            alpha = _has_alpha(source)
+            image = source.convert("RGBA" if alpha else "RGB")
+        size = target_size(*source_size, self.detail)
+        if image.size != size:
+            image = image.resize(size, PILImage.Resampling.LANCZOS)
+        # JPEG has no alpha channel: transparent areas would turn black.
+        formats = tuple(name for name in self.formats if not (alpha and name == "JPEG")) or ("PNG",)
+        best: Optional[bytes] = None
+        best_format = ""
+        # Lossless PNG only wins on flat images such as screenshots and diagrams.
+        photo = image.getcolors(256) is None
+        for name in formats:
+            if name == "PNG" and photo and len(formats) > 1:
+                continue
+            buffer = BytesIO()
+            image.save(buffer, format=name, quality=self.quality, optimize=True)
+            if best is None or buffer.tell() < len(best):
+                best, best_format = buffer.getvalue(), name
+        assert best is not None
+        return _Encoded(base64.b64encode(best).decode("ascii"), _MIME_TYPES[best_format],
+                        size, source_size, len(data))
+
+    async def close(self) -> None:
+        """Close the HTTP client used for URLs."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -0,0 +1,55 @@
+"""
+A fast-start launcher for the example scripts.
+
+Running an example directly imports the OpenAI SDK, ``azure.identity`` and every
+optional package the script mentions before its first line of real work, and
+then probes the Azure credential chain in the first model call. The launcher
+runs the same script with:
+
+- the heavy optional packages loaded lazily (see :mod:`autogen_exploration.lazy_imports`),
+- ``AUTOGEN_DEFER_CLIENTS=1``, so model clients, and the OpenAI SDK, are only
+  built when they are first used (for an agent with tools, when it is
+  constructed, unless ``model_info`` is passed to ``get_model_client``),
+- the Azure AD token fetched on a background thread while the script imports,
+  unless an API key or a replayed cassette makes it unnecessary.
+
+Usage:
+    uv run python -m autogen_exploration.launch src/quick-start/lesson_one.py [args...]
+"""
+
+import os
+import runpy
+import sys
+import threading
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from autogen_exploration.lazy_imports import install_lazy_imports
+
+
+def _prefetch_token() -> None:
+    from autogen_exploration.clients import get_token_provider
+
+    get_token_provider()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the script named by the first argument with the remaining arguments."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        sys.exit("usage: python -m autogen_exploration.launch <script> [args...]")
+    load_dotenv()
+    install_lazy_imports()
+    os.environ.setdefault("AUTOGEN_DEFER_CLIENTS", "1")
+    replaying = (bool(os.environ.get("AUTOGEN_CASSETTE"))
+                 and os.environ.get("AUTOGEN_CASSETTE_MODE", "replay") == "replay")
+    if not os.environ.get("AZURE_OPENAI_API_KEY") and not replaying:
+        threading.Thread(target=_prefetch_token, name="token-prefetch", daemon=True).start()
+    sys.argv = list(argv)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(argv[0])))
+    runpy.run_path(argv[0], run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
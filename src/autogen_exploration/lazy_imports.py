@@ -0,0 +1,88 @@
+"""
+Lazy loading of heavy optional modules.
+
+Several examples import packages such as pandas, SQLAlchemy, ChromaDB or the
+Magentic-One agents at the top of the script, and pay for them on start-up even
+when the code that needs them runs much later, or not at all. :func:`install_lazy_imports`
+makes ``import pandas`` return a module object straight away and executes the
+module on its first attribute access, using ``importlib.util.LazyLoader``.
+
+Only ``import x`` (and ``import x.y``) is deferred. ``from x import Name`` reads an
+attribute of the module, so it still loads the module on the spot.
+
+Usage:
+    from autogen_exploration.lazy_imports import install_lazy_imports
+
+    install_lazy_imports()
+"""
+
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import sys
+import threading
+from typing import Iterable, Optional, Sequence
+
+DEFAULT_LAZY_MODULES = (
+    "pandas",
+    "PIL",
+    "sqlalchemy",
+    "chromadb",
+    "playwright",
+    "langchain_community",
+    "langchain_experimental",
+    "langchain_openai",
+    "autogen_ext.agents.web_surfer",
+    "autogen_ext.agents.file_surfer",
+    "autogen_ext.teams.magentic_one",
+)
+
+
+class LazyImportFinder(importlib.abc.MetaPathFinder):
+    """
+    A meta path finder that hands out lazily loaded specs for a set of modules.
+
+    The spec is found by the other finders on ``sys.meta_path``; only its loader is
+    wrapped. Submodules of the listed modules are not made lazy.
+
+    :param modules: Names of the modules to load lazily.
+    """
+
+    def __init__(self, modules: Iterable[str]) -> None:
+        self.modules = frozenset(modules)
+        self._finding = threading.local()
+
+    def find_spec(self, fullname: str, path: Optional[Sequence[str]],
+                  target=None) -> Optional[importlib.machinery.ModuleSpec]:
+        if fullname not in self.modules or getattr(self._finding, "active", False):
+            return None
+        self._finding.active = True
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            self._finding.active = False
+        # Extension modules are created eagerly anyway and namespace packages are cheap.
+        if spec is None or not isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+            return spec
+        spec.loader = importlib.util.LazyLoader(spec.loader)
+        return spec
+
+
+def install_lazy_imports(modules: Iterable[str] = DEFAULT_LAZY_MODULES) -> LazyImportFinder:
+    """
+    Load the given modules lazily from now on.
+
+    Modules that are already imported stay as they are. Calling it again replaces
+    the previous set of modules.
+
+    Args:
+        modules (Iterable[str]): Names of the modules to load lazily.
+
+    Returns:
+        LazyImportFinder: The installed finder.
+    """
+    sys.meta_path[:] = [finder for finder in sys.meta_path
+                        if not isinstance(finder, LazyImportFinder)]
+    finder = LazyImportFinder(name for name in modules if name not in sys.modules)
+    sys.meta_path.insert(0, finder)
+    return finder
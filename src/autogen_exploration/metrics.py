@@ -0,0 +1,45 @@
+"""
+Small helpers for summarizing latency samples collected by the benchmarks.
+"""
+
+import math
+from typing import Dict, Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """
+    Return the ``pct`` percentile of ``samples`` using the nearest-rank method.
+
+    Args:
+        samples (Sequence[float]): The measured values, in any order.
+        pct (float): The percentile to compute, between 0 and 100.
+
+    Returns:
+        float: The percentile value, or 0.0 when there are no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(samples: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarize latency samples (in seconds) as milliseconds.
+
+    Args:
+        samples (Sequence[float]): The measured latencies in seconds.
+
+    Returns:
+        Dict[str, float]: The count, mean, p50, p95, p99 and max in milliseconds.
+    """
+    count = len(samples)
+    return {
+        "count": count,
+        "mean_ms": (sum(samples) / count * 1000) if count else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": (max(samples) * 1000) if count else 0.0,
+    }
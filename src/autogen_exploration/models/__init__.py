@@ -0,0 +1,147 @@
+"""
+Model client wrappers that add caching, coalescing, scheduling, routing and
+other behavior to any ``ChatCompletionClient``.
+
+The wrappers are imported on first access, so that importing one of them does
+not import the OpenAI SDK along with the others.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from autogen_exploration.models.base import DelegatingChatCompletionClient
+    from autogen_exploration.models.budget import (
+        BudgetedChatCompletionClient,
+        CounterStats,
+        RequestPrediction,
+        TokenBudget,
+        TokenBudgetExceededError,
+        TokenCounter,
+        get_encoding,
+        get_token_counter,
+    )
+    from autogen_exploration.models.cache import (
+        CachedResponse,
+        CacheStats,
+        CachingChatCompletionClient,
+        ResponseCache,
+    )
+    from autogen_exploration.models.deferred import DeferredChatCompletionClient
+    from autogen_exploration.models.keys import effective_create_args, request_key
+    from autogen_exploration.models.replay import (
+        Cassette,
+        CassetteChatCompletionClient,
+        CassetteEntry,
+        CassetteMissError,
+    )
+    from autogen_exploration.models.routing import (
+        Backend,
+        BackendStats,
+        RoutingChatCompletionClient,
+        RoutingStats,
+        is_backend_failure,
+    )
+    from autogen_exploration.models.scheduler import (
+        Admission,
+        Priority,
+        RateLimitScheduler,
+        ScheduledChatCompletionClient,
+        SchedulerStats,
+        TokenBucket,
+        estimate_prompt_tokens,
+        retry_after_seconds,
+    )
+    from autogen_exploration.models.singleflight import (
+        SingleFlightChatCompletionClient,
+        SingleFlightStats,
+    )
+
+_EXPORTS = {
+    "Admission": "scheduler",
+    "Backend": "routing",
+    "BackendStats": "routing",
+    "BudgetedChatCompletionClient": "budget",
+    "CacheStats": "cache",
+    "CachedResponse": "cache",
+    "CachingChatCompletionClient": "cache",
+    "Cassette": "replay",
+    "CassetteChatCompletionClient": "replay",
+    "CassetteEntry": "replay",
+    "CassetteMissError": "replay",
+    "CounterStats": "budget",
+    "DeferredChatCompletionClient": "deferred",
+    "DelegatingChatCompletionClient": "base",
+    "Priority": "scheduler",
+    "RateLimitScheduler": "scheduler",
+    "RequestPrediction": "budget",
+    "ResponseCache": "cache",
+    "RoutingChatCompletionClient": "routing",
+    "RoutingStats": "routing",
+    "ScheduledChatCompletionClient": "scheduler",
+    "SchedulerStats": "scheduler",
+    "SingleFlightChatCompletionClient": "singleflight",
+    "SingleFlightStats": "singleflight",
+    "TokenBucket": "scheduler",
+    "TokenBudget": "budget",
+    "TokenBudgetExceededError": "budget",
+    "TokenCounter": "budget",
+    "effective_create_args": "keys",
+    "estimate_prompt_tokens": "scheduler",
+    "get_encoding": "budget",
+    "get_token_counter": "budget",
+    "is_backend_failure": "routing",
+    "request_key": "keys",
+    "retry_after_seconds": "scheduler",
+}
+
+__all__ = [
+    "Admission",
+    "Backend",
+    "BackendStats",
+    "BudgetedChatCompletionClient",
+    "CacheStats",
+    "CachedResponse",
+    "CachingChatCompletionClient",
+    "Cassette",
+    "CassetteChatCompletionClient",
+    "CassetteEntry",
+    "CassetteMissError",
+    "CounterStats",
+    "DeferredChatCompletionClient",
+    "DelegatingChatCompletionClient",
+    "Priority",
+    "RateLimitScheduler",
+    "RequestPrediction",
+    "ResponseCache",
+    "RoutingChatCompletionClient",
+    "RoutingStats",
+    "ScheduledChatCompletionClient",
+    "SchedulerStats",
+    "SingleFlightChatCompletionClient",
+    "SingleFlightStats",
+    "TokenBucket",
+    "TokenBudget",
+    "TokenBudgetExceededError",
+    "TokenCounter",
+    "effective_create_args",
+    "estimate_prompt_tokens",
+    "get_encoding",
+    "get_token_counter",
+    "is_backend_failure",
+    "request_key",
+    "retry_after_seconds",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,103 @@
+"""
+A base class for model clients that wrap another model client.
+"""
+
+import warnings
+from typing import Any, AsyncGenerator, Literal, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,  # type: ignore
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+
+class DelegatingChatCompletionClient(ChatCompletionClient):
+    """
+    A model client that forwards every call to the client it wraps.
+
+    Subclasses override :meth:`create` and :meth:`create_stream` to add behavior
+    such as caching or scheduling, and inherit the usage, token counting and model
+    info methods unchanged.
+
+    :param client: The model client to wrap.
+    """
+
+    def __init__(self, client: ChatCompletionClient) -> None:
+        self._client = client
+
+    @property
+    def client(self) -> ChatCompletionClient:
+        """The wrapped model client."""
+        return self._client
+
+    async def create(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        return await self._client.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    def create_stream(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        return self._client.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *,
+                     tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *,
+                         tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        warnings.warn("capabilities is deprecated, use model_info instead",
+                      DeprecationWarning, stacklevel=2)
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
@@ -0,0 +1,384 @@
+"""
+Pre-flight token counting and token budgets.
+
+:class:`BudgetedChatCompletionClient` counts the prompt tokens of every request
+before it is sent and refuses requests that would overrun a budget: one per
+agent, one per team run, or any other grouping, since a request is charged to
+every budget its client holds. After the answer arrives the budgets are charged
+with the actual usage, and the client records the predicted prompt tokens of the
+request next to the actual ones in its ``predictions``. Results are returned
+unchanged, so the ``models_usage`` of messages stays a plain ``RequestUsage``
+that serializes like any other.
+
+Conversations in a team grow by one message per turn and every agent resends
+the same history, so :class:`TokenCounter` memoizes the token count of each
+message and only tokenizes the messages it has not seen. The tokenizer itself
+is loaded once per model. When tiktoken cannot load its encoding (it is
+downloaded on first use), tokens are estimated from the text length instead.
+"""
+
+import functools
+import json
+import logging
+import math
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncGenerator,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from autogen_core import CancellationToken, FunctionCall, Image
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    FunctionExecutionResult,
+    LLMMessage,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+from autogen_exploration.models.keys import effective_create_args
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+# OpenAI's accounting: every message is wrapped in a few tokens, and the reply is
+# primed with a few more.
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+# The cost of a high-detail 1024x1024 image; the exact cost depends on its size.
+TOKENS_PER_IMAGE = 765
+# Characters per token when no tokenizer is available.
+CHARS_PER_TOKEN = 4
+MAX_MEMO_ENTRIES = 4096
+MAX_PREDICTIONS = 1024
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model: str) -> Any:
+    """
+    Return the tiktoken encoding of a model, loading it only once per process.
+
+    Returns:
+        Any: The encoding, or None when tiktoken cannot load it.
+    """
+    try:
+        import tiktoken  # pylint: disable=import-outside-toplevel
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        logger.warning("No tokenizer for %s (%s), estimating tokens from text length.",
+                       model, type(error).__name__)
+        return None
+
+
+def _message_parts(message: LLMMessage) -> Tuple[str, int]:
+    """Return the text of a message and its number of images."""
+    content = message.content
+    if isinstance(content, str):
+        return content, 0
+    texts: List[str] = []
+    images = 0
+    for part in content:
+        if isinstance(part, Image):
+            images += 1
+        elif isinstance(part, FunctionCall):
+            texts.append(part.name)
+            texts.append(part.arguments)
+        elif isinstance(part, FunctionExecutionResult):
+            texts.append(part.content)
+        else:
+            texts.append(str(part))
+    return "\n".join(texts), images
+
+
+@dataclass
+class CounterStats:
+    """Memoization counters of a :class:`TokenCounter`."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+class TokenCounter:
+    """
+    Counts the prompt tokens of requests, memoizing the count of every message.
+
+    :param model: The model name or family, used to pick the tokenizer.
+    :param max_entries: Messages and tool schemas whose counts are remembered, 0 for none.
+    """
+
+    def __init__(self, model: str = "gpt-4o", max_entries: int = MAX_MEMO_ENTRIES) -> None:
+        self.model = model
+        self.max_entries = max_entries
+        self.stats = CounterStats()
+        self._memo: "OrderedDict[Tuple[Any, ...], int]" = OrderedDict()
+
+    def count_text(self, text: str) -> int:
+        """Return the tokens of a text, without memoization."""
+        encoding = get_encoding(self.model)
+        if encoding is None:
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def _memoized(self, key: Tuple[Any, ...], text: str) -> int:
+        tokens = self._memo.get(key)
+        if tokens is not None:
+            self.stats.hits += 1
+            self._memo.move_to_end(key)
+            return tokens
+        self.stats.misses += 1
+        tokens = self.count_text(text)
+        if self.max_entries:
+            self._memo[key] = tokens
+            if len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return tokens
+
+    def count_message(self, message: LLMMessage) -> int:
+        """Return the tokens a message adds to a prompt."""
+        text, images = _message_parts(message)
+        return (TOKENS_PER_MESSAGE + images * TOKENS_PER_IMAGE
+                + self._memoized((type(message).__name__, text), text))
+
+    def count_tool(self, tool: Tool | ToolSchema) -> int:
+        """Return the tokens a tool definition adds to a prompt."""
+        schema = json.dumps(tool.schema if isinstance(tool, Tool) else tool, sort_keys=True)
+        return self._memoized(("tool", schema), schema)
+
+    def count(self, messages: Sequence[LLMMessage],
+              tools: Sequence[Tool | ToolSchema] = ()) -> int:
+        """Return the prompt tokens of a request."""
+        return (TOKENS_PER_REPLY + sum(self.count_message(message) for message in messages)
+                + sum(self.count_tool(tool) for tool in tools))
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_counter(model: str = "gpt-4o") -> TokenCounter:
+    """Return the process-wide token counter of a model, shared by every agent."""
+    return TokenCounter(model)
+
+
+class TokenBudgetExceededError(Exception):
+    """A request would use more tokens than a budget has left."""
+
+    def __init__(self, budget: "TokenBudget", tokens: int) -> None:
+        super().__init__(f"Token budget {budget.name!r} exceeded: the request needs {tokens} "
+                         f"tokens, {budget.remaining} of {budget.limit} are left.")
+        self.budget = budget
+        self.tokens = tokens
+
+
+class TokenBudget:
+    """
+    A number of tokens that a set of requests may use.
+
+    Requests reserve their predicted tokens before they are sent, so concurrent
+    requests cannot overrun the budget together, and the reservation is replaced by
+    the actual usage once the answer arrives.
+
+    :param limit: The prompt and completion tokens the requests may use.
+    :param name: A name for error messages and reports, such as the agent name.
+    """
+
+    def __init__(self, limit: int, name: str = "budget") -> None:
+        self.limit = limit
+        self.name = name
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all usage, for example before the next run of a team."""
+        self.used = 0
+        self.reserved = 0
+        self.requests = 0
+        self.rejected = 0
+        self.predicted_prompt_tokens = 0
+        self.actual_prompt_tokens = 0
+
+    @property
+    def remaining(self) -> int:
+        """The tokens neither used nor reserved."""
+        return self.limit - self.used - self.reserved
+
+    def reserve(self, tokens: int) -> None:
+        """Reserve tokens for a request, raising TokenBudgetExceededError if they do not fit."""
+        if tokens > self.remaining:
+            self.rejected += 1
+            raise TokenBudgetExceededError(self, tokens)
+        self.reserved += tokens
+
+    def release(self, reserved: int) -> None:
+        """Give back a reservation of a request that failed."""
+        self.reserved -= reserved
+
+    def charge(self, reserved: int, predicted_prompt_tokens: int, usage: RequestUsage) -> None:
+        """Replace a reservation with the actual usage of the request."""
+        self.reserved -= reserved
+        self.used += usage.prompt_tokens + usage.completion_tokens
+        self.requests += 1
+        self.predicted_prompt_tokens += predicted_prompt_tokens
+        self.actual_prompt_tokens += usage.prompt_tokens
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the usage of the budget and the accuracy of the predictions."""
+        error = ((self.predicted_prompt_tokens - self.actual_prompt_tokens)
+                 / self.actual_prompt_tokens * 100 if self.actual_prompt_tokens else 0.0)
+        return {
+            "limit": self.limit,
+            "used": self.used,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "predicted_prompt_tokens": self.predicted_prompt_tokens,
+            "actual_prompt_tokens": self.actual_prompt_tokens,
+            "prediction_error_percent": round(error, 1),
+        }
+
+
+@dataclass
+class RequestPrediction:
+    """The prompt tokens of a request predicted before sending, and its actual usage."""
+
+    predicted_prompt_tokens: int
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class BudgetedChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    A model client that charges every request to one or more token budgets.
+
+    A request reserves its predicted prompt tokens plus ``completion_reserve`` (or
+    its ``max_tokens``) in every budget and is refused with
+    :class:`TokenBudgetExceededError` when any budget cannot cover them. Token
+    counting for the agent's model context uses the same memoizing counter.
+
+    The predicted and actual tokens of the last ``MAX_PREDICTIONS`` requests are
+    kept in :attr:`predictions`, oldest first.
+
+    :param client: The model client to wrap, usually the shared one.
+    :param budgets: The budgets to charge, such as the agent's and the team run's.
+    :param counter: The token counter, defaults to the shared counter of the model family.
+    :param completion_reserve: Tokens reserved for the answer when neither the request nor
+        the client sets ``max_completion_tokens`` or ``max_tokens``.
+    """
+
+    def __init__(self, client: ChatCompletionClient, budgets: Sequence[TokenBudget] = (),
+                 counter: Optional[TokenCounter] = None, completion_reserve: int = 0) -> None:
+        super().__init__(client)
+        self.budgets = list(budgets)
+        self._counter = counter
+        self.completion_reserve = completion_reserve
+        self.predictions: Deque[RequestPrediction] = deque(maxlen=MAX_PREDICTIONS)
+
+    @property
+    def counter(self) -> TokenCounter:
+        """The token counter, resolved on first use so that a deferred client stays unbuilt."""
+        if self._counter is None:
+            self._counter = get_token_counter(self.model_info.get("family", "gpt-4o"))
+        return self._counter
+
+    def _reserve(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema],
+                 extra_create_args: Mapping[str, Any]) -> Tuple[int, int]:
+        predicted = self.counter.count(messages, tools)
+        create_args = effective_create_args(self._client, extra_create_args)
+        completion = (create_args.get("max_completion_tokens") or create_args.get("max_tokens")
+                      or self.completion_reserve)
+        reservation = predicted + completion
+        reserved: List[TokenBudget] = []
+        try:
+            for budget in self.budgets:
+                budget.reserve(reservation)
+                reserved.append(budget)
+        except TokenBudgetExceededError:
+            for budget in reserved:
+                budget.release(reservation)
+            raise
+        return predicted, reservation
+
+    def _charge(self, result: CreateResult, predicted: int, reservation: int) -> CreateResult:
+        for budget in self.budgets:
+            budget.charge(reservation, predicted, result.usage)
+        self.predictions.append(RequestPrediction(predicted_prompt_tokens=predicted,
+                                                  prompt_tokens=result.usage.prompt_tokens,
+                                                  completion_tokens=result.usage.completion_tokens))
+        return result
+
+    def _release(self, reservation: int) -> None:
+        for budget in self.budgets:
+            budget.release(reservation)
+
+    async def create(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        predicted, reservation = self._reserve(messages, tools, extra_create_args)
+        try:
+            result = await self._client.create(
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            )
+        except BaseException:
+            self._release(reservation)
+            raise
+        return self._charge(result, predicted, reservation)
+
+    def create_stream(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async def _generator() -> AsyncGenerator[Union[str, CreateResult], None]:
+            predicted, reservation = self._reserve(messages, tools, extra_create_args)
+            charged = False
+            try:
+                async for item in self._client.create_stream(
+                        messages,
+                        tools=tools,
+                        tool_choice=tool_choice,
+                        json_output=json_output,
+                        extra_create_args=extra_create_args,
+                        cancellation_token=cancellation_token,
+                ):
+                    if isinstance(item, CreateResult):
+                        item = self._charge(item, predicted, reservation)
+                        charged = True
+                    yield item
+            finally:
+                if not charged:
+                    self._release(reservation)
+
+        return _generator()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *,
+                     tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.counter.count(messages, tools)
@@ -0,0 +1,334 @@
+"""
+A persistent response cache for model clients.
+
+:class:`CachingChatCompletionClient` answers repeated requests (the same messages,
+tools, response format and sampling parameters) from a :class:`ResponseCache`
+instead of calling the model again. The cache has an in-memory LRU tier in front
+of an optional on-disk SQLite tier, both bounded by size and time to live.
+
+Sampling with a non-zero temperature is random by design, so those requests are
+only cached when the client is created with ``cache_nonzero_temperature=True``.
+Requests that do not set a temperature use the service default of 1.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+from autogen_exploration.models.keys import effective_create_args, request_key
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class CachedResponse:
+    """
+    A cached model response.
+
+    :param result: The final result of the request.
+    :param chunks: The streamed text chunks, or None when the request was not streamed.
+    :param latency: Seconds the original request took.
+    """
+
+    result: CreateResult
+    chunks: Optional[List[str]]
+    latency: float
+
+    def to_json(self) -> str:
+        """Serialize the response for the disk tier."""
+        return json.dumps({
+            "result": self.result.model_dump(mode="json"),
+            "chunks": self.chunks,
+            "latency": self.latency,
+        })
+
+    @classmethod
+    def from_json(cls, data: str) -> "CachedResponse":
+        """Deserialize a response stored by :meth:`to_json`."""
+        value = json.loads(data)
+        return cls(result=CreateResult.model_validate(value["result"]),
+                   chunks=value["chunks"], latency=value["latency"])
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how well the cache is doing."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    latency_saved: float = 0.0
+
+    @property
+    def hits(self) -> int:
+        """The number of requests answered from either tier."""
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of cacheable requests answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters as a flat dictionary, handy for printing."""
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hit_rate, 3),
+            "latency_saved_s": round(self.latency_saved, 3),
+        }
+
+
+class ResponseCache:
+    """
+    A two-tier response store: an in-memory LRU in front of an optional SQLite file.
+
+    :param path: The SQLite file of the disk tier, or None for a memory-only cache.
+    :param max_entries: Maximum number of responses kept in memory.
+    :param max_bytes: Maximum total size of the responses kept on disk.
+    :param ttl: Seconds a response stays valid, or None to keep responses until evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 max_bytes: int = DEFAULT_DISK_BYTES, ttl: Optional[float] = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Look a response up, memory tier first.
+
+        Args:
+            key (str): The canonical request key.
+
+        Returns:
+            Optional[CachedResponse]: The response, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, response = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                    return response
+                del self._memory[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?",
+                                         (now, key))
+                        response = CachedResponse.from_json(row[0])
+                        self._remember(key, row[1], response)
+                        self.stats.disk_hits += 1
+                        return response
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.stats.misses += 1
+            return None
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        """
+        Store a response in both tiers, evicting the least recently used entries.
+
+        Args:
+            key (str): The canonical request key.
+            response (CachedResponse): The response to store.
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            if self._db is not None:
+                value = response.to_json()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?)", (key, value, len(value), now, now))
+                self._evict_disk(now)
+
+    def _remember(self, key: str, created: float, response: CachedResponse) -> None:
+        self._memory[key] = (created, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float) -> None:
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """Drop every cached response from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachingChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    A model client that answers repeated requests from a :class:`ResponseCache`.
+
+    Cached results are returned with ``cached=True``, and cached streams replay the
+    original chunks before the final result.
+
+    :param client: The model client to wrap.
+    :param cache: The response store, defaults to a memory-only cache.
+    :param cache_nonzero_temperature: Also cache requests sampled with a non-zero temperature.
+    """
+
+    def __init__(self, client: ChatCompletionClient, cache: Optional[ResponseCache] = None,
+                 cache_nonzero_temperature: bool = False) -> None:
+        super().__init__(client)
+        self.cache = cache or ResponseCache()
+        self.cache_nonzero_temperature = cache_nonzero_temperature
+
+    @property
+    def stats(self) -> CacheStats:
+        """The hit, miss and latency-saved counters of the cache."""
+        return self.cache.stats
+
+    def _lookup(
+            self,
+            messages: Sequence[LLMMessage],
+            tools: Sequence[Tool | ToolSchema],
+            tool_choice: Tool | Literal["auto", "required", "none"],
+            json_output: Optional[bool | type[BaseModel]],
+            extra_create_args: Mapping[str, Any],
+    ) -> Tuple[Optional[str], Optional[CachedResponse]]:
+        temperature = effective_create_args(self._client, extra_create_args).get("temperature", 1)
+        if temperature and not self.cache_nonzero_temperature:
+            self.cache.stats.bypassed += 1
+            return None, None
+        key = request_key(self._client, messages, tools=tools, tool_choice=tool_choice,
+                          json_output=json_output, extra_create_args=extra_create_args)
+        start = time.perf_counter()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.stats.latency_saved += max(cached.latency - (time.perf_counter() - start), 0)
+        return key, cached
+
+    async def create(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        key, cached = self._lookup(messages, tools, tool_choice, json_output, extra_create_args)
+        if cached is not None:
+            return cached.result.model_copy(update={"cached": True})
+        start = time.perf_counter()
+        result = await self._client.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+        if key is not None:
+            self.cache.set(key, CachedResponse(result, None, time.perf_counter() - start))
+        return result
+
+    def create_stream(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async def _generator() -> AsyncGenerator[Union[str, CreateResult], None]:
+            key, cached = self._lookup(messages, tools, tool_choice, json_output,
+                                       extra_create_args)
+            if cached is not None:
+                for chunk in cached.chunks or []:
+                    yield chunk
+                yield cached.result.model_copy(update={"cached": True})
+                return
+            start = time.perf_counter()
+            chunks: List[str] = []
+            async for item in self._client.create_stream(
+                    messages,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+            ):
+                if isinstance(item, CreateResult):
+                    if key is not None:
+                        self.cache.set(key, CachedResponse(item, chunks,
+                                                           time.perf_counter() - start))
+                else:
+                    chunks.append(item)
+                yield item
+
+        return _generator()
+
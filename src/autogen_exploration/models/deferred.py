@@ -0,0 +1,66 @@
+"""
+A model client that is only built when it is first used.
+
+Building an ``AzureOpenAIChatCompletionClient`` imports the OpenAI SDK and, with
+Azure AD authentication, ``azure.identity``, which together take most of a second.
+The examples build their client at module level, so that cost is paid before the
+script has done anything else. :class:`DeferredChatCompletionClient` stands in for
+the client until the first call, so agent and team construction and the imports
+they need run first.
+
+``AssistantAgent`` reads the client's ``model_info`` when it is given tools, to
+check that the model can call functions. Unless the model info is passed in, that
+builds the client while the agent is constructed, as most examples do at module
+level; pass it to keep those clients deferred.
+"""
+
+import threading
+from typing import Callable, Optional
+
+from autogen_core.models import ChatCompletionClient, ModelInfo
+
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+
+
+class DeferredChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    A model client that builds the client it wraps on first use.
+
+    Any call builds the client, and so does reading ``model_info`` unless it was
+    given. Closing a client that was never built does nothing.
+
+    :param factory: Builds the model client to wrap.
+    :param model_info: The model info of the client the factory builds, returned
+        without building it.
+    """
+
+    # pylint: disable-next=super-init-not-called
+    def __init__(self, factory: Callable[[], ChatCompletionClient],
+                 model_info: Optional[ModelInfo] = None) -> None:
+        self._factory = factory
+        self._model_info = model_info
+        self._built: Optional[ChatCompletionClient] = None
+        self._build_lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        """True once the wrapped client has been built."""
+        return self._built is not None
+
+    @property
+    def _client(self) -> ChatCompletionClient:  # type: ignore[override]
+        if self._built is None:
+            with self._build_lock:
+                if self._built is None:
+                    self._built = self._factory()
+        return self._built
+
+    @property
+    def model_info(self) -> ModelInfo:
+        if self._model_info is not None:
+            return self._model_info
+        return self._client.model_info
+
+    async def close(self) -> None:
+        if self._built is not None:
+            await self._built.close()
@@ -0,0 +1,76 @@
+"""
+Canonical keys for model requests.
+
+Two requests get the same key when they would produce the same completion: the
+same messages, tools, tool choice, response format and sampling parameters, sent
+to the same model. The keys are used to cache, coalesce and replay requests.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Literal, Mapping, Optional, Sequence
+
+from autogen_core.models import ChatCompletionClient, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+
+def effective_create_args(client: ChatCompletionClient,
+                          extra_create_args: Mapping[str, Any] = {}) -> Dict[str, Any]:
+    """
+    Return the create arguments a request is sent with.
+
+    These are the arguments the client was configured with (model, temperature,
+    seed, ...) overridden by the per-request ``extra_create_args``.
+
+    Args:
+        client (ChatCompletionClient): The client the request is sent to.
+        extra_create_args (Mapping[str, Any]): The per-request arguments.
+
+    Returns:
+        Dict[str, Any]: The merged create arguments.
+    """
+    # Wrapping clients expose the client they delegate to.
+    while hasattr(client, "client") and isinstance(client.client, ChatCompletionClient):
+        client = client.client
+    create_args = dict(getattr(client, "_create_args", {}))
+    create_args.update(extra_create_args)
+    return create_args
+
+
+def request_key(
+        client: ChatCompletionClient,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+) -> str:
+    """
+    Return the canonical SHA-256 key of a model request.
+
+    Args:
+        client (ChatCompletionClient): The client the request is sent to.
+        messages (Sequence[LLMMessage]): The messages of the request.
+        tools (Sequence[Tool | ToolSchema]): The tools offered to the model.
+        tool_choice (Tool | Literal["auto", "required", "none"]): The tool choice.
+        json_output (Optional[bool | type[BaseModel]]): JSON mode or the structured output type.
+        extra_create_args (Mapping[str, Any]): The per-request create arguments.
+
+    Returns:
+        str: The hex digest identifying the request.
+    """
+    if isinstance(json_output, type) and issubclass(json_output, BaseModel):
+        response_format: Any = json_output.model_json_schema()
+    else:
+        response_format = json_output
+    data = {
+        "create_args": effective_create_args(client, extra_create_args),
+        "messages": [message.model_dump(mode="json") for message in messages],
+        "tools": [tool.schema if isinstance(tool, Tool) else tool for tool in tools],
+        "tool_choice": tool_choice.name if isinstance(tool_choice, Tool) else tool_choice,
+        "response_format": response_format,
+    }
+    serialized = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
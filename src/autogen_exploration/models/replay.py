@@ -0,0 +1,261 @@
+"""
+Record and replay model exchanges with a cassette file.
+
+In ``record`` mode :class:`CassetteChatCompletionClient` forwards every request to
+the real model client and writes the exchange to a cassette: the final result
+(text or tool calls, and usage), the latency and, for streams, the time offset of
+every chunk. In ``replay`` mode it serves the same requests from the cassette
+without touching the network, either at the recorded pace or ``speed`` times
+faster (``speed=0`` replays instantly). This gives reproducible, offline runs for
+measuring framework overhead.
+
+A cassette is a gzip-compressed JSON Lines file with one exchange per line.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncGenerator,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+from autogen_exploration.models.keys import request_key
+
+CassetteMode = Literal["record", "replay"]
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+@dataclass
+class CassetteEntry:
+    """
+    One recorded exchange.
+
+    :param key: The canonical request key.
+    :param result: The final result of the request.
+    :param latency: Seconds the request took.
+    :param chunks: ``(offset, text)`` pairs for streamed requests, where the offset is
+        the number of seconds since the request started, or None when not streamed.
+    """
+
+    key: str
+    result: CreateResult
+    latency: float
+    chunks: Optional[List[Tuple[float, str]]] = None
+
+    def to_json(self) -> str:
+        """Serialize the exchange as one cassette line."""
+        return json.dumps({
+            "key": self.key,
+            "result": self.result.model_dump(mode="json"),
+            "latency": round(self.latency, 6),
+            "chunks": [[round(offset, 6), text] for offset, text in self.chunks]
+            if self.chunks is not None else None,
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str) -> "CassetteEntry":
+        """Deserialize a cassette line written by :meth:`to_json`."""
+        value = json.loads(line)
+        chunks = value.get("chunks")
+        return cls(
+            key=value["key"],
+            result=CreateResult.model_validate(value["result"]),
+            latency=value["latency"],
+            chunks=[(offset, text) for offset, text in chunks] if chunks is not None else None,
+        )
+
+
+class Cassette:
+    """
+    The exchanges stored in a cassette file.
+
+    Recorded exchanges are appended to the file as they complete. On replay, the
+    exchanges recorded for the same request are served in the order they were
+    recorded, and the last one keeps being served once they run out.
+
+    :param path: The cassette file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._entries: Dict[str, Deque[CassetteEntry]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        entry = CassetteEntry.from_json(line)
+                        self._entries[entry.key].append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def append(self, entry: CassetteEntry) -> None:
+        """Record an exchange and append it to the file."""
+        with self._lock:
+            self._entries[entry.key].append(entry)
+            with gzip.open(self.path, "at", encoding="utf-8") as file:
+                file.write(entry.to_json() + "\n")
+
+    def next(self, key: str) -> CassetteEntry:
+        """
+        Return the next recorded exchange for a request.
+
+        Args:
+            key (str): The canonical request key.
+
+        Returns:
+            CassetteEntry: The recorded exchange.
+
+        Raises:
+            CassetteMissError: When the request was never recorded.
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(
+                    f"No recorded exchange for request {key} in {self.path}. "
+                    "Record the run again with AUTOGEN_CASSETTE_MODE=record.")
+            return entries.popleft() if len(entries) > 1 else entries[0]
+
+
+class CassetteChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    A model client that records exchanges to, or replays them from, a :class:`Cassette`.
+
+    The wrapped client is only called in record mode. In replay mode it still
+    provides the model info, token counting and create arguments that make up the
+    request keys, so it can be constructed with placeholder credentials.
+
+    :param client: The real model client.
+    :param cassette: The cassette to record to or replay from.
+    :param mode: ``record`` or ``replay``.
+    :param speed: Replay speed relative to the recording, 0 replays instantly.
+    """
+
+    def __init__(self, client: ChatCompletionClient, cassette: Cassette,
+                 mode: CassetteMode = "replay", speed: float = 1.0) -> None:
+        super().__init__(client)
+        self.cassette = cassette
+        self.mode = mode
+        self.speed = speed
+        self._actual_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self._total_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    async def _pause(self, seconds: float, cancellation_token: Optional[CancellationToken]) -> None:
+        if self.speed > 0 and seconds > 0:
+            sleep = asyncio.ensure_future(asyncio.sleep(seconds / self.speed))
+            if cancellation_token is not None:
+                cancellation_token.link_future(sleep)
+            await sleep
+
+    def _add_usage(self, usage: RequestUsage) -> None:
+        self._actual_usage = RequestUsage(
+            prompt_tokens=self._actual_usage.prompt_tokens + usage.prompt_tokens,
+            completion_tokens=self._actual_usage.completion_tokens + usage.completion_tokens,
+        )
+        self._total_usage = self._actual_usage
+
+    async def create(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        key = request_key(self._client, messages, tools=tools, tool_choice=tool_choice,
+                          json_output=json_output, extra_create_args=extra_create_args)
+        if self.mode == "replay":
+            entry = self.cassette.next(key)
+            await self._pause(entry.latency, cancellation_token)
+            self._add_usage(entry.result.usage)
+            return entry.result.model_copy(deep=True)
+
+        start = time.perf_counter()
+        result = await self._client.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+        self.cassette.append(CassetteEntry(key, result, time.perf_counter() - start))
+        return result
+
+    def create_stream(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        key = request_key(self._client, messages, tools=tools, tool_choice=tool_choice,
+                          json_output=json_output, extra_create_args=extra_create_args)
+
+        async def _replay() -> AsyncGenerator[Union[str, CreateResult], None]:
+            entry = self.cassette.next(key)
+            previous = 0.0
+            for offset, text in entry.chunks or []:
+                await self._pause(offset - previous, cancellation_token)
+                previous = offset
+                yield text
+            await self._pause(entry.latency - previous, cancellation_token)
+            self._add_usage(entry.result.usage)
+            yield entry.result.model_copy(deep=True)
+
+        async def _record() -> AsyncGenerator[Union[str, CreateResult], None]:
+            start = time.perf_counter()
+            chunks: List[Tuple[float, str]] = []
+            async for item in self._client.create_stream(
+                    messages,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+            ):
+                if isinstance(item, CreateResult):
+                    self.cassette.append(
+                        CassetteEntry(key, item, time.perf_counter() - start, chunks))
+                else:
+                    chunks.append((time.perf_counter() - start, item))
+                yield item
+
+        return _replay() if self.mode == "replay" else _record()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._actual_usage if self.mode == "replay" else self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._total_usage if self.mode == "replay" else self._client.total_usage()
@@ -0,0 +1,340 @@
+"""
+Load balancing and hedging across several deployments of the same model.
+
+:class:`RoutingChatCompletionClient` spreads requests over a set of backends
+(deployments, possibly in different regions) by sending each one to the healthy
+backend with the fewest outstanding requests. A backend that fails several
+requests in a row (connection errors, ``429`` and ``5xx`` answers) is ejected for
+a while, and a failed request fails over to the next backend.
+
+With hedging switched on, a ``create()`` call that takes longer than its backend's
+p95 latency is duplicated to a second backend; the first answer wins and the
+other request is cancelled. This trims the latency tail at the price of a few
+percent extra requests.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncGenerator,
+    Deque,
+    Dict,
+    Iterable,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from openai import APIConnectionError, APIStatusError
+from pydantic import BaseModel
+
+from autogen_exploration.metrics import percentile, summarize_latencies
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+HISTOGRAM_BOUNDS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+MAX_LATENCY_SAMPLES = 1000
+# Weight of the newest sample in the moving latency average used to break ties.
+EWMA_WEIGHT = 0.2
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """Return True for errors that say the backend, not the request, is at fault."""
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and (error.status_code == 429
+                                                  or error.status_code >= 500)
+
+
+class BackendStats:
+    """Request, failure and latency counters of one backend."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.latencies: Deque[float] = deque(maxlen=MAX_LATENCY_SAMPLES)
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a successful request."""
+        self.latencies.append(seconds)
+        milliseconds = seconds * 1000
+        bucket = next((index for index, bound in enumerate(HISTOGRAM_BOUNDS_MS)
+                       if milliseconds <= bound), len(HISTOGRAM_BOUNDS_MS))
+        self.histogram[bucket] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters, latency percentiles and histogram as a flat dictionary."""
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS]
+        labels.append(f">{HISTOGRAM_BOUNDS_MS[-1]}ms")
+        latencies = summarize_latencies(self.latencies)
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            **{name: round(value, 1) for name, value in latencies.items() if name != "count"},
+            "histogram": {label: count for label, count in zip(labels, self.histogram) if count},
+        }
+
+
+class Backend:
+    """
+    One deployment behind a :class:`RoutingChatCompletionClient`.
+
+    :param name: A name for reports, such as ``eastus2/gpt-4o-mini``.
+    :param client: The model client of the deployment.
+    """
+
+    def __init__(self, name: str, client: ChatCompletionClient) -> None:
+        self.name = name
+        self.client = client
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.average_latency = 0.0
+        self.stats = BackendStats()
+
+    def healthy(self, now: float) -> bool:
+        """Return True unless the backend is currently ejected."""
+        return now >= self.ejected_until
+
+
+@dataclass
+class RoutingStats:
+    """Counters of the router's hedging and failover decisions."""
+
+    hedged: int = 0
+    hedges_won: int = 0
+    failovers: int = 0
+
+
+class RoutingChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    A model client that routes every request to one of several backends.
+
+    The first backend provides the model info and token counting; all backends
+    are expected to serve the same model.
+
+    :param backends: The model clients to route to, by name.
+    :param hedge: Duplicate slow ``create()`` calls to a second backend.
+    :param hedge_percentile: The latency percentile of a backend after which a call is hedged.
+    :param hedge_min_samples: Latency samples a backend needs before its percentile is trusted.
+    :param hedge_delay: Seconds after which a call is hedged until there are enough samples.
+    :param failure_threshold: Consecutive failures after which a backend is ejected.
+    :param ejection_seconds: Seconds an ejected backend receives no requests.
+    """
+
+    def __init__(self, backends: Mapping[str, ChatCompletionClient], hedge: bool = False,
+                 hedge_percentile: float = 95, hedge_min_samples: int = 20,
+                 hedge_delay: float = 2.0, failure_threshold: int = 3,
+                 ejection_seconds: float = 30.0) -> None:
+        if not backends:
+            raise ValueError("At least one backend is required.")
+        self.backends = [Backend(name, client) for name, client in backends.items()]
+        super().__init__(self.backends[0].client)
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_delay = hedge_delay
+        self.failure_threshold = failure_threshold
+        self.ejection_seconds = ejection_seconds
+        self.stats = RoutingStats()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Return the statistics of every backend, by name."""
+        return {backend.name: backend.stats.summary() for backend in self.backends}
+
+    def pick(self, exclude: Set[Backend] = frozenset()) -> Optional[Backend]:
+        """
+        Choose the backend for the next request.
+
+        Healthy backends with the fewest outstanding requests are preferred, ties
+        going to the lowest average latency. When every backend is ejected, the one
+        whose ejection ends first is used anyway.
+
+        Args:
+            exclude (Set[Backend]): Backends already tried for this request.
+
+        Returns:
+            Optional[Backend]: The backend, or None when every backend was excluded.
+        """
+        candidates = [backend for backend in self.backends if backend not in exclude]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        healthy = [backend for backend in candidates if backend.healthy(now)]
+        if not healthy:
+            return min(candidates, key=lambda backend: backend.ejected_until)
+        return min(healthy, key=lambda backend: (backend.outstanding, backend.average_latency))
+
+    def _hedge_delay(self, backend: Backend) -> float:
+        if len(backend.stats.latencies) < self.hedge_min_samples:
+            return self.hedge_delay
+        return percentile(backend.stats.latencies, self.hedge_percentile)
+
+    def _succeeded(self, backend: Backend, seconds: Optional[float]) -> None:
+        backend.consecutive_failures = 0
+        if seconds is not None:
+            backend.stats.record(seconds)
+            backend.average_latency = (seconds if not backend.average_latency else
+                                       EWMA_WEIGHT * seconds
+                                       + (1 - EWMA_WEIGHT) * backend.average_latency)
+
+    def _failed(self, backend: Backend, error: BaseException) -> None:
+        if not is_backend_failure(error):
+            return
+        backend.stats.failures += 1
+        backend.consecutive_failures += 1
+        # A backend back from ejection is ejected again by its first failure.
+        if backend.consecutive_failures >= self.failure_threshold:
+            backend.ejected_until = time.monotonic() + self.ejection_seconds
+            backend.stats.ejections += 1
+
+    def _launch(self, backend: Backend, messages: Sequence[LLMMessage],
+                kwargs: Dict[str, Any]) -> "asyncio.Task[CreateResult]":
+        # Counted as outstanding right away, so that concurrent picks see it.
+        backend.outstanding += 1
+        backend.stats.requests += 1
+        task = asyncio.ensure_future(self._attempt(backend, messages, kwargs))
+        task.add_done_callback(lambda _: self._finished(backend))
+        return task
+
+    @staticmethod
+    def _finished(backend: Backend) -> None:
+        backend.outstanding -= 1
+
+    async def _attempt(self, backend: Backend, messages: Sequence[LLMMessage],
+                       kwargs: Dict[str, Any]) -> CreateResult:
+        start = time.perf_counter()
+        try:
+            result = await backend.client.create(messages, **kwargs)
+        except Exception as error:
+            self._failed(backend, error)
+            raise
+        self._succeeded(backend, time.perf_counter() - start)
+        return result
+
+    async def _send(self, backend: Backend, messages: Sequence[LLMMessage],
+                    kwargs: Dict[str, Any], tried: Set[Backend]) -> CreateResult:
+        primary = self._launch(backend, messages, kwargs)
+        tasks = {primary}
+        try:
+            if self.hedge:
+                done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(backend))
+                second = None if done else self.pick(tried)
+                if second is not None:
+                    tried.add(second)
+                    self.stats.hedged += 1
+                    tasks.add(self._launch(second, messages, kwargs))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats.hedges_won += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The loser is cancelled, which aborts its HTTP request.
+            for task in tasks:
+                task.cancel()
+
+    async def create(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        kwargs: Dict[str, Any] = {
+            "tools": tools,
+            "tool_choice": tool_choice,
+            "json_output": json_output,
+            "extra_create_args": extra_create_args,
+            "cancellation_token": cancellation_token,
+        }
+        tried: Set[Backend] = set()
+        while True:
+            backend = self.pick(tried)
+            tried.add(backend)
+            try:
+                return await self._send(backend, messages, kwargs, tried)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                if not is_backend_failure(error) or len(tried) == len(self.backends):
+                    raise
+                self.stats.failovers += 1
+
+    def create_stream(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async def _generator() -> AsyncGenerator[Union[str, CreateResult], None]:
+            # Streams are balanced and fail over before their first chunk, but not hedged.
+            tried: Set[Backend] = set()
+            while True:
+                backend = self.pick(tried)
+                tried.add(backend)
+                backend.outstanding += 1
+                backend.stats.requests += 1
+                started = False
+                try:
+                    async for item in backend.client.create_stream(
+                            messages,
+                            tools=tools,
+                            tool_choice=tool_choice,
+                            json_output=json_output,
+                            extra_create_args=extra_create_args,
+                            cancellation_token=cancellation_token,
+                    ):
+                        started = True
+                        yield item
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    self._failed(backend, error)
+                    if (started or not is_backend_failure(error)
+                            or len(tried) == len(self.backends)):
+                        raise
+                    self.stats.failovers += 1
+                    continue
+                finally:
+                    backend.outstanding -= 1
+                self._succeeded(backend, None)
+                return
+
+        return _generator()
+
+    async def close(self) -> None:
+        for backend in self.backends:
+            await backend.client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return _sum_usage(backend.client.actual_usage() for backend in self.backends)
+
+    def total_usage(self) -> RequestUsage:
+        return _sum_usage(backend.client.total_usage() for backend in self.backends)
+
+
+def _sum_usage(usages: Iterable[RequestUsage]) -> RequestUsage:
+    usages = list(usages)
+    return RequestUsage(prompt_tokens=sum(usage.prompt_tokens for usage in usages),
+                        completion_tokens=sum(usage.completion_tokens for usage in usages))
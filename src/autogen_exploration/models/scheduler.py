@@ -0,0 +1,455 @@
+"""
+Rate-limit-aware scheduling of requests to a shared model client.
+
+Every agent of a team funnels its requests through the same deployment, so a busy
+team runs into the deployment's requests-per-minute and tokens-per-minute quotas,
+and the OpenAI SDK's independent per-request retries then turn each ``429`` into a
+retry storm. :class:`RateLimitScheduler` admits requests to a deployment through
+token buckets for requests and estimated tokens, and adapts how many requests it
+keeps in flight with additive-increase/multiplicative-decrease (AIMD): every
+success raises the limit slowly, every ``429`` halves it and pauses admission for
+the ``Retry-After`` interval. Waiting requests are admitted in priority order, so
+interactive requests overtake batch work.
+
+:class:`ScheduledChatCompletionClient` puts a scheduler in front of a model client
+and retries throttled requests itself. Create the wrapped client with
+``max_retries=0`` so that every ``429`` reaches the scheduler.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+from openai import RateLimitError
+from pydantic import BaseModel
+
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+from autogen_exploration.models.keys import effective_create_args
+
+Priority = Literal["interactive", "batch"]
+
+# Lower values are admitted first.
+PRIORITY_ORDER: Dict[str, int] = {"interactive": 0, "batch": 1}
+
+DEFAULT_COMPLETION_ESTIMATE = 256
+# Like Azure's own rate limiter, prompts are estimated from their length.
+CHARS_PER_TOKEN = 4
+DEFAULT_RETRY_AFTER = 1.0
+MAX_WAIT_SAMPLES = 10_000
+
+
+class TokenBucket:
+    """
+    A bucket refilled continuously at ``per_minute`` units per minute.
+
+    The bucket holds at most ``window`` seconds' worth of units, which bounds the
+    burst admitted after an idle period. A request larger than the whole bucket is
+    admitted once the bucket is full and leaves it in debt.
+
+    :param per_minute: The quota per minute.
+    :param window: Seconds' worth of quota the bucket can hold.
+    """
+
+    def __init__(self, per_minute: float, window: float = 60.0) -> None:
+        self.rate = per_minute / 60
+        self.capacity = self.rate * window
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Return the seconds until ``amount`` units are available."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Remove units from the bucket."""
+        self._refill()
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        """Return units that were taken but not used."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+@dataclass
+class SchedulerStats:
+    """Counters and samples describing the scheduler's queue and its adaptation."""
+
+    admitted: int = 0
+    throttled: int = 0
+    decreases: int = 0
+    concurrency: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    wait_times: Dict[str, Deque[float]] = field(default_factory=dict)
+
+    def record_wait(self, priority: str, seconds: float) -> None:
+        """Record how long a request of a priority class waited to be admitted."""
+        self.wait_times.setdefault(priority, deque(maxlen=MAX_WAIT_SAMPLES)).append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters and the wait time percentiles per priority class."""
+        return {
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "decreases": self.decreases,
+            "concurrency": round(self.concurrency, 1),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "wait": {priority: {name: round(value, 1) for name, value in
+                                summarize_latencies(samples).items()}
+                     for priority, samples in self.wait_times.items()},
+        }
+
+
+@dataclass(order=True)
+class _Ticket:
+    """A request waiting for admission, ordered by priority and then arrival."""
+
+    order: int
+    sequence: int
+    priority: str = field(compare=False)
+    tokens: float = field(compare=False)
+    enqueued: float = field(compare=False)
+    admitted: "asyncio.Future[None]" = field(compare=False)
+
+
+@dataclass
+class Admission:
+    """
+    An admitted request, which reports its outcome back to the scheduler.
+
+    :param tokens: The estimated tokens charged on admission.
+    :param used_tokens: The tokens the request actually used, once known.
+    :param retry_after: The ``Retry-After`` seconds of a ``429`` answer, if any.
+    """
+
+    tokens: float
+    used_tokens: Optional[float] = None
+    retry_after: Optional[float] = None
+
+
+class RateLimitScheduler:
+    """
+    Admission control for the requests sent to one deployment.
+
+    :param requests_per_minute: The deployment's request quota, or None when unknown.
+    :param tokens_per_minute: The deployment's token quota, or None when unknown.
+    :param window: Seconds' worth of quota that may be spent in a burst.
+    :param initial_concurrency: Requests kept in flight before any feedback.
+    :param min_concurrency: Lower bound of the adaptive concurrency limit.
+    :param max_concurrency: Upper bound of the adaptive concurrency limit.
+    :param decrease_factor: Factor the concurrency limit is multiplied by on a ``429``.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, window: float = 60.0,
+                 initial_concurrency: int = 8, min_concurrency: int = 1,
+                 max_concurrency: int = 64, decrease_factor: float = 0.5) -> None:
+        self.requests = TokenBucket(requests_per_minute, window) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, window) if tokens_per_minute else None
+        self.concurrency = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.stats = SchedulerStats(concurrency=self.concurrency)
+        self.in_flight = 0
+        self._queue: List[_Ticket] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority = "interactive",
+                    tokens: float = 0) -> AsyncIterator[Admission]:
+        """
+        Wait until a request may be sent, and hold its slot until the block exits.
+
+        Usage:
+            async with scheduler.admit("batch", tokens=estimate) as admission:
+                result = await model_client.create(messages)
+                admission.used_tokens = result.usage.prompt_tokens + result.usage.completion_tokens
+
+        Args:
+            priority (Priority): The priority class of the request.
+            tokens (float): The estimated prompt and completion tokens of the request.
+
+        Yields:
+            Admission: The admitted request, to record its token usage or a ``429`` on.
+        """
+        admission = await self._wait(priority, tokens)
+        succeeded = False
+        try:
+            yield admission
+            succeeded = True
+        finally:
+            self.release(admission, succeeded)
+
+    async def _wait(self, priority: Priority, tokens: float) -> Admission:
+        ticket = _Ticket(PRIORITY_ORDER[priority], next(self._sequence), priority, tokens,
+                         time.perf_counter(), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, ticket)
+        self._set_queue_depth(+1)
+        self._dispatch()
+        try:
+            await ticket.admitted
+        except asyncio.CancelledError:
+            if ticket.admitted.done() and not ticket.admitted.cancelled():
+                # Admitted and cancelled in the same step: hand the slot back.
+                self.release(Admission(tokens, used_tokens=0), succeeded=False)
+            else:
+                ticket.admitted.cancel()
+                self._set_queue_depth(-1)
+                self._dispatch()
+            raise
+        return Admission(tokens)
+
+    def release(self, admission: Admission, succeeded: bool) -> None:
+        """
+        Hand an admitted request's slot back and adapt the concurrency limit.
+
+        Args:
+            admission (Admission): The request, with its outcome recorded.
+            succeeded (bool): Whether the request completed without an error.
+        """
+        self.in_flight -= 1
+        if self.tokens is not None and admission.used_tokens is not None:
+            self.tokens.give(admission.tokens - admission.used_tokens)
+        if admission.retry_after is not None:
+            self._throttled(admission.retry_after)
+        elif succeeded:
+            # Additive increase: about one more slot per limit's worth of successes.
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+        self.stats.concurrency = self.concurrency
+        self._dispatch()
+
+    def _throttled(self, retry_after: float) -> None:
+        self.stats.throttled += 1
+        now = time.monotonic()
+        # Requests already in flight when the quota ran out are throttled too; only the
+        # first 429 of an episode decreases the limit.
+        if now >= self._paused_until:
+            self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease_factor)
+            self.stats.decreases += 1
+            self.stats.concurrency = self.concurrency
+        self._paused_until = max(self._paused_until, now + retry_after)
+
+    def _set_queue_depth(self, change: int) -> None:
+        self.stats.queue_depth += change
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queue_depth)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while True:
+            # Tickets cancelled while waiting are dropped when they reach the head.
+            while self._queue and self._queue[0].admitted.cancelled():
+                heapq.heappop(self._queue)
+            if not self._queue or self.in_flight >= max(int(self.concurrency), 1):
+                return
+            ticket = self._queue[0]
+            delay = self._paused_until - time.monotonic()
+            if self.requests is not None:
+                delay = max(delay, self.requests.delay(1))
+            if self.tokens is not None:
+                delay = max(delay, self.tokens.delay(ticket.tokens))
+            if delay > 0:
+                # The head of the queue waits, so lower priorities cannot overtake it.
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self._set_queue_depth(-1)
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(ticket.tokens)
+            self.in_flight += 1
+            self.stats.admitted += 1
+            self.stats.record_wait(ticket.priority, time.perf_counter() - ticket.enqueued)
+            ticket.admitted.set_result(None)
+
+
+def estimate_prompt_tokens(messages: Sequence[LLMMessage],
+                           tools: Sequence[Tool | ToolSchema] = ()) -> int:
+    """
+    Estimate the prompt tokens of a request without running a tokenizer.
+
+    Args:
+        messages (Sequence[LLMMessage]): The request messages.
+        tools (Sequence[Tool | ToolSchema]): The tools offered to the model.
+
+    Returns:
+        int: The estimated prompt tokens.
+    """
+    chars = sum(len(message.model_dump_json()) for message in messages)
+    chars += sum(len(json.dumps(tool.schema if isinstance(tool, Tool) else tool))
+                 for tool in tools)
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def retry_after_seconds(error: RateLimitError, attempt: int) -> float:
+    """
+    Return how long a ``429`` asks the caller to wait.
+
+    ``retry-after-ms`` is preferred over ``Retry-After``, which may hold seconds or an
+    HTTP date. Without either header the wait doubles with every attempt.
+
+    Args:
+        error (RateLimitError): The error raised by the OpenAI SDK.
+        attempt (int): The number of attempts made so far, starting at 1.
+
+    Returns:
+        float: The seconds to wait.
+    """
+    headers = error.response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            value = headers["retry-after"]
+            try:
+                return float(value)
+            except ValueError:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        pass
+    return DEFAULT_RETRY_AFTER * 2 ** (attempt - 1)
+
+
+class ScheduledChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    A model client whose requests are admitted by a :class:`RateLimitScheduler`.
+
+    Several instances with different priorities can share one scheduler, for
+    example an interactive client for the agents a user is waiting on and a batch
+    client for background work against the same deployment.
+
+    :param client: The model client to wrap, ideally created with ``max_retries=0``.
+    :param scheduler: The scheduler of the client's deployment.
+    :param priority: The priority class of every request made through this client.
+    :param max_attempts: Attempts per request before a ``429`` is raised to the caller.
+    :param completion_estimate: Completion tokens assumed for requests without ``max_tokens``.
+    """
+
+    def __init__(self, client: ChatCompletionClient, scheduler: RateLimitScheduler,
+                 priority: Priority = "interactive", max_attempts: int = 6,
+                 completion_estimate: int = DEFAULT_COMPLETION_ESTIMATE) -> None:
+        super().__init__(client)
+        self.scheduler = scheduler
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.completion_estimate = completion_estimate
+
+    def _estimate(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema],
+                  extra_create_args: Mapping[str, Any]) -> float:
+        if self.scheduler.tokens is None:
+            return 0
+        create_args = effective_create_args(self._client, extra_create_args)
+        completion = (create_args.get("max_completion_tokens") or create_args.get("max_tokens")
+                      or self.completion_estimate)
+        return estimate_prompt_tokens(messages, tools) + completion
+
+    def _backoff(self, error: RateLimitError, attempt: int, admission: Admission) -> None:
+        admission.retry_after = retry_after_seconds(error, attempt)
+        if attempt >= self.max_attempts:
+            raise error
+
+    async def create(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        estimate = self._estimate(messages, tools, extra_create_args)
+        for attempt in itertools.count(1):
+            async with self.scheduler.admit(self.priority, estimate) as admission:
+                try:
+                    result = await self._client.create(
+                        messages,
+                        tools=tools,
+                        tool_choice=tool_choice,
+                        json_output=json_output,
+                        extra_create_args=extra_create_args,
+                        cancellation_token=cancellation_token,
+                    )
+                except RateLimitError as error:
+                    self._backoff(error, attempt, admission)
+                    continue
+                admission.used_tokens = result.usage.prompt_tokens + result.usage.completion_tokens
+                return result
+
+    def create_stream(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async def _generator() -> AsyncGenerator[Union[str, CreateResult], None]:
+            estimate = self._estimate(messages, tools, extra_create_args)
+            for attempt in itertools.count(1):
+                async with self.scheduler.admit(self.priority, estimate) as admission:
+                    started = False
+                    try:
+                        async for item in self._client.create_stream(
+                                messages,
+                                tools=tools,
+                                tool_choice=tool_choice,
+                                json_output=json_output,
+                                extra_create_args=extra_create_args,
+                                cancellation_token=cancellation_token,
+                        ):
+                            started = True
+                            if isinstance(item, CreateResult):
+                                admission.used_tokens = (item.usage.prompt_tokens
+                                                         + item.usage.completion_tokens)
+                            yield item
+                    except RateLimitError as error:
+                        # A 429 arrives before the first chunk; never retry a partial stream.
+                        if started:
+                            raise
+                        self._backoff(error, attempt, admission)
+                        continue
+                    return
+
+        return _generator()
+
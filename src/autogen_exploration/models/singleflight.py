@@ -0,0 +1,216 @@
+"""
+Single-flight coalescing of concurrent identical model requests.
+
+When several agents share one model client, identical requests are often in
+flight at the same time. :class:`SingleFlightChatCompletionClient` sends only the
+first of them upstream and lets every concurrent duplicate wait for that request.
+Streaming requests fan the chunks out to every waiter, including waiters that
+join after the first chunks arrived.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+from autogen_exploration.models.keys import request_key
+
+
+@dataclass
+class _Flight:
+    """An upstream create() call and the number of callers waiting for it."""
+
+    task: "asyncio.Task[CreateResult]"
+    waiters: int = 0
+
+
+@dataclass
+class _StreamFlight:
+    """An upstream create_stream() call, the items it produced so far and its subscribers."""
+
+    items: List[Union[str, CreateResult]] = field(default_factory=list)
+    subscribers: List["asyncio.Queue[Any]"] = field(default_factory=list)
+    task: Optional["asyncio.Task[None]"] = None
+
+    def publish(self, item: Any) -> None:
+        """Record an item and hand it to every subscriber."""
+        self.items.append(item)
+        for queue in self.subscribers:
+            queue.put_nowait(item)
+
+    def subscribe(self) -> "asyncio.Queue[Any]":
+        """Return a queue that replays the items so far and then receives new ones."""
+        queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        for item in self.items:
+            queue.put_nowait(item)
+        self.subscribers.append(queue)
+        return queue
+
+
+@dataclass
+class _StreamError:
+    """An error raised by the upstream stream, delivered to every subscriber."""
+
+    error: BaseException
+
+
+_END_OF_STREAM = object()
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters describing how many requests were coalesced."""
+
+    upstream_requests: int = 0
+    coalesced_requests: int = 0
+
+
+class SingleFlightChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    A model client that shares one upstream request between concurrent identical calls.
+
+    The upstream request runs in its own task, so cancelling one caller (through
+    its cancellation token or by cancelling its task) only detaches that caller.
+    The upstream request is cancelled once every caller waiting for it is gone.
+
+    :param client: The model client to wrap.
+    """
+
+    def __init__(self, client: ChatCompletionClient) -> None:
+        super().__init__(client)
+        self.stats = SingleFlightStats()
+        self._flights: Dict[str, _Flight] = {}
+        self._stream_flights: Dict[str, _StreamFlight] = {}
+
+    async def create(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        key = request_key(self._client, messages, tools=tools, tool_choice=tool_choice,
+                          json_output=json_output, extra_create_args=extra_create_args)
+        flight = self._flights.get(key)
+        leader = flight is None
+        if flight is None:
+            self.stats.upstream_requests += 1
+            flight = _Flight(task=asyncio.ensure_future(self._client.create(
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+            )))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(self._flights, key, flight))
+        else:
+            self.stats.coalesced_requests += 1
+
+        flight.waiters += 1
+        waiter = asyncio.shield(flight.task)
+        if cancellation_token is not None:
+            cancellation_token.link_future(waiter)
+        try:
+            result = await waiter
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                flight.task.cancel()
+            raise
+        flight.waiters -= 1
+        # Followers get their own copy so that callers never share a mutable result.
+        return result if leader else result.model_copy(deep=True)
+
+    def create_stream(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        key = request_key(self._client, messages, tools=tools, tool_choice=tool_choice,
+                          json_output=json_output, extra_create_args=extra_create_args)
+
+        async def _pump(flight: _StreamFlight) -> None:
+            try:
+                async for item in self._client.create_stream(
+                        messages,
+                        tools=tools,
+                        tool_choice=tool_choice,
+                        json_output=json_output,
+                        extra_create_args=extra_create_args,
+                ):
+                    flight.publish(item)
+            except BaseException as error:  # pylint: disable=broad-exception-caught
+                flight.publish(_StreamError(error))
+            finally:
+                self._forget(self._stream_flights, key, flight)
+                flight.publish(_END_OF_STREAM)
+
+        async def _generator() -> AsyncGenerator[Union[str, CreateResult], None]:
+            flight = self._stream_flights.get(key)
+            if flight is None:
+                self.stats.upstream_requests += 1
+                flight = _StreamFlight()
+                self._stream_flights[key] = flight
+                flight.task = asyncio.ensure_future(_pump(flight))
+            else:
+                self.stats.coalesced_requests += 1
+            queue = flight.subscribe()
+            stopped: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+            if cancellation_token is not None:
+                cancellation_token.link_future(stopped)
+            try:
+                while True:
+                    if queue.empty() and cancellation_token is not None:
+                        getter = asyncio.ensure_future(queue.get())
+                        await asyncio.wait((getter, stopped), return_when=asyncio.FIRST_COMPLETED)
+                        if stopped.done():
+                            getter.cancel()
+                            raise asyncio.CancelledError()
+                        item = getter.result()
+                    else:
+                        item = await queue.get()
+                    if item is _END_OF_STREAM:
+                        break
+                    if isinstance(item, _StreamError):
+                        raise item.error
+                    yield item
+            finally:
+                self._detach_stream(key, flight, queue)
+
+        return _generator()
+
+    def _detach_stream(self, key: str, flight: _StreamFlight, queue: "asyncio.Queue[Any]") -> None:
+        flight.subscribers.remove(queue)
+        if not flight.subscribers and flight.task is not None and not flight.task.done():
+            self._forget(self._stream_flights, key, flight)
+            flight.task.cancel()
+
+    @staticmethod
+    def _forget(flights: Dict[str, Any], key: str, flight: Any) -> None:
+        # A newer flight may already be registered under the same key.
+        if flights.get(key) is flight:
+            del flights[key]
@@ -0,0 +1,328 @@
+"""
+A warm runner that executes example teams for many tasks in one long-lived process.
+
+Running an example with ``uv run`` pays for interpreter start-up, imports, the
+Azure AD token and the TLS handshakes every time. The runner keeps one process,
+one event loop, the shared model clients with their connection pool and the
+token provider warm, and accepts jobs of the form "run the team of example X on
+task Y" over a local TCP socket, one JSON object per line:
+
+    {"id": 1, "example": "/abs/path/to/example.py", "task": "...", "target": "team"}
+
+Every job executes the example's module-level code in a fresh namespace, which
+builds fresh agents and a fresh team, so concurrent jobs never share agent
+state; only the model clients, which :func:`get_model_client` hands out per
+process, are shared. Top-level ``asyncio.run(...)`` calls are left out, so the
+example's own ``main()`` does not run. ``target`` names the team or agent variable
+to run, and defaults to the example's only team (or else its only agent).
+
+The runner answers with one JSON object per line as the job progresses:
+``{"id": 1, "event": "message", "source": ..., "type": ..., "content": ...}`` for
+every message and event of the run, then ``{"id": 1, "event": "result", ...}`` or
+``{"id": 1, "event": "error", "error": ...}``.
+
+Usage:
+    uv run python -m autogen_exploration.runner serve --port 8765 --max-jobs 64
+    uv run python -m autogen_exploration.runner submit path/to/example.py "Write a haiku."
+    uv run python -m autogen_exploration.runner batch jobs.jsonl
+"""
+
+import argparse
+import ast
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from types import CodeType
+from typing import Any, AsyncGenerator, Dict, Iterable, Optional, Set, Tuple, Union
+
+from autogen_agentchat.base import ChatAgent, TaskResult, Team
+from dotenv import load_dotenv
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_JOBS = 32
+RUNNER_MODULE_NAME = "__autogen_runner__"
+
+
+class JobError(Exception):
+    """A job that cannot be run, such as an example without a team."""
+
+
+def _is_asyncio_run(node: ast.stmt) -> bool:
+    return (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+            and ast.unparse(node.value.func) in ("asyncio.run", "run"))
+
+
+class ExampleRunner:
+    """
+    Runs the team of an example script on a task, in the current event loop.
+
+    The compiled example is cached until the file changes, so a job only pays for
+    executing the module-level code that builds its agents and team.
+    """
+
+    def __init__(self) -> None:
+        self._code: Dict[str, Tuple[int, CodeType]] = {}
+        self.jobs = 0
+        self.failed = 0
+
+    def compile(self, path: str) -> CodeType:
+        """Return the module code of an example without its top-level ``asyncio.run`` calls."""
+        path = os.path.abspath(path)
+        modified = os.stat(path).st_mtime_ns
+        cached = self._code.get(path)
+        if cached is not None and cached[0] == modified:
+            return cached[1]
+        with open(path, encoding="utf-8") as file:
+            tree = ast.parse(file.read(), path)
+        tree.body = [node for node in tree.body if not _is_asyncio_run(node)]
+        code = compile(tree, path, "exec")
+        self._code[path] = (modified, code)
+        return code
+
+    def load(self, path: str, target: Optional[str] = None) -> Union[Team, ChatAgent]:
+        """
+        Execute an example in a fresh namespace and return its team or agent.
+
+        Args:
+            path (str): The example script.
+            target (Optional[str]): The variable holding the team or agent to run.
+
+        Returns:
+            Union[Team, ChatAgent]: A team or agent that no other job uses.
+        """
+        namespace: Dict[str, Any] = {"__name__": RUNNER_MODULE_NAME,
+                                     "__file__": os.path.abspath(path)}
+        exec(self.compile(path), namespace)  # pylint: disable=exec-used
+        if target is not None:
+            runnable = namespace.get(target)
+            if not isinstance(runnable, (Team, ChatAgent)):
+                raise JobError(f"{target!r} in {path} is not a team or an agent")
+            return runnable
+        for kind in (Team, ChatAgent):
+            found = [value for name, value in namespace.items()
+                     if isinstance(value, kind) and not name.startswith("_")]
+            if len(found) == 1:
+                return found[0]
+            if found:
+                raise JobError(f"{path} has several {kind.__name__} objects, "
+                               "name one with 'target'")
+        raise JobError(f"{path} has no team or agent at module level")
+
+    async def run(self, job: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Run a job and yield its message events followed by a result or error event."""
+        self.jobs += 1
+        start = time.perf_counter()
+        try:
+            runnable = self.load(job["example"], job.get("target"))
+            async for item in runnable.run_stream(task=job["task"]):
+                if isinstance(item, TaskResult):
+                    yield {"event": "result", "stop_reason": item.stop_reason,
+                           "messages": len(item.messages),
+                           "seconds": round(time.perf_counter() - start, 3)}
+                else:
+                    yield {"event": "message", "source": getattr(item, "source", None),
+                           "type": type(item).__name__, "content": item.to_text()}
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            self.failed += 1
+            yield {"event": "error", "error": f"{type(error).__name__}: {error}"}
+
+
+class RunnerServer:
+    """
+    Accepts jobs over a local TCP socket and runs them concurrently.
+
+    A connection can submit any number of jobs; their events are interleaved on the
+    connection and tagged with the job id. Jobs of a connection that goes away are
+    cancelled.
+
+    :param host: The interface to listen on.
+    :param port: The port to listen on, 0 picks a free one.
+    :param max_jobs: Jobs run at the same time across all connections; others wait.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_jobs: int = DEFAULT_MAX_JOBS) -> None:
+        self._host = host
+        self._port = port
+        self.runner = ExampleRunner()
+        self._slots = asyncio.Semaphore(max_jobs)
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The host and port the server listens on."""
+        return self._host, self._port
+
+    async def start(self) -> "RunnerServer":
+        """Warm up the shared clients and start listening for connections."""
+        warm_up()
+        self._server = await asyncio.start_server(self._handle_connection, self._host,
+                                                  self._port)
+        self._port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        """Stop accepting connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "RunnerServer":
+        return await self.start()
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        jobs: Set[asyncio.Task[None]] = set()
+        try:
+            while line := await reader.readline():
+                try:
+                    job = json.loads(line)
+                    job.setdefault("id", next(self._ids))
+                except json.JSONDecodeError as error:
+                    _send(writer, {"id": None, "event": "error", "error": f"bad job: {error}"})
+                    continue
+                task = asyncio.create_task(self._run_job(job, writer))
+                jobs.add(task)
+                task.add_done_callback(jobs.discard)
+        except ConnectionError:
+            pass
+        finally:
+            for task in jobs:
+                task.cancel()
+            writer.close()
+
+    async def _run_job(self, job: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        async with self._slots:
+            async for event in self.runner.run(job):
+                _send(writer, {"id": job["id"], **event})
+                await writer.drain()
+
+
+def _send(writer: asyncio.StreamWriter, event: Dict[str, Any]) -> None:
+    writer.write(json.dumps(event).encode() + b"\n")
+
+
+def warm_up() -> None:
+    """Build the default model client and start fetching the Azure AD token."""
+    # pylint: disable=import-outside-toplevel
+    from autogen_exploration.clients import get_model_client, get_token_provider
+
+    if not os.environ.get("AZURE_OPENAI_API_KEY") and not os.environ.get("AUTOGEN_CASSETTE"):
+        get_token_provider()
+    if os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME") or os.environ.get(
+            "AZURE_OPENAI_API_BACKENDS"):
+        get_model_client()
+
+
+async def submit(jobs: Iterable[Dict[str, Any]], host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Send jobs to a runner and yield their events as they arrive.
+
+    Jobs without an ``id`` are numbered from 1. The generator ends once every job
+    has reported its result or error.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        pending: Set[Any] = set()
+        for number, job in enumerate(jobs, start=1):
+            job = {"id": number, **job}
+            pending.add(job["id"])
+            _send(writer, job)
+        await writer.drain()
+        while pending:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("The runner closed the connection.")
+            event = json.loads(line)
+            if event["event"] in ("result", "error"):
+                pending.discard(event["id"])
+            yield event
+    finally:
+        writer.close()
+
+
+def _print_event(event: Dict[str, Any]) -> None:
+    if event["event"] == "message":
+        print(f"[{event['id']}] {event['source']}: {event['content']}", flush=True)
+    else:
+        print(json.dumps(event), flush=True)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    async with RunnerServer(args.host, args.port, args.max_jobs) as server:
+        host, port = server.address
+        print(f"Runner listening on {host}:{port}", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            print(f"jobs={server.runner.jobs} failed={server.runner.failed}", flush=True)
+
+
+async def _submit(args: argparse.Namespace) -> None:
+    job = {"example": os.path.abspath(args.example), "task": args.task}
+    if args.target:
+        job["target"] = args.target
+    async for event in submit([dict(job) for _ in range(args.repeat)], args.host, args.port):
+        _print_event(event)
+
+
+async def _batch(args: argparse.Namespace) -> None:
+    if args.file == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.file, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+    jobs = [json.loads(line) for line in lines if line.strip()]
+    for job in jobs:
+        job["example"] = os.path.abspath(job["example"])
+    async for event in submit(jobs, args.host, args.port):
+        if event["event"] != "message" or args.messages:
+            _print_event(event)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    job = {"id": 1, "example": args.example, "task": args.task, "target": args.target}
+    async for event in ExampleRunner().run(job):
+        _print_event({"id": 1, **event})
+
+
+def main() -> None:
+    """Serve jobs, submit them to a running runner, or run one job in this process."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the warm runner until interrupted")
+    serve.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS)
+    for name, help_text in (("submit", "send a job to the runner and stream its messages"),
+                            ("run", "run one job in this process, without a runner")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("example")
+        command.add_argument("task")
+        command.add_argument("--target", default=None)
+        if name == "submit":
+            command.add_argument("--repeat", type=int, default=1)
+    batch = commands.add_parser("batch", help="send the jobs of a JSON lines file ('-' for stdin)")
+    batch.add_argument("file")
+    batch.add_argument("--messages", action="store_true", help="also print every message")
+    args = parser.parse_args()
+    load_dotenv()
+    handlers = {"serve": _serve, "submit": _submit, "batch": _batch, "run": _run}
+    try:
+        asyncio.run(handlers[args.command](args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Stop phrases that end a streamed completion as soon as they appear.
+
+``TextMentionTermination("APPROVE")`` only looks at an agent's message once the
+model has finished it, so the tokens the critic generates after "APPROVE" are
+paid for and waited on. :class:`StopPhraseChatCompletionClient` scans the
+completion while it streams, with a matcher that finds a phrase split across
+chunks. When a phrase appears it:
+
+- cancels the request, closing the stream so that the server stops generating;
+- yields the text up to the end of the phrase as the final ``CreateResult``,
+  with ``finish_reason="stop"`` and the usage estimated by the token counter.
+
+The agent's message then ends with the phrase, so the team's text mention
+condition stops the run with an ordinary ``TaskResult``. :class:`StopPhraseTermination`
+is that condition, and wraps the clients of the agents it watches with the same
+phrase. ``create`` streams as well, so agents without ``model_client_stream``
+also stop early.
+
+Usage:
+    approve = StopPhraseTermination("APPROVE", sources=["critic"])
+    critic_agent = AssistantAgent("critic", model_client=approve.wrap(model_client),
+                                  model_client_stream=True)
+    team = RoundRobinGroupChat([primary_agent, critic_agent], termination_condition=approve)
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, List, Literal, Mapping, Optional, Sequence, Tuple, Union
+
+from autogen_agentchat.conditions import TextMentionTermination
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+from autogen_exploration.models.budget import TokenCounter, get_token_counter
+
+# How often a chunk read is checked for a linked future to cancel.
+LINK_POLL_SECONDS = 0.005
+
+
+class _RequestToken(CancellationToken):
+    """A cancellation token that remembers the last future a client linked to it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.linked: Optional["asyncio.Future[Any]"] = None
+
+    def link_future(self, future: "asyncio.Future[Any]") -> "asyncio.Future[Any]":
+        self.linked = future
+        return super().link_future(future)
+
+
+def _remove_callback(token: CancellationToken, callback: Callable[[], None]) -> None:
+    """Detach a callback from a token; ``CancellationToken`` has no public way to."""
+    # pylint: disable=protected-access
+    with token._lock:
+        if callback in token._callbacks:
+            token._callbacks.remove(callback)
+
+
+def _waiting(future: Optional["asyncio.Future[Any]"]) -> bool:
+    """Return whether a linked future is a task that started and waits, e.g. on the network."""
+    if not isinstance(future, asyncio.Task) or future.done():
+        return False
+    coroutine = future.get_coro()
+    return inspect.iscoroutine(coroutine) and inspect.getcoroutinestate(coroutine) == inspect.CORO_SUSPENDED
+
+
+async def _cancel_stream(stream: AsyncGenerator[Any, None], token: _RequestToken) -> None:
+    """
+    Cancel a model stream so that its request ends, and close it.
+
+    The OpenAI client only closes the HTTP response, which stops the server
+    generating, when the read of a chunk is cancelled after it started. Closing the
+    generator alone leaves the connection streaming. The next chunk is read and its
+    read cancelled once it waits on the network; chunks that were already received
+    are discarded.
+    """
+    try:
+        while True:
+            token.linked = None
+            pull = asyncio.ensure_future(stream.__anext__())
+            # Wait on the read itself, so that a client that never links a future is not
+            # polled in a busy loop until its chunk arrives.
+            while not pull.done() and not _waiting(token.linked):
+                await asyncio.wait([pull], timeout=LINK_POLL_SECONDS)
+            if not pull.done():
+                token.cancel()
+                await asyncio.gather(pull, return_exceptions=True)
+                return
+            # A client that links no futures cannot be cancelled mid-read; stop reading.
+            if pull.cancelled() or pull.exception() is not None or token.linked is None:
+                return
+    finally:
+        await stream.aclose()
+
+
+class StopPhraseMatcher:
+    """
+    Finds the first of several phrases in a text that arrives in chunks.
+
+    Only the last ``len(longest phrase) - 1`` characters of the text are kept
+    between chunks, enough to find a phrase that starts in one chunk and ends in a
+    later one.
+
+    :param phrases: The phrases to look for, matched case-sensitively like
+        ``TextMentionTermination``.
+    """
+
+    def __init__(self, phrases: Sequence[str]) -> None:
+        if not phrases or not all(phrases):
+            raise ValueError("At least one non-empty stop phrase is required.")
+        self.phrases = list(phrases)
+        self._overlap = max(len(phrase) for phrase in self.phrases) - 1
+        self._tail = ""
+
+    def feed(self, chunk: str) -> Optional[Tuple[str, int]]:
+        """
+        Add a chunk of the text.
+
+        Args:
+            chunk (str): The next chunk.
+
+        Returns:
+            Optional[Tuple[str, int]]: The phrase that appeared first and the length of
+            the chunk's text up to the end of that phrase, or None.
+        """
+        window = self._tail + chunk
+        found: Optional[Tuple[int, str]] = None
+        for phrase in self.phrases:
+            index = window.find(phrase)
+            if index >= 0 and (found is None or index + len(phrase) < found[0]):
+                found = (index + len(phrase), phrase)
+        self._tail = window[-self._overlap:] if self._overlap else ""
+        if found is None:
+            return None
+        end, phrase = found
+        return phrase, end - (len(window) - len(chunk))
+
+
+@dataclass
+class StopPhraseStats:
+    """Counters of the responses of a :class:`StopPhraseChatCompletionClient`."""
+
+    responses: int = 0
+    stopped: int = 0
+    completion_tokens: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters as a flat dictionary."""
+        return {
+            "responses": self.responses,
+            "stopped": self.stopped,
+            "completion_tokens": self.completion_tokens,
+            "seconds": round(self.seconds, 2),
+        }
+
+
+class StopPhraseChatCompletionClient(DelegatingChatCompletionClient):
+    """
+    A model client that ends a completion as soon as a stop phrase is generated.
+
+    Requests with tools or structured output are passed through unchanged, so that
+    a phrase in the text of a response cannot cut off its tool calls.
+
+    :param client: The model client to wrap.
+    :param phrases: The stop phrases.
+    :param counter: The token counter for the usage of stopped responses, defaults to
+        the shared counter of the model family.
+    """
+
+    def __init__(self, client: ChatCompletionClient, phrases: Sequence[str],
+                 counter: Optional[TokenCounter] = None) -> None:
+        super().__init__(client)
+        self.phrases = list(phrases)
+        StopPhraseMatcher(self.phrases)  # Validate the phrases now rather than on the first request.
+        self._counter = counter
+        self.stats = StopPhraseStats()
+
+    @property
+    def counter(self) -> TokenCounter:
+        """The token counter, resolved on first use so that a deferred client stays unbuilt."""
+        if self._counter is None:
+            self._counter = get_token_counter(self.model_info.get("family", "gpt-4o"))
+        return self._counter
+
+    async def create(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        result: Optional[CreateResult] = None
+        async for item in self.create_stream(
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+        ):
+            if isinstance(item, CreateResult):
+                result = item
+        if result is None:
+            raise RuntimeError("The model stream ended without a result.")
+        return result
+
+    def create_stream(
+            self,
+            messages: Sequence[LLMMessage],
+            *,
+            tools: Sequence[Tool | ToolSchema] = [],
+            tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+            json_output: Optional[bool | type[BaseModel]] = None,
+            extra_create_args: Mapping[str, Any] = {},
+            cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async def _generator() -> AsyncGenerator[Union[str, CreateResult], None]:
+            # A token of our own cancels the request without cancelling the caller's.
+            request_token = _RequestToken()
+            if cancellation_token is not None:
+                # Detached when the request ends, so a long-lived token does not collect one
+                # callback per request.
+                cancellation_token.add_callback(request_token.cancel)
+            matcher = StopPhraseMatcher(self.phrases)
+            chunks: List[str] = []
+            start = time.perf_counter()
+            stream = self._client.create_stream(
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=request_token,
+            )
+            try:
+                async for item in stream:
+                    if isinstance(item, CreateResult):
+                        self.stats.responses += 1
+                        self.stats.completion_tokens += item.usage.completion_tokens
+                        self.stats.seconds += time.perf_counter() - start
+                        yield item
+                        return
+                    match = None if json_output or tools else matcher.feed(item)
+                    if match is None:
+                        chunks.append(item)
+                        yield item
+                        continue
+                    item = item[:match[1]]
+                    chunks.append(item)
+                    await _cancel_stream(stream, request_token)
+                    if item:
+                        yield item
+                    yield self._stopped_result(messages, tools, "".join(chunks), start)
+                    return
+            finally:
+                if cancellation_token is not None:
+                    _remove_callback(cancellation_token, request_token.cancel)
+                await stream.aclose()
+
+        return _generator()
+
+    def _stopped_result(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema],
+                        content: str, start: float) -> CreateResult:
+        usage = RequestUsage(prompt_tokens=self.counter.count(messages, tools),
+                             completion_tokens=self.counter.count_text(content))
+        self.stats.responses += 1
+        self.stats.stopped += 1
+        self.stats.completion_tokens += usage.completion_tokens
+        self.stats.seconds += time.perf_counter() - start
+        return CreateResult(finish_reason="stop", content=content, usage=usage, cached=False)
+
+
+class StopPhraseTerminationConfig(BaseModel):
+    """The component config of a :class:`StopPhraseTermination`."""
+
+    text: str
+    sources: Optional[List[str]] = None
+
+
+class StopPhraseTermination(TextMentionTermination):
+    """
+    Stops a run when a phrase is mentioned, and stops the model as soon as it generates it.
+
+    The condition itself is ``TextMentionTermination``; :meth:`wrap` gives the model
+    clients of the agents it watches the same phrase, so their completions end at it.
+
+    :param text: The stop phrase.
+    :param sources: The agents whose messages are checked, all of them if None.
+    """
+
+    component_config_schema = StopPhraseTerminationConfig  # type: ignore[assignment]
+    component_provider_override = "autogen_exploration.stopping.StopPhraseTermination"
+
+    def wrap(self, client: ChatCompletionClient) -> StopPhraseChatCompletionClient:
+        """Return a client that ends its completions at the stop phrase."""
+        return StopPhraseChatCompletionClient(client, [self._termination_text])
+
+    # TextMentionTermination leaves the sources out of its config, so clones of a team
+    # would stop on any agent's mention.
+    def _to_config(self) -> StopPhraseTerminationConfig:  # type: ignore[override]
+        return StopPhraseTerminationConfig(
+            text=self._termination_text,
+            sources=list(self._sources) if self._sources is not None else None,
+        )
+
+    @classmethod
+    def _from_config(cls, config: StopPhraseTerminationConfig) -> "StopPhraseTermination":  # type: ignore[override]
+        return cls(text=config.text, sources=config.sources)
@@ -0,0 +1,357 @@
+"""
+Telemetry and chunk coalescing for streaming agents.
+
+``Console(..., output_stats=True)`` only prints token totals. :class:`StreamTelemetry`
+taps the message stream of any agent or team run with ``model_client_stream=True``
+and times every ``ModelClientStreamingChunkEvent``. For every streamed model
+response of every agent it records:
+
+- the time to first token, from the event that handed the agent its turn (or the
+  start of the run) to its first chunk;
+- the gaps between consecutive chunks, also as a histogram;
+- the completion tokens per second, from the usage of the final message when the
+  client reports it, else one token per chunk;
+- the wall time of the response, up to the agent's final message or tool call.
+
+Usage:
+    telemetry = StreamTelemetry()
+    async for message in telemetry.tap(team.run_stream(task="...")):
+        ...
+    telemetry.print_summary()
+
+    # or, in place of Console(...):
+    await StreamTelemetry().console(team.run_stream(task="..."))
+
+With a fast model, a consumer that handles one event per token spends more CPU
+than the network. :class:`ChunkCoalescer` merges the consecutive chunks of an
+agent into one event per time window or size limit, and hands events to the
+consumer through a bounded queue:
+
+    async for message in ChunkCoalescer(agent.run_stream(task="..."), window=0.05):
+        print(message)
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import (Any, AsyncGenerator, AsyncIterable, AsyncIterator, Dict, List, Optional,
+                    Sequence, TypeVar)
+
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent
+from autogen_agentchat.ui import Console
+
+from autogen_exploration.metrics import percentile
+
+T = TypeVar("T")
+
+GAP_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+DEFAULT_WINDOW = 0.05
+DEFAULT_MAX_BYTES = 4096
+DEFAULT_MAX_PENDING = 64
+_END = object()
+
+
+@dataclass
+class StreamedTurn:
+    """Timings of one streamed model response of an agent, in seconds."""
+
+    source: str
+    started: float
+    first_chunk: float
+    last_chunk: float
+    ended: Optional[float] = None
+    chunks: int = 0
+    completion_tokens: int = 0
+    gaps: List[float] = field(default_factory=list)
+
+    @property
+    def ttft(self) -> float:
+        """Seconds from the start of the turn to the first chunk."""
+        return self.first_chunk - self.started
+
+    @property
+    def wall(self) -> float:
+        """Seconds from the start of the turn to its final message."""
+        return (self.ended if self.ended is not None else self.last_chunk) - self.started
+
+    @property
+    def tokens(self) -> int:
+        """Completion tokens reported by the client, else the number of chunks."""
+        return self.completion_tokens or self.chunks
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Completion tokens per second of streaming, after the first token."""
+        streaming = self.last_chunk - self.first_chunk
+        return (self.tokens - 1) / streaming if streaming > 0 else 0.0
+
+
+def gap_histogram(gaps: Sequence[float]) -> Dict[str, int]:
+    """
+    Count inter-chunk gaps (in seconds) in millisecond buckets.
+
+    Args:
+        gaps (Sequence[float]): The gaps between consecutive chunks.
+
+    Returns:
+        Dict[str, int]: The number of gaps per bucket, keyed by its upper bound.
+    """
+    counts = [0] * (len(GAP_BUCKETS_MS) + 1)
+    for gap in gaps:
+        counts[bisect_left(GAP_BUCKETS_MS, gap * 1000)] += 1
+    labels = [f"<={bound}ms" for bound in GAP_BUCKETS_MS] + [f">{GAP_BUCKETS_MS[-1]}ms"]
+    return dict(zip(labels, counts))
+
+
+class StreamTelemetry:
+    """
+    Records streaming telemetry from the message streams it taps.
+
+    One instance can tap several runs; its turns and summary cover all of them.
+    """
+
+    def __init__(self) -> None:
+        self.turns: List[StreamedTurn] = []
+        self._open: Dict[str, StreamedTurn] = {}
+        self._last_event = 0.0
+
+    async def tap(self, stream: AsyncIterable[T]) -> AsyncGenerator[T, None]:
+        """
+        Yield every item of a ``run_stream`` stream unchanged, recording its timings.
+
+        Args:
+            stream (AsyncIterable[T]): The stream of an agent or team run.
+
+        Yields:
+            T: The items of the stream.
+        """
+        self._last_event = time.perf_counter()
+        async for item in stream:
+            self.record(item, time.perf_counter())
+            yield item
+        for turn in self._open.values():
+            turn.ended = turn.last_chunk
+        self._open.clear()
+
+    def record(self, item: Any, now: float) -> None:
+        """Record one item of a stream, seen at ``now`` (a ``time.perf_counter`` value)."""
+        if isinstance(item, TaskResult):
+            return
+        source = getattr(item, "source", "")
+        if isinstance(item, ModelClientStreamingChunkEvent):
+            turn = self._open.get(source)
+            if turn is None:
+                turn = StreamedTurn(source, started=self._last_event, first_chunk=now,
+                                    last_chunk=now)
+                self._open[source] = turn
+                self.turns.append(turn)
+            else:
+                turn.gaps.append(now - turn.last_chunk)
+                turn.last_chunk = now
+            turn.chunks += 1
+            return
+        turn = self._open.pop(source, None)
+        if turn is not None:
+            turn.ended = now
+            usage = getattr(item, "models_usage", None)
+            if usage is not None:
+                turn.completion_tokens = usage.completion_tokens
+        self._last_event = now
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return the time to first token, gaps, throughput and wall time of every agent."""
+        sources: Dict[str, List[StreamedTurn]] = {}
+        for turn in self.turns:
+            sources.setdefault(turn.source, []).append(turn)
+        result = {}
+        for source, turns in sources.items():
+            ttfts = [turn.ttft for turn in turns]
+            gaps = [gap for turn in turns for gap in turn.gaps]
+            rates = [turn.tokens_per_second for turn in turns if turn.tokens_per_second]
+            result[source] = {
+                "turns": len(turns),
+                "tokens": sum(turn.tokens for turn in turns),
+                "ttft_p50_ms": percentile(ttfts, 50) * 1000,
+                "ttft_p95_ms": percentile(ttfts, 95) * 1000,
+                "gap_p50_ms": percentile(gaps, 50) * 1000,
+                "gap_p95_ms": percentile(gaps, 95) * 1000,
+                "gap_max_ms": max(gaps, default=0.0) * 1000,
+                "tokens_per_s": sum(rates) / len(rates) if rates else 0.0,
+                "wall_s": sum(turn.wall for turn in turns),
+                "gaps": gap_histogram(gaps),
+            }
+        return result
+
+    def format_summary(self) -> str:
+        """Return the summary as a table with one row per agent and a gap histogram."""
+        summary = self.summary()
+        header = (f"{'agent':<20} {'turns':>5} {'tokens':>6} {'ttft p50':>9} {'ttft p95':>9} "
+                  f"{'gap p50':>8} {'gap p95':>8} {'gap max':>8} {'tok/s':>7} {'wall':>7}")
+        lines = [header, "-" * len(header)]
+        gaps: Dict[str, int] = {}
+        for source, row in summary.items():
+            lines.append(
+                f"{source[:20]:<20} {row['turns']:>5} {row['tokens']:>6} "
+                f"{row['ttft_p50_ms']:>7.0f}ms {row['ttft_p95_ms']:>7.0f}ms "
+                f"{row['gap_p50_ms']:>6.1f}ms {row['gap_p95_ms']:>6.1f}ms "
+                f"{row['gap_max_ms']:>6.0f}ms {row['tokens_per_s']:>7.1f} {row['wall_s']:>6.2f}s")
+            for bucket, count in row["gaps"].items():
+                gaps[bucket] = gaps.get(bucket, 0) + count
+        if any(gaps.values()):
+            lines.append("inter-chunk gaps: " + "  ".join(
+                f"{bucket} {count}" for bucket, count in gaps.items() if count))
+        return "\n".join(lines)
+
+    def print_summary(self) -> None:
+        """Print the summary table, or a note when nothing was streamed."""
+        if not self.turns:
+            print("No streamed responses; set model_client_stream=True on the agents.")
+            return
+        print(self.format_summary())
+
+    async def console(self, stream: AsyncIterable[Any], **kwargs: Any) -> Any:
+        """
+        Render a stream with AutoGen's ``Console`` and print the summary table at the end.
+
+        Args:
+            stream (AsyncIterable[Any]): The stream of an agent or team run.
+            **kwargs: Passed to ``Console``, such as ``output_stats``.
+
+        Returns:
+            Any: What ``Console`` returns, the last item of the stream.
+        """
+        result = await Console(self.tap(stream), **kwargs)
+        print()
+        self.print_summary()
+        return result
+
+
+@dataclass
+class CoalescerStats:
+    """Chunks read and events emitted by a :class:`ChunkCoalescer`."""
+
+    chunks: int = 0
+    events: int = 0
+    max_queued: int = 0
+    deferred_flushes: int = 0
+
+    @property
+    def chunks_per_event(self) -> float:
+        """The mean number of chunks merged into one emitted chunk event."""
+        return self.chunks / self.events if self.events else 0.0
+
+
+class ChunkCoalescer:
+    """
+    Merges the streamed chunks of a ``run_stream`` stream before they reach the consumer.
+
+    Consecutive chunks of the same agent and message are merged into one
+    ``ModelClientStreamingChunkEvent``, emitted when ``window`` seconds have passed
+    since its first chunk, when its content reaches ``max_bytes``, or when another
+    item arrives. Every other item passes through unchanged and in order.
+
+    Events wait for the consumer in a queue of ``max_pending`` items. While the
+    queue is full the coalescer keeps merging chunks past the window, up to
+    ``max_bytes``, and then stops reading the stream until the consumer catches
+    up, so a slow consumer receives fewer, larger events and memory stays bounded.
+    The stream of an agent then pauses the agent; a team's runtime still buffers
+    the messages of its agents.
+
+    :param stream: The stream of an agent or team run.
+    :param window: Seconds a merged chunk may wait for more chunks.
+    :param max_bytes: Content size at which a merged chunk is emitted at once.
+    :param max_pending: Events waiting for the consumer before the coalescer blocks.
+    """
+
+    def __init__(self, stream: AsyncIterable[Any], window: float = DEFAULT_WINDOW,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_pending: int = DEFAULT_MAX_PENDING) -> None:
+        self.window = window
+        self.max_bytes = max_bytes
+        self.stats = CoalescerStats()
+        self._stream = stream
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(max_pending)
+        self._inbox: asyncio.Queue[Any] = asyncio.Queue(1)
+        self._parts: List[str] = []
+        self._size = 0
+        self._first: Optional[ModelClientStreamingChunkEvent] = None
+        self._error: Optional[Exception] = None
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._events()
+
+    async def _events(self) -> AsyncGenerator[Any, None]:
+        producer = asyncio.create_task(self._produce())
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _END:
+                    break
+                yield item
+        finally:
+            producer.cancel()
+        if self._error is not None:
+            raise self._error
+
+    async def _read(self) -> None:
+        # One task iterates the stream, so the agent's tracing context stays in one context.
+        try:
+            async for item in self._stream:
+                await self._inbox.put(item)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # Raised to the consumer after the items read before it.
+            self._error = error
+        await self._inbox.put(_END)
+
+    async def _produce(self) -> None:
+        reader = asyncio.create_task(self._read())
+        deadline = 0.0
+        try:
+            while True:
+                timeout = max(deadline - time.monotonic(), 0) if self._first else None
+                try:
+                    item = await asyncio.wait_for(self._inbox.get(), timeout)
+                except asyncio.TimeoutError:
+                    if self._queue.full() and self._size < self.max_bytes:
+                        # The consumer is behind: keep merging instead of queueing more.
+                        self.stats.deferred_flushes += 1
+                        deadline = time.monotonic() + self.window
+                    else:
+                        await self._flush()
+                    continue
+                if item is _END:
+                    await self._flush()
+                    break
+                if isinstance(item, ModelClientStreamingChunkEvent):
+                    self.stats.chunks += 1
+                    if self._first is not None and (
+                            item.source != self._first.source
+                            or item.full_message_id != self._first.full_message_id):
+                        await self._flush()
+                    if self._first is None:
+                        self._first = item
+                        deadline = time.monotonic() + self.window
+                    self._parts.append(item.content)
+                    self._size += len(item.content.encode())
+                    if self._size >= self.max_bytes:
+                        await self._flush()
+                else:
+                    await self._flush()
+                    await self._put(item)
+        finally:
+            reader.cancel()
+        await self._queue.put(_END)
+
+    async def _flush(self) -> None:
+        if self._first is None:
+            return
+        merged = self._first.model_copy(update={"content": "".join(self._parts)})
+        self._first, self._parts, self._size = None, [], 0
+        self.stats.events += 1
+        await self._put(merged)
+
+    async def _put(self, item: Any) -> None:
+        await self._queue.put(item)
+        self.stats.max_queued = max(self.stats.max_queued, self._queue.qsize())
@@ -0,0 +1,340 @@
+"""
+Incremental parsing and validation of streamed structured output.
+
+An agent with ``output_content_type`` only validates its pydantic model once the
+whole completion has arrived. With ``model_client_stream=True`` the JSON arrives
+chunk by chunk, and :class:`StructuredStream` parses it as it comes:
+
+- every top-level field is validated against its annotation as soon as its
+  value is complete, and published as a typed value in ``fields`` (and to any
+  task awaiting :meth:`StructuredStream.field`);
+- a string field annotated with a ``Literal`` is checked against its options
+  on every chunk, so a value no option starts with is rejected at its first
+  wrong token;
+- a syntax error, an invalid field or an unexpected field (for models that
+  forbid extra fields) raises :class:`StructuredOutputError` at once, and the
+  tap cancels the request instead of waiting for the rest of the completion.
+
+Model validators and missing required fields are checked once the object is
+closed; the agent still validates the complete message itself.
+
+Usage:
+    agent = AssistantAgent(..., output_content_type=AgentResponse, model_client_stream=True)
+    structured = StructuredStream(AgentResponse)
+    async for message in structured.tap(agent.run_stream(task="I am happy.")):
+        if "response" in structured.fields:
+            ...  # decide before the rest of the answer has streamed
+"""
+
+import asyncio
+import enum
+import json
+import typing
+from typing import (Any, AsyncGenerator, AsyncIterable, Callable, Dict, List, Optional, Tuple,
+                    Type, TypeVar)
+
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent
+from autogen_core import CancellationToken
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+T = TypeVar("T")
+
+_WHITESPACE = " \t\r\n"
+_OPENERS = {"{": "}", "[": "]"}
+
+
+class StructuredOutputError(ValueError):
+    """Streamed structured output that cannot match the expected model."""
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object fed in pieces and returns each top-level field once complete.
+
+    Nested objects and arrays are returned whole, when they close. Every character
+    is examined once, however the text is split.
+    """
+
+    def __init__(self) -> None:
+        self.done = False
+        self._text = ""
+        self._position = 0
+        self._state = "start"
+        self._key = ""
+        self._start = 0
+        self._nesting: List[str] = []
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def streaming_key(self) -> Optional[str]:
+        """The key of the top-level string value being streamed, if any."""
+        return self._key if self._state == "string" else None
+
+    @property
+    def partial(self) -> Optional[Tuple[str, str]]:
+        """The key and decoded text so far of a top-level string value being streamed."""
+        if self._state != "string":
+            return None
+        raw = self._text[self._start:self._position]
+        # Leave out an escape sequence that is not complete yet.
+        for trim in range(6):
+            try:
+                return self._key, json.loads(raw[:len(raw) - trim] + '"')
+            except ValueError:
+                continue
+        return None
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Parse the next piece of the document.
+
+        Args:
+            text (str): The next piece, of any length.
+
+        Returns:
+            List[Tuple[str, Any]]: The top-level fields completed by this piece, in order.
+
+        Raises:
+            StructuredOutputError: If the document is not a valid JSON object.
+        """
+        self._text += text
+        fields: List[Tuple[str, Any]] = []
+        while self._position < len(self._text):
+            char = self._text[self._position]
+            field = self._step(char)
+            if field is not None:
+                fields.append(field)
+            self._position += 1
+        return fields
+
+    def _fail(self, char: str) -> StructuredOutputError:
+        return StructuredOutputError(
+            f"Unexpected {char!r} at offset {self._position} of the streamed JSON.")
+
+    def _value(self, end: int) -> Tuple[str, Any]:
+        raw = self._text[self._start:end]
+        try:
+            return self._key, json.loads(raw)
+        except ValueError as error:
+            raise StructuredOutputError(f"Invalid value for {self._key!r}: {raw!r}") from error
+
+    def _step(self, char: str) -> Optional[Tuple[str, Any]]:
+        # pylint: disable=too-many-return-statements,too-many-branches
+        state = self._state
+        if state in ("key", "string"):
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                if state == "key":
+                    self._key = json.loads(self._text[self._start:self._position + 1])
+                    self._state = "colon"
+                    return None
+                self._state = "after_value"
+                return self._value(self._position + 1)
+            return None
+        if state == "nested":
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in _OPENERS:
+                self._nesting.append(_OPENERS[char])
+            elif char in "}]":
+                if char != self._nesting.pop():
+                    raise self._fail(char)
+                if not self._nesting:
+                    self._state = "after_value"
+                    return self._value(self._position + 1)
+            return None
+        if state == "scalar":
+            if char not in _WHITESPACE and char not in ",}":
+                return None
+            field = self._value(self._position)
+            self._state = "after_value"
+            return field if char in _WHITESPACE else (self._step(char) or field)
+        if char in _WHITESPACE:
+            return None
+        if self.done:
+            raise self._fail(char)
+        if state == "start":
+            if char != "{":
+                raise self._fail(char)
+            self._state = "first_key"
+        elif state in ("first_key", "next_key"):
+            if char == '"':
+                self._state, self._start = "key", self._position
+            elif char == "}" and state == "first_key":
+                self.done = True
+            else:
+                raise self._fail(char)
+        elif state == "colon":
+            if char != ":":
+                raise self._fail(char)
+            self._state = "value"
+        elif state == "value":
+            self._start = self._position
+            if char == '"':
+                self._state = "string"
+            elif char in _OPENERS:
+                self._state, self._nesting = "nested", [_OPENERS[char]]
+            elif char in "-0123456789tfn":
+                self._state = "scalar"
+            else:
+                raise self._fail(char)
+        elif state == "after_value":
+            if char == ",":
+                self._state = "next_key"
+            elif char == "}":
+                self.done = True
+            else:
+                raise self._fail(char)
+        return None
+
+
+def _string_options(annotation: Any) -> Optional[Tuple[str, ...]]:
+    """Return the allowed values of a ``Literal`` or string ``Enum`` annotation, else None."""
+    if typing.get_origin(annotation) is typing.Literal:
+        options = typing.get_args(annotation)
+    elif isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        options = tuple(member.value for member in annotation)
+    else:
+        return None
+    return options if all(isinstance(option, str) for option in options) else None
+
+
+class StructuredStream:
+    """
+    Validates the streamed JSON of a structured output agent field by field.
+
+    :param model: The agent's ``output_content_type``.
+    :param cancellation_token: The token passed to ``run_stream``, cancelled when the
+        output turns out invalid.
+    :param on_field: Called with the name and typed value of every completed field.
+    """
+
+    def __init__(self, model: Type[BaseModel],
+                 cancellation_token: Optional[CancellationToken] = None,
+                 on_field: Optional[Callable[[str, Any], None]] = None) -> None:
+        self.model = model
+        self.cancellation_token = cancellation_token
+        self.on_field = on_field
+        self.fields: Dict[str, Any] = {}
+        self._names = {field.alias or name: name for name, field in model.model_fields.items()}
+        self._adapters = {name: TypeAdapter(field.annotation)
+                          for name, field in model.model_fields.items()}
+        self._options = {name: _string_options(field.annotation)
+                         for name, field in model.model_fields.items()}
+        self._forbid_extra = model.model_config.get("extra") == "forbid"
+        self._raw: Dict[str, Any] = {}
+        self._waiters: Dict[str, asyncio.Future[Any]] = {}
+        self._parser = IncrementalJSONParser()
+        self._message_id: Optional[str] = None
+
+    def reset(self) -> None:
+        """Forget the fields of the previous response, to parse another one."""
+        self.fields.clear()
+        self._raw.clear()
+        self._parser = IncrementalJSONParser()
+
+    async def field(self, name: str) -> Any:
+        """Wait for a field to complete and return its typed value."""
+        if name in self.fields:
+            return self.fields[name]
+        if name not in self._waiters:
+            self._waiters[name] = asyncio.get_running_loop().create_future()
+        return await asyncio.shield(self._waiters[name])
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Parse the next piece of the streamed JSON and validate the fields it completes.
+
+        Args:
+            text (str): The content of the next chunk.
+
+        Returns:
+            List[Tuple[str, Any]]: The names and typed values of the completed fields.
+
+        Raises:
+            StructuredOutputError: As soon as the output cannot match the model.
+        """
+        completed = []
+        for key, raw in self._parser.feed(text):
+            name = self._names.get(key)
+            if name is None:
+                if self._forbid_extra:
+                    raise StructuredOutputError(f"Unexpected field {key!r} for {self.model.__name__}.")
+                continue
+            try:
+                value = self._adapters[name].validate_python(raw)
+            except ValidationError as error:
+                raise StructuredOutputError(f"Invalid {name!r}: {error}") from error
+            self._raw[key] = raw
+            self.fields[name] = value
+            completed.append((name, value))
+            waiter = self._waiters.pop(name, None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(value)
+            if self.on_field is not None:
+                self.on_field(name, value)
+        self._check_partial()
+        if self._parser.done:
+            try:
+                self.model.model_validate(self._raw)
+            except ValidationError as error:
+                raise StructuredOutputError(str(error)) from error
+        return completed
+
+    def _check_partial(self) -> None:
+        name = self._names.get(self._parser.streaming_key or "")
+        options = self._options.get(name) if name else None
+        if not options:
+            return
+        partial = self._parser.partial
+        if partial is not None and not any(option.startswith(partial[1]) for option in options):
+            raise StructuredOutputError(
+                f"{name!r} starts with {partial[1]!r}, which is none of {list(options)}.")
+
+    async def tap(self, stream: AsyncIterable[T]) -> AsyncGenerator[T, None]:
+        """
+        Yield every item of a ``run_stream`` stream unchanged, parsing its streamed chunks.
+
+        On invalid output the cancellation token is cancelled and the stream closed
+        before the error is raised, which stops the model request. The stream is also
+        closed when the tap is, so close the tap (``contextlib.aclosing``) when leaving
+        the loop early.
+
+        Args:
+            stream (AsyncIterable[T]): The stream of a structured output agent.
+
+        Yields:
+            T: The items of the stream.
+
+        Raises:
+            StructuredOutputError: As soon as the output cannot match the model.
+        """
+        try:
+            async for item in stream:
+                if isinstance(item, ModelClientStreamingChunkEvent):
+                    if item.full_message_id != self._message_id:
+                        self.reset()
+                        self._message_id = item.full_message_id
+                    self.feed(item.content)
+                yield item
+        except StructuredOutputError:
+            if self.cancellation_token is not None:
+                self.cancellation_token.cancel()
+            for waiter in self._waiters.values():
+                waiter.cancel()
+            raise
+        finally:
+            close = getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
@@ -0,0 +1,568 @@
+"""
+A local Azure OpenAI-compatible chat completions server for load tests.
+
+The server speaks just enough HTTP/1.1 (with keep-alive and chunked transfer
+encoding) for the OpenAI SDK, so ``AzureOpenAIChatCompletionClient`` can use it as
+its ``azure_endpoint``. It implements chat completions with server-sent event
+streaming, tool calls and structured output, and its timing is configurable:
+time to first token (optionally growing with the prompt), tokens per second,
+random jitter and stalls, requests-per-minute and tokens-per-minute quotas
+answered with ``429`` and ``Retry-After``, and a rate of server errors. It
+counts the TCP connections and requests it receives, which makes it useful for
+measuring connection reuse without a live Azure endpoint.
+
+By default the server answers with a fixed reply, calls the first tool offered
+when the request has tools, and returns a JSON instance of the requested schema
+for structured output. Pass ``responses`` to script the replies instead.
+
+Usage:
+    async with StubOpenAIServer(ttft=0.2, tokens_per_second=50) as server:
+        settings = server.settings()
+        model_client = create_model_client(settings)
+
+Or as a standalone server for the examples:
+    uv run python -m autogen_exploration.stub_server --port 8000 --ttft 0.3 --tps 40
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from autogen_exploration.clients import AzureOpenAISettings
+
+STUB_API_VERSION = "2024-08-01-preview"
+STUB_DEPLOYMENT = "gpt-4o-mini"
+STUB_API_KEY = "stub-key"
+
+# The model versions reported back, matching what autogen_ext resolves deployments to.
+STUB_MODEL_VERSIONS = {
+    "gpt-4o-mini": "gpt-4o-mini-2024-07-18",
+    "gpt-4o": "gpt-4o-2024-08-06",
+}
+
+# A word and the whitespace after it counts as one token.
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+# Tool call arguments are streamed in pieces of this many characters.
+_ARGUMENT_PIECE = 8
+
+
+@dataclass
+class StubToolCall:
+    """
+    A tool call returned by the stub.
+
+    :param name: The name of the tool to call.
+    :param arguments: The arguments, or None to derive them from the tool's parameter schema.
+    """
+
+    name: str
+    arguments: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class StubReply:
+    """
+    A scripted assistant message: text content, tool calls, or both.
+
+    :param content: The message content.
+    :param tool_calls: The tool calls to make.
+    """
+
+    content: Optional[str] = None
+    tool_calls: List[StubToolCall] = field(default_factory=list)
+
+
+Responder = Callable[[Dict[str, Any]], Union[str, StubReply, None]]
+
+
+def count_tokens(text: str) -> int:
+    """Return the number of stub tokens (words with their trailing whitespace) in a text."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def example_from_schema(schema: Dict[str, Any], definitions: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Build a small value that validates against a JSON schema.
+
+    Used for the default tool call arguments and structured output. Defaults, constants
+    and the first enum value or union member are preferred; otherwise strings are
+    ``"stub"``, numbers are 0 and arrays hold a single item.
+
+    Args:
+        schema (Dict[str, Any]): The JSON schema.
+        definitions (Optional[Dict[str, Any]]): The ``$defs`` that ``$ref`` entries resolve to.
+
+    Returns:
+        Any: The example value.
+    """
+    definitions = schema.get("$defs", definitions or {})
+    if "$ref" in schema:
+        return example_from_schema(definitions[schema["$ref"].rsplit("/", 1)[-1]], definitions)
+    if "default" in schema:
+        return schema["default"]
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for union in ("anyOf", "oneOf", "allOf"):
+        if schema.get(union):
+            return example_from_schema(schema[union][0], definitions)
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {name: example_from_schema(value, definitions)
+                for name, value in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [example_from_schema(schema.get("items", {"type": "string"}), definitions)]
+    return {"string": "stub", "integer": 0, "number": 0.0, "boolean": False}.get(kind)
+
+
+class StubOpenAIServer:
+    """
+    An asyncio HTTP server answering ``/openai/deployments/<name>/chat/completions``.
+
+    Every knob is a plain attribute, so a load test can change the profile between runs.
+
+    :param host: The interface to bind to.
+    :param port: The port to bind to, 0 picks a free port.
+    :param ttft: Seconds before the first token of each response.
+    :param tokens_per_second: Completion tokens produced per second, 0 for no limit.
+    :param prefill_tokens_per_second: Prompt tokens read per second before the first token,
+        0 for a time to first token independent of the prompt.
+    :param jitter: Mean of an exponentially distributed delay added to the time to first
+        token, which gives the long latency tail of a shared deployment.
+    :param stall_rate: Fraction of requests that stall before their first token.
+    :param stall_seconds: Seconds a stalled request waits on top of its time to first token.
+    :param rate_limit_rpm: Requests accepted per minute before answering ``429``, 0 for no limit.
+    :param rate_limit_tpm: Prompt and completion tokens accepted per minute before answering
+        ``429``, 0 for no limit.
+    :param rate_limit_window: Seconds of the sliding window the quotas are enforced over. The
+        window holds ``window / 60`` of each per-minute quota, so a short window forbids bursts.
+    :param error_rate: Fraction of requests answered with ``500``.
+    :param reply: The assistant message content of the default replies.
+    :param responses: Scripted replies: a callable receiving the request body and returning
+        the reply text, a :class:`StubReply`, or None for the default reply; or a sequence of
+        replies served in order, the last one repeating.
+    :param seed: Seed of the jitter, stall and error random generator.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, ttft: float = 0.0,
+                 tokens_per_second: float = 0.0, jitter: float = 0.0, stall_rate: float = 0.0,
+                 prefill_tokens_per_second: float = 0.0,
+                 stall_seconds: float = 0.0, rate_limit_rpm: int = 0,
+                 rate_limit_tpm: int = 0, rate_limit_window: float = 60.0,
+                 error_rate: float = 0.0, reply: str = "Paris is the capital of France.",
+                 responses: Optional[Union[Responder, Sequence[Union[str, StubReply]]]] = None,
+                 seed: Optional[int] = None) -> None:
+        self._host = host
+        self._port = port
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.jitter = jitter
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.rate_limit_rpm = rate_limit_rpm
+        self.rate_limit_tpm = rate_limit_tpm
+        self.rate_limit_window = rate_limit_window
+        self.error_rate = error_rate
+        self.reply = reply
+        self.connections = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.completion_tokens = 0
+        self._responder: Optional[Responder] = None
+        self._script: Deque[Union[str, StubReply]] = deque()
+        if callable(responses):
+            self._responder = responses
+        elif responses is not None:
+            self._script.extend(responses)
+        self._random = random.Random(seed)
+        self._accepted: Deque[float] = deque()
+        self._used_tokens: Deque[Tuple[float, int]] = deque()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Set[asyncio.Task[None]] = set()
+
+    @property
+    def url(self) -> str:
+        """The base URL to use as ``azure_endpoint``."""
+        return f"http://{self._host}:{self._port}/"
+
+    def settings(self, deployment: str = STUB_DEPLOYMENT) -> AzureOpenAISettings:
+        """Return settings pointing a model client at this server."""
+        return AzureOpenAISettings(deployment=deployment, api_version=STUB_API_VERSION,
+                                   endpoint=self.url, api_key=STUB_API_KEY)
+
+    async def start(self) -> "StubOpenAIServer":
+        """Start listening for connections."""
+        self._server = await asyncio.start_server(self._handle_connection, self._host, self._port)
+        self._port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        """Stop the server and drop open connections."""
+        if self._server is not None:
+            self._server.close()
+            for handler in list(self._handlers):
+                handler.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "StubOpenAIServer":
+        return await self.start()
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                self.requests += 1
+                path, body = request
+                await self._respond(writer, path, body)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, path: str, body: Dict[str, Any]) -> None:
+        if "/chat/completions" not in path:
+            _write_response(writer, 404, {"error": {"code": "NotFound",
+                                                    "message": f"Unknown path {path}"}})
+            await writer.drain()
+            return
+        retry_after = self._throttle(self.prompt_tokens(body))
+        if retry_after is not None:
+            self.rate_limited += 1
+            seconds = max(math.ceil(retry_after), 1)
+            _write_response(writer, 429, {"error": {
+                "code": "429",
+                "message": "Requests to the ChatCompletions_Create Operation have exceeded the "
+                           f"call rate limit. Please retry after {seconds} seconds.",
+            }}, {"Retry-After": str(seconds), "retry-after-ms": str(int(retry_after * 1000))})
+            await writer.drain()
+            return
+
+        start = time.perf_counter()
+        first_token = self.ttft + (self._random.expovariate(1 / self.jitter) if self.jitter else 0)
+        if self.prefill_tokens_per_second:
+            first_token += self.prompt_tokens(body) / self.prefill_tokens_per_second
+        if self.stall_rate and self._random.random() < self.stall_rate:
+            first_token += self.stall_seconds
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.failed += 1
+            await asyncio.sleep(first_token)
+            _write_response(writer, 500, {"error": {"code": "InternalServerError",
+                                                    "message": "The stub failed on purpose."}})
+            await writer.drain()
+            return
+
+        completion = self.completion(body)
+        tokens = completion["usage"]["completion_tokens"]
+        self.completion_tokens += tokens
+        if self.rate_limit_tpm:
+            self._used_tokens.append((time.monotonic(), completion["usage"]["total_tokens"]))
+        if not body.get("stream"):
+            await asyncio.sleep(first_token + self._generation_time(tokens))
+            _write_response(writer, 200, completion)
+            await writer.drain()
+            return
+
+        await asyncio.sleep(first_token)
+        _start_event_stream(writer)
+        sent = 0
+        try:
+            for index, chunk in enumerate(self.completion_chunks(body, completion)):
+                if index and chunk["choices"]:
+                    await asyncio.sleep(max(start + first_token + self._generation_time(index)
+                                            - time.perf_counter(), 0))
+                _write_chunk(writer, f"data: {json.dumps(chunk)}\n\n".encode())
+                await writer.drain()
+                sent = index
+        except ConnectionError:
+            # The client closed the stream: the tokens after it were never generated.
+            self.cancelled += 1
+            self.completion_tokens -= max(tokens - sent, 0)
+            raise
+        _write_chunk(writer, b"data: [DONE]\n\n")
+        _write_chunk(writer, b"")
+        await writer.drain()
+
+    def _generation_time(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _throttle(self, prompt_tokens: int) -> Optional[float]:
+        """Admit a request, or return the seconds to wait when it is over a quota."""
+        now = time.monotonic()
+        window = self.rate_limit_window
+        while self._accepted and now - self._accepted[0] >= window:
+            self._accepted.popleft()
+        while self._used_tokens and now - self._used_tokens[0][0] >= window:
+            self._used_tokens.popleft()
+        if self.rate_limit_rpm and len(self._accepted) >= self.rate_limit_rpm * window / 60:
+            return window - (now - self._accepted[0])
+        if self.rate_limit_tpm:
+            quota = self.rate_limit_tpm * window / 60
+            used = sum(tokens for _, tokens in self._used_tokens)
+            if self._used_tokens and used + prompt_tokens > quota:
+                # Wait until enough of the window's tokens have aged out.
+                for accepted, tokens in self._used_tokens:
+                    used -= tokens
+                    if used + prompt_tokens <= quota:
+                        break
+                return window - (now - accepted)
+        self._accepted.append(now)
+        return None
+
+    @staticmethod
+    def model_version(body: Dict[str, Any]) -> str:
+        """Return the model version reported for a request body."""
+        model = body.get("model") or STUB_DEPLOYMENT
+        return STUB_MODEL_VERSIONS.get(model, model)
+
+    @staticmethod
+    def prompt_tokens(body: Dict[str, Any]) -> int:
+        """Return the number of stub tokens in the messages of a request body."""
+        return sum(count_tokens(json.dumps(m.get("content"))) for m in body.get("messages", []))
+
+    def next_reply(self, body: Dict[str, Any]) -> StubReply:
+        """Return the scripted reply for a request body, falling back to the default reply."""
+        reply: Union[str, StubReply, None] = None
+        if self._responder is not None:
+            reply = self._responder(body)
+        elif self._script:
+            reply = self._script.popleft() if len(self._script) > 1 else self._script[0]
+        if reply is None:
+            return self.default_reply(body)
+        return StubReply(content=reply) if isinstance(reply, str) else reply
+
+    def default_reply(self, body: Dict[str, Any]) -> StubReply:
+        """
+        Return the unscripted reply for a request body.
+
+        Structured output requests get an instance of the requested schema. Requests
+        offering tools get a call to the chosen (or first) tool, unless the last message
+        is already a tool result. Everything else gets the fixed reply.
+        """
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            return StubReply(content=json.dumps(example_from_schema(schema)))
+        if response_format.get("type") == "json_object":
+            return StubReply(content=json.dumps({"answer": self.reply}))
+
+        tools = body.get("tools") or []
+        tool_choice = body.get("tool_choice", "auto")
+        messages = body.get("messages") or [{}]
+        if tools and tool_choice != "none" and messages[-1].get("role") != "tool":
+            name = (tool_choice["function"]["name"] if isinstance(tool_choice, dict)
+                    else tools[0]["function"]["name"])
+            return StubReply(tool_calls=[StubToolCall(name)])
+        return StubReply(content=self.reply)
+
+    def completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the chat completion returned for a request body."""
+        reply = self.next_reply(body)
+        parameters = {tool["function"]["name"]: tool["function"].get("parameters", {})
+                      for tool in body.get("tools") or []}
+        message: Dict[str, Any] = {"role": "assistant", "content": reply.content}
+        completion_tokens = count_tokens(reply.content or "")
+        if reply.tool_calls:
+            message["tool_calls"] = []
+            for call in reply.tool_calls:
+                arguments = call.arguments
+                if arguments is None:
+                    arguments = example_from_schema(parameters.get(call.name, {}))
+                encoded = json.dumps(arguments)
+                completion_tokens += math.ceil(len(encoded) / _ARGUMENT_PIECE)
+                message["tool_calls"].append({
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": call.name, "arguments": encoded},
+                })
+        prompt_tokens = self.prompt_tokens(body)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.model_version(body),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "tool_calls" if reply.tool_calls else "stop",
+                "message": message,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @staticmethod
+    def completion_chunks(body: Dict[str, Any], completion: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Split a chat completion into the ``chat.completion.chunk`` events of its stream.
+
+        There is one event per token of content or piece of tool call arguments, then the
+        finish reason, then the usage when the request asked for it in ``stream_options``.
+        """
+        choice = completion["choices"][0]
+        message = choice["message"]
+        deltas: List[Dict[str, Any]] = [{"role": "assistant", "content": ""}]
+        deltas.extend({"content": token}
+                      for token in _TOKEN_PATTERN.findall(message.get("content") or ""))
+        for index, call in enumerate(message.get("tool_calls", [])):
+            deltas.append({"tool_calls": [{
+                "index": index,
+                "id": call["id"],
+                "type": "function",
+                "function": {"name": call["function"]["name"], "arguments": ""},
+            }]})
+            arguments = call["function"]["arguments"]
+            deltas.extend({"tool_calls": [{"index": index, "function": {
+                "arguments": arguments[start:start + _ARGUMENT_PIECE]}}]}
+                for start in range(0, len(arguments), _ARGUMENT_PIECE))
+
+        def chunk(choices: List[Dict[str, Any]], **extra: Any) -> Dict[str, Any]:
+            return {"id": completion["id"], "object": "chat.completion.chunk",
+                    "created": completion["created"], "model": completion["model"],
+                    "choices": choices, **extra}
+
+        chunks = [chunk([{"index": 0, "delta": delta, "finish_reason": None}]) for delta in deltas]
+        chunks.append(chunk([{"index": 0, "delta": {}, "finish_reason": choice["finish_reason"]}]))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunks.append(chunk([], usage=completion["usage"]))
+        return chunks
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, Dict[str, Any]]]:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    _, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0"))
+    raw = await reader.readexactly(length) if length else b""
+    return path, (json.loads(raw) if raw else {})
+
+
+_REASONS = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                    headers: Optional[Dict[str, str]] = None) -> None:
+    body = json.dumps(payload).encode()
+    extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"{extra}"
+        f"Connection: keep-alive\r\n\r\n".encode() + body
+    )
+
+
+def _start_event_stream(writer: asyncio.StreamWriter) -> None:
+    writer.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: text/event-stream\r\n"
+        b"Cache-Control: no-cache\r\n"
+        b"Transfer-Encoding: chunked\r\n"
+        b"Connection: keep-alive\r\n\r\n"
+    )
+
+
+def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    # An empty chunk ends the chunked body.
+    writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = StubOpenAIServer(host=args.host, port=args.port, ttft=args.ttft,
+                              tokens_per_second=args.tps, jitter=args.jitter,
+                              prefill_tokens_per_second=args.prefill_tps,
+                              stall_rate=args.stall_rate, stall_seconds=args.stall_seconds,
+                              rate_limit_rpm=args.rpm, rate_limit_tpm=args.tpm,
+                              rate_limit_window=args.window, error_rate=args.error_rate,
+                              reply=args.reply, seed=args.seed)
+    async with server:
+        print(f"Stub Azure OpenAI server listening on {server.url}\n"
+              f"  AZURE_OPENAI_API_INSTANCE_NAME={server.url}\n"
+              f"  AZURE_OPENAI_API_KEY={STUB_API_KEY}\n"
+              f"  AZURE_OPENAI_API_DEPLOYMENT_NAME={STUB_DEPLOYMENT}\n"
+              f"  AZURE_OPENAI_API_VERSION={STUB_API_VERSION}", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            print(f"connections={server.connections} requests={server.requests} "
+                  f"rate_limited={server.rate_limited} failed={server.failed} "
+                  f"completion_tokens={server.completion_tokens}", flush=True)
+
+
+def main() -> None:
+    """Run the stub server from the command line until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--ttft", type=float, default=0.0, help="seconds to first token")
+    parser.add_argument("--tps", type=float, default=0.0, help="completion tokens per second")
+    parser.add_argument("--prefill-tps", type=float, default=0.0,
+                        help="prompt tokens read per second before the first token")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="mean extra seconds to first token, exponentially distributed")
+    parser.add_argument("--stall-rate", type=float, default=0.0,
+                        help="fraction of requests that stall before the first token")
+    parser.add_argument("--stall-seconds", type=float, default=0.0,
+                        help="seconds a stalled request waits")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429")
+    parser.add_argument("--tpm", type=int, default=0, help="tokens per minute before 429")
+    parser.add_argument("--window", type=float, default=60.0,
+                        help="seconds of the sliding window the quotas are enforced over")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500 answers")
+    parser.add_argument("--reply", default="Paris is the capital of France.")
+    parser.add_argument("--seed", type=int, default=None)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
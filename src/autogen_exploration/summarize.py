@@ -0,0 +1,314 @@
+"""
+Map-reduce summarization of large documents.
+
+The fetcher agent of example_05_mcp_workbench.py puts a whole fetched page into
+one prompt and waits for one long completion. :class:`DocumentSummarizer`
+summarizes a document in stages instead:
+
+- the text (HTML is reduced to its readable text first) is split on paragraph,
+  then sentence, then word boundaries into chunks of at most ``chunk_tokens``;
+- the chunks are summarized concurrently, at most ``max_concurrency`` at a time;
+- the summaries are merged in groups of up to ``fan_in`` that fit the same token
+  budget, level after level, until one summary is left;
+- every summary is cached under the hash of its request (the text, instructions
+  and model arguments), so summarizing an unchanged page again costs no request,
+  and a page with a few changed paragraphs only pays for the changed chunks and
+  the merges above them. Pass a :class:`~autogen_exploration.models.ResponseCache`
+  with a path to keep the summaries across processes.
+
+Every request stays within a known size whatever the document's length, which
+keeps long pages inside the context window and the tokens-per-minute quota.
+
+Usage:
+    uv run python -m autogen_exploration.summarize https://en.wikipedia.org/wiki/Seattle
+    uv run python -m autogen_exploration.summarize page.html --chunk-tokens 1500
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+from dotenv import load_dotenv
+
+from autogen_exploration.models.budget import TokenCounter, get_token_counter
+from autogen_exploration.models.cache import CachedResponse, ResponseCache
+from autogen_exploration.models.keys import request_key
+
+DEFAULT_CHUNK_TOKENS = 2000
+DEFAULT_FAN_IN = 8
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_CHUNK_INSTRUCTIONS = (
+    "Summarize this part of a longer document in a few sentences. Keep names, numbers and "
+    "dates; leave out navigation, references and boilerplate.")
+DEFAULT_MERGE_INSTRUCTIONS = (
+    "These are summaries of consecutive parts of one document. Merge them into a single "
+    "concise summary of the whole, without repeating yourself.")
+
+_SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "footer", "form"}
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "br", "li", "tr", "table", "ul", "ol",
+               "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "dd", "dt", "figcaption"}
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """
+    Return the readable text of an HTML page, one paragraph per block element.
+
+    Scripts, styles, navigation, footers and forms are left out.
+
+    Args:
+        html (str): The page.
+
+    Returns:
+        str: Its paragraphs, separated by blank lines.
+    """
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    paragraphs = (" ".join(paragraph.split()) for paragraph in "".join(extractor.parts).split("\n\n"))
+    return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+
+def _pieces(text: str, max_tokens: int,
+            counter: TokenCounter) -> Iterator[Tuple[str, str, int]]:
+    """Yield the paragraphs, else sentences, else words of a text, with a separator and tokens."""
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        tokens = counter.count_text(paragraph)
+        if tokens <= max_tokens:
+            yield paragraph, "\n\n", tokens
+            continue
+        sentences = _SENTENCE_END.split(paragraph)
+        for index, sentence in enumerate(sentences):
+            separator = "\n\n" if index == len(sentences) - 1 else " "
+            tokens = counter.count_text(sentence)
+            if tokens <= max_tokens:
+                yield sentence, separator, tokens
+                continue
+            words = sentence.split()
+            for position, word in enumerate(words):
+                yield (word, separator if position == len(words) - 1 else " ",
+                       counter.count_text(word))
+
+
+def split_text(text: str, max_tokens: int, counter: Optional[TokenCounter] = None) -> List[str]:
+    """
+    Split a text into chunks of at most ``max_tokens``, on the largest boundaries that fit.
+
+    Paragraphs are packed into chunks whole; a paragraph over the budget is split
+    into sentences, and a sentence over the budget into words. A single word over
+    the budget makes a chunk of its own.
+
+    Args:
+        text (str): The text, with paragraphs separated by blank lines.
+        max_tokens (int): The token budget of a chunk.
+        counter (Optional[TokenCounter]): The token counter, the shared gpt-4o one by default.
+
+    Returns:
+        List[str]: The chunks, in order.
+    """
+    counter = counter or get_token_counter()
+    chunks: List[str] = []
+    pending: List[str] = []
+    pending_tokens = 0
+    for piece, separator, tokens in _pieces(text, max_tokens, counter):
+        if pending and pending_tokens + tokens > max_tokens:
+            chunks.append("".join(pending).strip())
+            pending, pending_tokens = [], 0
+        pending.append(piece + separator)
+        pending_tokens += tokens
+    if pending:
+        chunks.append("".join(pending).strip())
+    return chunks
+
+
+@dataclass
+class SummaryStats:
+    """Requests and tokens of the documents a :class:`DocumentSummarizer` summarized."""
+
+    documents: int = 0
+    chunks: int = 0
+    levels: int = 0
+    requests: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    max_prompt_tokens: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters as a flat dictionary."""
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "levels": self.levels,
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+class DocumentSummarizer:
+    """
+    Summarizes documents of any length by summarizing chunks and merging the summaries.
+
+    :param model_client: The model client.
+    :param chunk_tokens: The token budget of a chunk, and of the summaries merged at once.
+    :param fan_in: The most summaries merged by one request.
+    :param max_concurrency: Requests in flight at the same time.
+    :param cache: Where summaries are kept, by request hash; a memory-only cache by default.
+    :param chunk_instructions: The system message of the chunk summaries.
+    :param merge_instructions: The system message of the merges.
+    """
+
+    def __init__(self, model_client: ChatCompletionClient,
+                 chunk_tokens: int = DEFAULT_CHUNK_TOKENS, fan_in: int = DEFAULT_FAN_IN,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 cache: Optional[ResponseCache] = None,
+                 chunk_instructions: str = DEFAULT_CHUNK_INSTRUCTIONS,
+                 merge_instructions: str = DEFAULT_MERGE_INSTRUCTIONS) -> None:
+        self.model_client = model_client
+        self.chunk_tokens = chunk_tokens
+        self.fan_in = fan_in
+        self.cache = cache if cache is not None else ResponseCache()
+        self.chunk_instructions = SystemMessage(content=chunk_instructions)
+        self.merge_instructions = SystemMessage(content=merge_instructions)
+        self.counter = get_token_counter()
+        self.stats = SummaryStats()
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def _complete(self, instructions: SystemMessage, text: str) -> str:
+        messages = [instructions, UserMessage(content=text, source="user")]
+        key = request_key(self.model_client, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats.cache_hits += 1
+            return str(cached.result.content)
+        async with self._slots:
+            start = time.perf_counter()
+            result = await self.model_client.create(messages)
+            latency = time.perf_counter() - start
+        self.stats.requests += 1
+        self.stats.prompt_tokens += result.usage.prompt_tokens
+        self.stats.completion_tokens += result.usage.completion_tokens
+        self.stats.max_prompt_tokens = max(self.stats.max_prompt_tokens, result.usage.prompt_tokens)
+        self.cache.set(key, CachedResponse(result, None, latency))
+        return str(result.content)
+
+    def _groups(self, summaries: List[str]) -> List[List[str]]:
+        """Pack consecutive summaries into groups that fit the chunk budget and the fan-in."""
+        groups: List[List[str]] = [[]]
+        tokens = 0
+        for summary in summaries:
+            size = self.counter.count_text(summary)
+            if groups[-1] and (len(groups[-1]) == self.fan_in or tokens + size > self.chunk_tokens):
+                groups.append([])
+                tokens = 0
+            groups[-1].append(summary)
+            tokens += size
+        if len(groups) == len(summaries) > 1:
+            # Summaries too long to pair up would never shrink to one: merge them in pairs.
+            groups = [summaries[index:index + 2] for index in range(0, len(summaries), 2)]
+        return groups
+
+    async def summarize(self, document: str, html: bool = False) -> str:
+        """
+        Summarize a document.
+
+        Args:
+            document (str): The text, or an HTML page when ``html`` is set.
+            html (bool): Whether to extract the readable text of the document first.
+
+        Returns:
+            str: The summary.
+        """
+        start = time.perf_counter()
+        text = await asyncio.to_thread(html_to_text, document) if html else document
+        chunks = await asyncio.to_thread(split_text, text, self.chunk_tokens, self.counter)
+        summaries = list(await asyncio.gather(
+            *(self._complete(self.chunk_instructions, chunk) for chunk in chunks)))
+        levels = 1
+        while len(summaries) > 1:
+            groups = self._groups(summaries)
+            summaries = list(await asyncio.gather(
+                *(self._complete(self.merge_instructions, "\n\n".join(group))
+                  for group in groups)))
+            levels += 1
+        self.stats.documents += 1
+        self.stats.chunks += len(chunks)
+        self.stats.levels = max(self.stats.levels, levels)
+        self.stats.seconds += time.perf_counter() - start
+        return summaries[0] if summaries else ""
+
+
+async def _main(args: argparse.Namespace) -> None:
+    # pylint: disable=import-outside-toplevel
+    import httpx
+
+    from autogen_exploration.clients import close_shared_clients, get_model_client
+
+    if args.source.startswith(("http://", "https://")):
+        async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as http:
+            response = await http.get(args.source)
+            response.raise_for_status()
+            document = response.text
+    else:
+        with open(args.source, encoding="utf-8") as file:
+            document = file.read()
+    html = args.source.startswith(("http://", "https://")) or args.source.endswith((".html", ".htm"))
+    summarizer = DocumentSummarizer(get_model_client(), chunk_tokens=args.chunk_tokens,
+                                    fan_in=args.fan_in, max_concurrency=args.concurrency,
+                                    cache=ResponseCache(args.cache) if args.cache else None)
+    print(await summarizer.summarize(document, html=html))
+    print(json.dumps(summarizer.stats.summary()))
+    await close_shared_clients()
+
+
+def main() -> None:
+    """Summarize a web page or a file."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="URL, HTML file or text file to summarize")
+    parser.add_argument("--chunk-tokens", type=int, default=DEFAULT_CHUNK_TOKENS)
+    parser.add_argument("--fan-in", type=int, default=DEFAULT_FAN_IN)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--cache", help="SQLite file keeping the summaries across runs")
+    load_dotenv()
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""
+Pools of cloned teams, and snapshots of team state to fork continuations from.
+
+A team runs one task at a time: example_01_roundrobin_team.py runs its task three
+times in a row and resets the team in between. :class:`TeamPool` builds up to
+``size`` clones of a team from its component config, so K tasks run at once on
+independent clones. A clone is reset and reused when its task is done rather than
+rebuilt.
+
+The clones share the model clients of the original team: each client is dumped as
+a reference to the live instance (:class:`SharedModelClient`), so every clone
+uses the same connection pool, token provider, caches and rate limits. Everything
+else (the agents, their model contexts and the termination conditions) is rebuilt
+from the config, so no state leaks between clones. Tools must survive a component
+config round trip: ``FunctionTool`` stores the function's source, which is
+executed again with the imports listed in its ``global_imports``.
+
+A :class:`TeamSnapshot` captures the state of a group chat team (round robin,
+selector or swarm) after an expensive conversation, and forks any number of
+independent teams that continue from it, for A/B prompts or retries, without
+running the earlier turns again. The snapshot is a compact binary: every string
+of the state (the text of each message, which the thread and every agent's model
+context repeat) is stored once in a string table, and the result is compressed.
+
+Usage:
+    pool = TeamPool(team, size=8)
+    results = await pool.run_many(["Write a poem about fall.", "Write a poem about rain."])
+    print(pool.stats.summary())
+
+    snapshot = await TeamSnapshot.capture(team)
+    forks = await snapshot.fork_many(2)
+    await asyncio.gather(forks[0].run(task="Make it rhyme."), forks[1].run(task="Make it shorter."))
+"""
+
+import asyncio
+import json
+import time
+import uuid
+import weakref
+import zlib
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import (Any, AsyncGenerator, AsyncIterator, Deque, Dict, Iterator, List, Mapping,
+                    Optional, Sequence, Union)
+
+from autogen_agentchat.base import TaskResult, Team, TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage
+from autogen_core import CancellationToken, Component, ComponentModel
+from autogen_core.models import ChatCompletionClient
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.models.base import DelegatingChatCompletionClient
+
+DEFAULT_SIZE = 4
+MAX_LATENCY_SAMPLES = 1000
+
+_shared_clients: "weakref.WeakValueDictionary[str, ChatCompletionClient]" = (
+    weakref.WeakValueDictionary())
+_client_keys: "weakref.WeakKeyDictionary[ChatCompletionClient, str]" = weakref.WeakKeyDictionary()
+
+
+class SharedModelClientConfig(BaseModel):
+    """The config of a :class:`SharedModelClient`: the key of a live client in this process."""
+
+    key: str
+
+
+class SharedModelClient(DelegatingChatCompletionClient, Component[SharedModelClientConfig]):
+    """
+    A model client whose component config refers to a live client of this process.
+
+    Loading the config returns the live client itself, not a copy, so teams loaded
+    from it share the client. The config can only be loaded in the process that
+    dumped it, while the client is alive.
+
+    :param client: The model client to share.
+    """
+
+    component_type = "model"
+    component_config_schema = SharedModelClientConfig
+    component_provider_override = "autogen_exploration.teams.SharedModelClient"
+
+    def __init__(self, client: ChatCompletionClient) -> None:
+        super().__init__(client)
+        # A random key, not id(client): ids are reused once a client is collected, and a
+        # stale config would then load an unrelated client instead of failing.
+        key = _client_keys.get(client)
+        if key is None:
+            key = _client_keys[client] = uuid.uuid4().hex
+            _shared_clients[key] = client
+        self.key = key
+
+    def _to_config(self) -> SharedModelClientConfig:
+        return SharedModelClientConfig(key=self.key)
+
+    @classmethod
+    def _from_config(cls, config: SharedModelClientConfig) -> ChatCompletionClient:  # type: ignore[override]
+        client = _shared_clients.get(config.key)
+        if client is None:
+            raise ValueError(f"No live model client {config.key} in this process.")
+        return client
+
+
+def _holders(team: Any) -> Iterator[Any]:
+    """Yield a team, its participants, their model contexts and the participants of nested teams."""
+    yield team
+    context = getattr(team, "_model_context", None)
+    if context is not None:
+        yield context
+    for participant in getattr(team, "_participants", []):
+        yield from _holders(participant)
+
+
+def _model_clients(team: Team) -> List[ChatCompletionClient]:
+    """Return the model clients of a team and its agents, to keep them alive."""
+    return [client for holder in _holders(team)
+            if isinstance(client := getattr(holder, "_model_client", None), ChatCompletionClient)]
+
+
+@contextmanager
+def _shared_clients_of(team: Team) -> Iterator[None]:
+    """Swap the model clients of a team and its agents for shared references while dumping it."""
+    swapped = []
+    for holder in _holders(team):
+        client = getattr(holder, "_model_client", None)
+        if isinstance(client, ChatCompletionClient) and not isinstance(client, SharedModelClient):
+            swapped.append((holder, client))
+            holder._model_client = SharedModelClient(client)  # pylint: disable=protected-access
+    try:
+        yield
+    finally:
+        for holder, client in swapped:
+            holder._model_client = client  # pylint: disable=protected-access
+
+
+def dump_team(team: Team) -> ComponentModel:
+    """
+    Return the component config of a team, with its model clients shared rather than copied.
+
+    Args:
+        team (Team): The team.
+
+    Returns:
+        ComponentModel: A config that :meth:`Team.load_component` builds a clone from.
+    """
+    with _shared_clients_of(team):
+        return team.dump_component()
+
+
+@dataclass
+class TeamPoolStats:
+    """Throughput and latency of the tasks a :class:`TeamPool` ran."""
+
+    tasks: int = 0
+    errors: int = 0
+    clones: int = 0
+    reuses: int = 0
+    seconds: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=MAX_LATENCY_SAMPLES))
+    waits: Deque[float] = field(default_factory=lambda: deque(maxlen=MAX_LATENCY_SAMPLES))
+
+    @property
+    def tasks_per_second(self) -> float:
+        """Tasks completed per second of :meth:`TeamPool.run_many`."""
+        return self.tasks / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters, throughput, task latency percentiles and mean wait for a clone."""
+        latencies = summarize_latencies(self.latencies)
+        waits = summarize_latencies(self.waits)
+        return {
+            "tasks": self.tasks,
+            "errors": self.errors,
+            "clones": self.clones,
+            "reuses": self.reuses,
+            "tasks_per_s": round(self.tasks_per_second, 2),
+            **{name: round(value, 1) for name, value in latencies.items() if name != "count"},
+            "mean_wait_ms": round(waits["mean_ms"], 1),
+        }
+
+
+class TeamPool:
+    """
+    Runs tasks concurrently, each on an idle clone of a team.
+
+    :param team: The team to clone; it is not run by the pool itself.
+    :param size: Clones, and so tasks running at the same time, at most.
+    """
+
+    def __init__(self, team: Team, size: int = DEFAULT_SIZE) -> None:
+        self.size = size
+        self.config = dump_team(team)
+        self.stats = TeamPoolStats()
+        # Keep the shared clients alive for as long as the pool can load clones.
+        self._clients = _model_clients(team)
+        self._idle: List[Team] = []
+        self._slots = asyncio.Semaphore(size)
+
+    def clone(self) -> Team:
+        """Build a new clone of the team from its config."""
+        self.stats.clones += 1
+        return Team.load_component(self.config)
+
+    @asynccontextmanager
+    async def team(self) -> AsyncIterator[Team]:
+        """
+        Lend an idle clone, building one if none is idle, and reset it when it is returned.
+
+        Waits while ``size`` clones are lent out. A clone whose task or reset failed is
+        dropped instead of reused.
+        """
+        async with self._slots:
+            if self._idle:
+                self.stats.reuses += 1
+                team = self._idle.pop()
+            else:
+                team = self.clone()
+            yield team
+            await team.reset()
+            self._idle.append(team)
+
+    async def run(self, task: str, cancellation_token: Optional[CancellationToken] = None
+                  ) -> TaskResult:
+        """Run a task on an idle clone and return its result."""
+        queued = time.perf_counter()
+        try:
+            async with self.team() as team:
+                start = time.perf_counter()
+                self.stats.waits.append(start - queued)
+                result = await team.run(task=task, cancellation_token=cancellation_token)
+                self.stats.latencies.append(time.perf_counter() - start)
+        except Exception:
+            self.stats.errors += 1
+            raise
+        self.stats.tasks += 1
+        return result
+
+    async def run_stream(self, task: str, cancellation_token: Optional[CancellationToken] = None
+                         ) -> AsyncGenerator[Union[BaseAgentEvent, BaseChatMessage, TaskResult], None]:
+        """Run a task on an idle clone and yield its messages, then its result."""
+        queued = time.perf_counter()
+        async with self.team() as team:
+            start = time.perf_counter()
+            self.stats.waits.append(start - queued)
+            async for message in team.run_stream(task=task, cancellation_token=cancellation_token):
+                yield message
+            self.stats.latencies.append(time.perf_counter() - start)
+        self.stats.tasks += 1
+
+    async def run_many(self, tasks: Sequence[str]) -> List[Union[TaskResult, BaseException]]:
+        """
+        Run tasks concurrently, ``size`` at a time, and return their results in order.
+
+        Args:
+            tasks (Sequence[str]): The tasks.
+
+        Returns:
+            List[Union[TaskResult, BaseException]]: The result of every task, or the
+            exception it failed with.
+        """
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self.run(task) for task in tasks), return_exceptions=True)
+        self.stats.seconds += time.perf_counter() - start
+        return list(results)
+
+
+SNAPSHOT_FORMAT = b"ATS1"
+
+
+def encode_state(value: Any) -> bytes:
+    """
+    Encode a JSON-like value compactly, storing each distinct string once.
+
+    Every string, dictionary keys included, is replaced by its index in a string
+    table (written in base 36, so the encoded tree holds no other strings), and
+    the table and tree are compressed together.
+
+    Args:
+        value (Any): A value made of dictionaries with string keys, lists, strings,
+            numbers, booleans and None.
+
+    Returns:
+        bytes: The encoded value, for :func:`decode_state`.
+
+    Raises:
+        TypeError: If the value holds anything else, such as a datetime; convert it
+            first, e.g. with ``pydantic_core.to_jsonable_python``.
+    """
+    indices: Dict[str, str] = {}
+    table: List[str] = []
+
+    def ref(text: str) -> str:
+        index = indices.get(text)
+        if index is None:
+            index = indices[text] = _base36(len(table))
+            table.append(text)
+        return index
+
+    def walk(item: Any) -> Any:
+        if isinstance(item, str):
+            return ref(item)
+        if item is None or isinstance(item, (bool, int, float)):
+            return item
+        if isinstance(item, dict):
+            if not all(isinstance(key, str) for key in item):
+                raise TypeError("Team state dictionaries must have string keys.")
+            return {ref(key): walk(child) for key, child in item.items()}
+        if isinstance(item, (list, tuple)):
+            return [walk(child) for child in item]
+        raise TypeError(f"Cannot encode a {type(item).__name__} in a team state.")
+
+    tree = walk(value)
+    payload = json.dumps([table, tree], separators=(",", ":"))
+    return SNAPSHOT_FORMAT + zlib.compress(payload.encode("utf-8"))
+
+
+def _base36(number: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    text = ""
+    while True:
+        number, digit = divmod(number, 36)
+        text = digits[digit] + text
+        if not number:
+            return text
+
+
+def decode_state(data: bytes) -> Any:
+    """
+    Decode a value encoded by :func:`encode_state`.
+
+    Equal strings decode to the same string object, so decoded states share their
+    message texts in memory.
+
+    Raises:
+        ValueError: If the data is not an encoded state.
+    """
+    if not data.startswith(SNAPSHOT_FORMAT):
+        raise ValueError("Not an encoded team state.")
+    table, tree = json.loads(zlib.decompress(data[len(SNAPSHOT_FORMAT):]))
+
+    def walk(item: Any) -> Any:
+        if isinstance(item, str):
+            return table[int(item, 36)]
+        if isinstance(item, dict):
+            return {table[int(key, 36)]: walk(child) for key, child in item.items()}
+        if isinstance(item, list):
+            return [walk(child) for child in item]
+        return item
+
+    return walk(tree)
+
+
+class TeamSnapshot:
+    """
+    The config and state of a team at one point of its conversation, to fork teams from.
+
+    The config refers to the team's live model clients (see :class:`SharedModelClient`),
+    so a snapshot, including one restored with :meth:`from_bytes`, forks teams in the
+    process that captured it.
+
+    :param data: The encoded config and state, from :meth:`to_bytes`.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self._decoded: Optional[Dict[str, Any]] = None
+        self._config: Optional[ComponentModel] = None
+        self._clients: List[ChatCompletionClient] = []
+
+    @classmethod
+    async def capture(cls, team: Team) -> "TeamSnapshot":
+        """
+        Capture the config and state of a team that is not running.
+
+        Args:
+            team (Team): The team, after the turns to share.
+
+        Returns:
+            TeamSnapshot: The snapshot.
+        """
+        # Agents may keep values such as datetimes in their state; load_state parses them back.
+        state = to_jsonable_python(await team.save_state())
+        snapshot = cls(encode_state({"config": dump_team(team).model_dump(mode="json"),
+                                     "state": state}))
+        snapshot._clients = _model_clients(team)
+        return snapshot
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TeamSnapshot":
+        """Restore a snapshot saved with :meth:`to_bytes`."""
+        return cls(data)
+
+    def to_bytes(self) -> bytes:
+        """Return the encoded snapshot."""
+        return self.data
+
+    @property
+    def state(self) -> Mapping[str, Any]:
+        """The team state, decoded once and shared, read-only, by every fork."""
+        if self._decoded is None:
+            self._decoded = decode_state(self.data)
+        return self._decoded["state"]
+
+    @property
+    def config(self) -> ComponentModel:
+        """The component config of the team."""
+        if self._config is None:
+            self.state  # pylint: disable=pointless-statement
+            self._config = ComponentModel.model_validate(self._decoded["config"])  # type: ignore[index]
+        return self._config
+
+    async def fork(self, termination_condition: Optional[TerminationCondition] = None) -> Team:
+        """
+        Return a new team, built from the snapshot's config and loaded with its state.
+
+        Args:
+            termination_condition (Optional[TerminationCondition]): Replaces the team's
+                termination condition in the fork, e.g. to continue for a few more turns.
+
+        Returns:
+            Team: The fork, which continues the conversation on its next run.
+        """
+        config = self.config
+        if termination_condition is not None:
+            config = config.model_copy(deep=True)
+            config.config["termination_condition"] = termination_condition.dump_component().model_dump()
+        team = Team.load_component(config)
+        await team.load_state(self.state)
+        return team
+
+    async def fork_many(self, count: int,
+                        termination_condition: Optional[TerminationCondition] = None) -> List[Team]:
+        """Return ``count`` independent forks of the snapshot."""
+        return list(await asyncio.gather(*(self.fork(termination_condition) for _ in range(count))))
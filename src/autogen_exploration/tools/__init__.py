@@ -0,0 +1,37 @@
+"""
+Tool execution helpers for agents that call many tools.
+"""
+
+from autogen_exploration.tools.cache import (
+    ToolCacheStats,
+    ToolResultCache,
+    annotate_tool_events,
+    cached_tool,
+    normalize_arguments,
+    tool_cache_report,
+)
+from autogen_exploration.tools.executor import PooledFunctionTool, ToolExecutor, ToolStats
+from autogen_exploration.tools.registry import (
+    RegisteredTool,
+    RegistryStats,
+    ToolRegistry,
+    get_tool_registry,
+    tool_key,
+)
+
+__all__ = [
+    "PooledFunctionTool",
+    "RegisteredTool",
+    "RegistryStats",
+    "ToolCacheStats",
+    "ToolExecutor",
+    "ToolRegistry",
+    "ToolResultCache",
+    "ToolStats",
+    "annotate_tool_events",
+    "cached_tool",
+    "get_tool_registry",
+    "normalize_arguments",
+    "tool_cache_report",
+    "tool_key",
+]
@@ -0,0 +1,356 @@
+"""
+A result cache for search-style tools.
+
+Agents call tools such as web searches and news lookups again and again with
+the same query, often spelled a little differently, within a run and across the
+runs of a warm process. Decorating such a tool with :func:`cached_tool` makes it:
+
+- answer repeated calls from an in-memory LRU cache, keyed by its arguments with
+  defaults filled in and strings normalized (whitespace collapsed, case folded);
+- keep each result for the tool's own ``ttl``, and "nothing found" results, named
+  by ``negative``, for a shorter ``negative_ttl``;
+- run once for concurrent identical calls, which all get the one result.
+
+Errors are never cached. A synchronous tool becomes a coroutine function that runs
+in a thread, as ``FunctionTool`` would have run it.
+
+Hits and latency saved are counted per tool, and :func:`annotate_tool_events`
+adds them to the ``metadata`` of the ``ToolCallExecutionEvent`` messages of a
+stream. The outcomes of the calls are kept per annotated stream, so concurrent
+runs in one process each see their own.
+
+The cache lives in the memory of the process: results are reused across the runs
+of agents and teams in one process, such as a server or a notebook, but a new
+process starts with an empty cache.
+
+Usage:
+    @cached_tool(ttl=600, negative=["No data found."])
+    def search_web_tool(query: str) -> str:
+        ...
+
+    async for message in annotate_tool_events(team.run_stream(task=task)):
+        ...  # message.metadata["tool_cache"] == '{"call_1": "hit"}'
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import (Any, AsyncGenerator, AsyncIterable, Callable, Collection, Deque, Dict,
+                    List, Optional, Set, Tuple, TypeVar)
+
+from autogen_agentchat.messages import ToolCallExecutionEvent, ToolCallRequestEvent
+
+T = TypeVar("T")
+
+DEFAULT_TTL = 300.0
+DEFAULT_NEGATIVE_TTL = 30.0
+DEFAULT_MAX_ENTRIES = 1024
+# By qualified name, so that tools with the same name in different modules keep their own.
+_caches: Dict[str, "ToolResultCache"] = {}
+
+# The outcomes of the calls made while annotate_tool_events reads a stream, by qualified
+# tool name and key, until it picks them up. The tasks of the run inherit the log of the
+# stream they were started for.
+_OutcomeLog = Dict[Tuple[str, str], Deque[Tuple[str, float]]]
+_outcome_log: "contextvars.ContextVar[Optional[_OutcomeLog]]" = contextvars.ContextVar(
+    "tool_cache_outcomes", default=None)
+
+
+def _qualified_name(func: Callable[..., Any]) -> str:
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def _caches_named(name: str) -> List["ToolResultCache"]:
+    """Return the caches of the tools called ``name``, as a model calls them."""
+    return [cache for cache in _caches.values() if cache.name == name]
+
+
+def normalize_arguments(value: Any) -> Any:
+    """Return a value with strings stripped, whitespace collapsed and case folded, recursively."""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {key: normalize_arguments(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_arguments(item) for item in value]
+    return value
+
+
+@dataclass
+class ToolCacheStats:
+    """Hit, miss and latency counters of one cached tool."""
+
+    hits: int = 0
+    negative_hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    errors: int = 0
+    latency_saved: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of calls answered without running the tool."""
+        calls = self.hits + self.coalesced + self.misses
+        return (self.hits + self.coalesced) / calls if calls else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters as a flat dictionary."""
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hit_rate, 3),
+            "latency_saved_ms": round(self.latency_saved * 1000, 1),
+        }
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires: float
+    latency: float
+
+
+@dataclass
+class _Run:
+    """A running tool call and the number of callers waiting for it."""
+
+    future: "asyncio.Future[Any]"
+    start: float
+    waiters: int = 0
+
+
+class ToolResultCache:
+    """
+    The results of one tool, by normalized arguments.
+
+    :param func: The tool function, used to fill in default arguments.
+    :param ttl: Seconds a result is kept.
+    :param negative: Results that mean nothing was found, kept for ``negative_ttl``.
+    :param negative_ttl: Seconds a negative result is kept.
+    :param max_entries: Results kept, the least recently used are evicted.
+    :param normalize: Turns the bound arguments into the values the key is made of.
+    """
+
+    def __init__(self, func: Callable[..., Any], ttl: float = DEFAULT_TTL,
+                 negative: Collection[Any] = (), negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 normalize: Callable[[Any], Any] = normalize_arguments) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.ttl = ttl
+        self.negative = list(negative)
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.normalize = normalize
+        self.stats = ToolCacheStats()
+        self._signature = inspect.signature(func)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._pending: Dict[str, _Run] = {}
+
+    def key(self, *args: Any, **kwargs: Any) -> str:
+        """Return the cache key of a call."""
+        kwargs.pop("cancellation_token", None)
+        bound = self._signature.bind_partial(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {name: value for name, value in bound.arguments.items()
+                     if name != "cancellation_token"}
+        return json.dumps(self.normalize(arguments), sort_keys=True, default=repr)
+
+    def _record(self, key: str, outcome: str, saved: float = 0.0) -> None:
+        log = _outcome_log.get()
+        if log is not None:
+            log.setdefault((_qualified_name(self.func), key), deque()).append((outcome, saved))
+
+    def invalidate(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+
+    async def call(self, run: Callable[[], Any], key: str) -> Any:
+        """
+        Return the cached result of a call, or run it once for every concurrent caller.
+
+        Args:
+            run (Callable[[], Any]): Runs the tool and returns an awaitable of its result.
+            key (str): The key of the call, from :meth:`key`.
+
+        Returns:
+            Any: The result.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                self.stats.negative_hits += entry.value in self.negative
+                self.stats.latency_saved += entry.latency
+                self._record(key, "hit", entry.latency)
+                return entry.value
+            del self._entries[key]
+        pending = self._pending.get(key)
+        if pending is None:
+            self.stats.misses += 1
+            pending = _Run(asyncio.ensure_future(run()), time.perf_counter())
+            self._pending[key] = pending
+            pending.future.add_done_callback(functools.partial(self._finish, key, pending))
+            outcome, saved = "miss", 0.0
+        else:
+            # The call would have run as long as the one it joined; the time since that one
+            # started is saved.
+            outcome, saved = "coalesced", time.perf_counter() - pending.start
+        # Every caller waits through a shield, so cancelling one only detaches it; the run
+        # is cancelled once no caller waits for it.
+        pending.waiters += 1
+        try:
+            value = await asyncio.shield(pending.future)
+        except BaseException:
+            pending.waiters -= 1
+            if pending.waiters == 0:
+                pending.future.cancel()
+            self._record(key, "error")
+            raise
+        pending.waiters -= 1
+        if outcome == "coalesced":
+            self.stats.coalesced += 1
+            self.stats.latency_saved += saved
+        self._record(key, outcome, saved)
+        return value
+
+    def _finish(self, key: str, run: _Run, future: "asyncio.Future[Any]") -> None:
+        """Cache the result of a finished run."""
+        if self._pending.get(key) is run:
+            del self._pending[key]
+        if future.cancelled() or future.exception() is not None:
+            self.stats.errors += 1
+            return
+        value = future.result()
+        ttl = self.negative_ttl if value in self.negative else self.ttl
+        self._entries[key] = _Entry(value, time.monotonic() + ttl, time.perf_counter() - run.start)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def cached_tool(func: Optional[Callable[..., Any]] = None, *, ttl: float = DEFAULT_TTL,
+                negative: Collection[Any] = (), negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                max_entries: int = DEFAULT_MAX_ENTRIES,
+                normalize: Callable[[Any], Any] = normalize_arguments) -> Any:
+    """
+    Cache the results of a tool function, as ``@cached_tool`` or ``@cached_tool(ttl=...)``.
+
+    The decorated function keeps the name, signature and docstring the tool schema
+    is built from, and its cache is available as its ``cache`` attribute.
+
+    Args:
+        func (Optional[Callable[..., Any]]): The tool function.
+        ttl (float): Seconds a result is kept.
+        negative (Collection[Any]): Results that mean nothing was found, such as
+            ``"No data found."``.
+        negative_ttl (float): Seconds a negative result is kept.
+        max_entries (int): Results kept, the least recently used are evicted.
+        normalize (Callable[[Any], Any]): Turns the arguments into the values the key is
+            made of; :func:`normalize_arguments` by default.
+
+    Returns:
+        Any: The cached coroutine function, or a decorator when called without ``func``.
+    """
+    if func is None:
+        return functools.partial(cached_tool, ttl=ttl, negative=negative,
+                                 negative_ttl=negative_ttl, max_entries=max_entries,
+                                 normalize=normalize)
+    cache = ToolResultCache(func, ttl=ttl, negative=negative, negative_ttl=negative_ttl,
+                            max_entries=max_entries, normalize=normalize)
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if inspect.iscoroutinefunction(func):
+            def run() -> Any:
+                return func(*args, **kwargs)
+        else:
+            def run() -> Any:
+                return asyncio.to_thread(func, *args, **kwargs)
+        return await cache.call(run, cache.key(*args, **kwargs))
+
+    wrapper.cache = cache  # type: ignore[attr-defined]
+    _caches[_qualified_name(func)] = cache
+    return wrapper
+
+
+def tool_cache_report() -> Dict[str, Dict[str, Any]]:
+    """Return the statistics of every cached tool, by qualified name."""
+    return {name: cache.stats.summary() for name, cache in _caches.items()}
+
+
+async def annotate_tool_events(stream: AsyncIterable[T]) -> AsyncGenerator[T, None]:
+    """
+    Yield the messages of a ``run_stream`` stream, with cache outcomes on tool results.
+
+    Every ``ToolCallExecutionEvent`` that holds results of cached tools is yielded
+    as a copy whose ``metadata`` has:
+
+    - ``tool_cache``: the outcome of each call, by call id, as JSON: ``hit``,
+      ``coalesced`` (waited for an identical call), ``miss`` or ``error``;
+    - ``latency_saved_ms``: the time these calls saved: the latency of the results
+      they reused, less any time spent waiting for an identical call;
+    - ``hit_rate``: the hit rate of these tools so far.
+
+    Args:
+        stream (AsyncIterable[T]): The stream of an agent or team.
+
+    Yields:
+        T: The messages of the stream.
+    """
+    log: _OutcomeLog = {}
+    token = _outcome_log.set(log)
+    try:
+        async for item in _annotate(stream, log):
+            yield item
+    finally:
+        try:
+            _outcome_log.reset(token)
+        except ValueError:
+            pass  # Closed from another context, which never saw the log.
+
+
+async def _annotate(stream: AsyncIterable[T], log: _OutcomeLog) -> AsyncGenerator[T, None]:
+    calls: Dict[str, Tuple[str, str]] = {}
+    async for item in stream:
+        if isinstance(item, ToolCallRequestEvent):
+            for call in item.content:
+                calls[call.id] = (call.name, call.arguments)
+        elif isinstance(item, ToolCallExecutionEvent):
+            outcomes: Dict[str, str] = {}
+            saved = 0.0
+            tools: Set[str] = set()
+            for result in item.content:
+                name, arguments = calls.pop(result.call_id, (result.name, "{}"))
+                # Tools with the same name in different modules: the one that recorded the call.
+                for cache in _caches_named(name):
+                    try:
+                        key = cache.key(**json.loads(arguments))
+                    except (TypeError, ValueError):
+                        continue
+                    pending = log.get((_qualified_name(cache.func), key))
+                    if pending:
+                        outcome = pending.popleft()
+                        outcomes[result.call_id] = outcome[0]
+                        saved += outcome[1]
+                        tools.add(_qualified_name(cache.func))
+                        break
+            if outcomes:
+                stats = [_caches[name].stats for name in tools]
+                reused = sum(stat.hits + stat.coalesced for stat in stats)
+                total = reused + sum(stat.misses for stat in stats)
+                item = item.model_copy(update={"metadata": {  # type: ignore[assignment]
+                    **item.metadata,
+                    "tool_cache": json.dumps(outcomes),
+                    "latency_saved_ms": f"{saved * 1000:.1f}",
+                    "hit_rate": f"{reused / total if total else 0.0:.3f}",
+                }})
+        yield item
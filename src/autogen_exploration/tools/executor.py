@@ -0,0 +1,170 @@
+"""
+A tool workbench that executes tool calls with bounded concurrency.
+
+``AssistantAgent`` runs all the tool calls of a model answer at once and hands
+synchronous functions to the event loop's default thread pool, which it shares
+with everything else in the process. :class:`ToolExecutor` is a drop-in
+workbench (``AssistantAgent(..., workbench=ToolExecutor([...]))``) that:
+
+- runs at most ``max_concurrency`` tool calls at a time, across every agent that
+  shares it, queueing the rest;
+- fails a call that runs longer than its timeout with an error result the model
+  can react to, instead of hanging the agent;
+- runs synchronous functions in its own thread pool, or in a process pool for
+  CPU-bound functions listed in ``process_tools``;
+- records the queue wait and latency of every tool.
+
+A timed-out synchronous function keeps running in its worker until it returns;
+only its result is dropped. Functions run in the process pool must be importable
+by the worker processes and take and return picklable values.
+"""
+
+import asyncio
+import functools
+import inspect
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Collection, Deque, Dict, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.tools import BaseTool, FunctionTool, StaticWorkbench, TextResultContent, ToolResult
+from pydantic import BaseModel
+
+from autogen_exploration.metrics import summarize_latencies
+
+DEFAULT_MAX_CONCURRENCY = 8
+MAX_LATENCY_SAMPLES = 1000
+
+
+class ToolStats:
+    """Call, error and latency counters of one tool."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latencies: Deque[float] = deque(maxlen=MAX_LATENCY_SAMPLES)
+        self.waits: Deque[float] = deque(maxlen=MAX_LATENCY_SAMPLES)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counters, latency percentiles and mean queue wait as a flat dictionary."""
+        latencies = summarize_latencies(self.latencies)
+        waits = summarize_latencies(self.waits)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            **{name: round(value, 1) for name, value in latencies.items() if name != "count"},
+            "mean_wait_ms": round(waits["mean_ms"], 1),
+        }
+
+
+class PooledFunctionTool(FunctionTool):
+    """
+    A function tool that runs a synchronous function in a given executor.
+
+    :param func: The function to run.
+    :param description: The tool description shown to the model.
+    :param executor: Returns the executor to run the function in.
+    :param name: The tool name, defaults to the function name.
+    """
+
+    def __init__(self, func: Callable[..., Any], description: str,
+                 executor: Callable[[], Executor], name: Optional[str] = None) -> None:
+        super().__init__(func, description, name=name)
+        self._pooled_func = func
+        self._executor = executor
+
+    async def run(self, args: BaseModel, cancellation_token: CancellationToken) -> Any:
+        if inspect.iscoroutinefunction(self._pooled_func):
+            return await super().run(args, cancellation_token)
+        kwargs = {name: getattr(args, name) for name in args.model_fields}
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor(), functools.partial(self._pooled_func, **kwargs))
+        cancellation_token.link_future(future)
+        return await future
+
+
+class ToolExecutor(StaticWorkbench):
+    """
+    A workbench that runs tool calls concurrently, up to a limit, with timeouts.
+
+    :param tools: Tools, or plain functions that are wrapped like ``AssistantAgent`` does.
+    :param max_concurrency: Tool calls that run at the same time; the rest wait.
+    :param timeout: Seconds after which a call fails, None for no limit.
+    :param timeouts: Timeouts of individual tools, by name, overriding ``timeout``.
+    :param process_tools: Names of plain synchronous functions to run in a process pool.
+    :param max_workers: Workers of the process pool, defaults to the number of CPUs.
+    """
+
+    def __init__(self, tools: Sequence[Union[BaseTool[Any, Any], Callable[..., Any]]],
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: Optional[float] = None, timeouts: Mapping[str, float] = {},
+                 process_tools: Collection[str] = (), max_workers: Optional[int] = None) -> None:
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.timeouts = dict(timeouts)
+        self.max_workers = max_workers
+        self.stats: Dict[str, ToolStats] = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        super().__init__([self._as_tool(tool, process_tools) for tool in tools])
+
+    def _as_tool(self, tool: Union[BaseTool[Any, Any], Callable[..., Any]],
+                 process_tools: Collection[str]) -> BaseTool[Any, Any]:
+        if isinstance(tool, BaseTool):
+            return tool
+        executor = (self._process_pool if tool.__name__ in process_tools
+                    else self._thread_pool)
+        return PooledFunctionTool(tool, description=tool.__doc__ or "", executor=executor)
+
+    def _thread_pool(self) -> Executor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                               thread_name_prefix="tool")
+        return self._threads
+
+    def _process_pool(self) -> Executor:
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._processes
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Return the statistics of every tool called so far, by name."""
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    async def call_tool(
+            self,
+            name: str,
+            arguments: Optional[Mapping[str, Any]] = None,
+            cancellation_token: Optional[CancellationToken] = None,
+            call_id: Optional[str] = None,
+    ) -> ToolResult:
+        stats = self.stats.setdefault(name, ToolStats())
+        stats.calls += 1
+        timeout = self.timeouts.get(name, self.timeout)
+        queued = time.perf_counter()
+        async with self._slots:
+            start = time.perf_counter()
+            stats.waits.append(start - queued)
+            try:
+                result = await asyncio.wait_for(
+                    super().call_tool(name, arguments, cancellation_token, call_id), timeout)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                stats.errors += 1
+                return ToolResult(name=name, is_error=True, result=[TextResultContent(
+                    content=f"Tool {name} timed out after {timeout} seconds.")])
+        stats.latencies.append(time.perf_counter() - start)
+        if result.is_error:
+            stats.errors += 1
+        return result
+
+    async def stop(self) -> None:
+        """Shut the worker pools down without waiting for running functions."""
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._threads = self._processes = None
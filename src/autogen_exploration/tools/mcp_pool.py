@@ -0,0 +1,319 @@
+"""
+A pool of warm MCP server sessions behind one workbench.
+
+An ``McpWorkbench`` spawns its server (``uvx mcp-server-fetch`` resolves and
+starts a package), performs the MCP ``initialize`` handshake and lists the
+server's tools, and every agent run that opens its own workbench pays for all
+of it again. :class:`McpServerPool` is a drop-in workbench
+(``AssistantAgent(..., workbench=pool)``) that:
+
+- keeps ``size`` sessions, each with its own server process, started
+  concurrently and kept alive across runs (:func:`get_mcp_pool` shares one pool
+  per server in the process);
+- sends each tool call to the session with the fewest calls in flight, so
+  concurrent calls are spread over the servers;
+- caches the ``list_tools`` result for ``tools_ttl`` seconds, until
+  :meth:`McpServerPool.invalidate_tools` is called or a session restarts;
+- probes idle sessions every ``health_interval`` seconds, and restarts sessions
+  whose probe fails or whose server died; a call that could not be sent
+  because its session was down is retried once on another session.
+
+The pool is a component: its config loads the shared pool of the same server,
+so clones of an agent or team built from their config (such as those of a
+``TeamPool``) use the same warm sessions.
+
+Usage:
+    pool = get_mcp_pool(StdioServerParams(command="uvx", args=["mcp-server-fetch"]), size=2)
+    agent = AssistantAgent("fetcher", model_client=model_client, workbench=pool)
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional
+
+from autogen_core import CancellationToken, Component
+from autogen_core.tools import ToolOverride, ToolResult, ToolSchema, Workbench
+from autogen_ext.tools.mcp import McpServerParams, McpWorkbench
+from pydantic import BaseModel
+
+from autogen_exploration.metrics import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZE = 2
+DEFAULT_TOOLS_TTL = 300.0
+DEFAULT_HEALTH_INTERVAL = 30.0
+DEFAULT_PROBE_TIMEOUT = 10.0
+MAX_LATENCY_SAMPLES = 1000
+# Raised by the session actor before a command is sent, so the call can be retried.
+_SESSION_DOWN = ("MCP Actor not running", "MCP actor task crashed", "Actor is not initialized")
+
+_pools: Dict[str, "McpServerPool"] = {}
+
+
+class _Session:
+    """One workbench of the pool, with its own server process."""
+
+    def __init__(self, index: int, server_params: McpServerParams,
+                 tool_overrides: Optional[Dict[str, ToolOverride]]) -> None:
+        self.index = index
+        self.workbench = McpWorkbench(server_params, tool_overrides=tool_overrides)
+        self.in_flight = 0
+        self.calls = 0
+        self.last_used = time.monotonic()
+
+
+class McpServerPoolConfig(BaseModel):
+    """The component config of a :class:`McpServerPool`."""
+
+    server_params: McpServerParams
+    size: int = DEFAULT_SIZE
+    tool_overrides: Optional[Dict[str, ToolOverride]] = None
+    tools_ttl: Optional[float] = DEFAULT_TOOLS_TTL
+    health_interval: Optional[float] = DEFAULT_HEALTH_INTERVAL
+    probe_timeout: float = DEFAULT_PROBE_TIMEOUT
+
+
+class McpServerPool(Workbench, Component[McpServerPoolConfig]):
+    """
+    A workbench that spreads tool calls over several warm MCP server sessions.
+
+    :param server_params: The server to run, as for ``McpWorkbench``.
+    :param size: Sessions, and server processes, to keep.
+    :param tool_overrides: Tool name and description overrides, as for ``McpWorkbench``.
+    :param tools_ttl: Seconds the tool list is cached, None to cache it until invalidated.
+    :param health_interval: Seconds between probes of idle sessions, None for no probes.
+    :param probe_timeout: Seconds a probe may take before its session is restarted.
+    """
+
+    component_config_schema = McpServerPoolConfig
+    component_provider_override = "autogen_exploration.tools.mcp_pool.McpServerPool"
+
+    def __init__(self, server_params: McpServerParams, size: int = DEFAULT_SIZE,
+                 tool_overrides: Optional[Dict[str, ToolOverride]] = None,
+                 tools_ttl: Optional[float] = DEFAULT_TOOLS_TTL,
+                 health_interval: Optional[float] = DEFAULT_HEALTH_INTERVAL,
+                 probe_timeout: float = DEFAULT_PROBE_TIMEOUT) -> None:
+        self.server_params = server_params
+        self.size = size
+        self.tool_overrides = tool_overrides
+        self.tools_ttl = tools_ttl
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self.restarts = 0
+        self.tool_list_hits = 0
+        self.tool_list_misses = 0
+        self.latencies: Deque[float] = deque(maxlen=MAX_LATENCY_SAMPLES)
+        self._sessions: List[_Session] = []
+        self._tools: Optional[List[ToolSchema]] = None
+        self._tools_expiry = 0.0
+        self._start_lock = asyncio.Lock()
+        self._restarting: Dict[int, asyncio.Task[None]] = {}
+        self._health_task: Optional[asyncio.Task[None]] = None
+
+    async def start(self) -> None:
+        """Start every session concurrently, and the health checks."""
+        async with self._start_lock:
+            if self._sessions:
+                return
+            sessions = [_Session(index, self.server_params, self.tool_overrides)
+                        for index in range(self.size)]
+            results = await asyncio.gather(*(self._start_session(session) for session in sessions),
+                                           return_exceptions=True)
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                # Do not leak the server processes of the sessions that did start.
+                await asyncio.gather(*(self._stop_session(session) for session in sessions))
+                raise errors[0]
+            self._sessions = sessions
+            if self.health_interval:
+                self._health_task = asyncio.create_task(self._check_health())
+
+    async def _start_session(self, session: _Session) -> None:
+        await session.workbench.start()
+        # The handshake runs in the session's actor task; the first request waits for it.
+        await session.workbench.list_tools()
+
+    async def stop(self) -> None:
+        """Stop the health checks and every session, which ends their server processes."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for task in self._restarting.values():
+            task.cancel()
+        sessions, self._sessions = self._sessions, []
+        await asyncio.gather(*(self._stop_session(session) for session in sessions))
+        _pools.pop(self.server_params.model_dump_json(), None)
+
+    @staticmethod
+    async def _stop_session(session: _Session) -> None:
+        try:
+            await session.workbench.stop()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.debug("MCP session %d did not stop cleanly.", session.index, exc_info=True)
+
+    async def restart(self, session: _Session) -> None:
+        """Replace a session with a fresh one, once, however many callers ask."""
+        await asyncio.shield(self._schedule_restart(session))
+
+    def _schedule_restart(self, session: _Session) -> "asyncio.Task[None]":
+        """Return the restart task of a session, starting it if none runs."""
+        task = self._restarting.get(session.index)
+        if task is None:
+            # Kept in _restarting until done, so a restart nobody awaits still runs.
+            task = asyncio.create_task(self._restart(session))
+            self._restarting[session.index] = task
+            task.add_done_callback(lambda _: self._restarting.pop(session.index, None))
+        return task
+
+    async def _restart(self, session: _Session) -> None:
+        logger.warning("Restarting MCP session %d.", session.index)
+        await self._stop_session(session)
+        fresh = _Session(session.index, self.server_params, self.tool_overrides)
+        try:
+            await self._start_session(fresh)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Keep the session down; its next call or probe restarts it again.
+            logger.exception("MCP session %d failed to restart.", session.index)
+            await self._stop_session(fresh)
+            return
+        if session in self._sessions:
+            self._sessions[self._sessions.index(session)] = fresh
+        self.restarts += 1
+        self.invalidate_tools()
+
+    async def probe(self, session: _Session) -> bool:
+        """Return whether a session answers a request in time, restarting it if not."""
+        try:
+            await asyncio.wait_for(session.workbench.list_tools(), self.probe_timeout)
+            return True
+        except Exception:  # pylint: disable=broad-exception-caught
+            await self.restart(session)
+            return False
+
+    async def _check_health(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            now = time.monotonic()
+            idle = [session for session in self._sessions
+                    if not session.in_flight and now - session.last_used >= self.health_interval]
+            await asyncio.gather(*(self.probe(session) for session in idle),
+                                 return_exceptions=True)
+
+    def invalidate_tools(self) -> None:
+        """Drop the cached tool list, so the next request lists the tools again."""
+        self._tools = None
+
+    async def list_tools(self) -> List[ToolSchema]:
+        if self._tools is not None and (self.tools_ttl is None
+                                        or time.monotonic() < self._tools_expiry):
+            self.tool_list_hits += 1
+            return self._tools
+        await self.start()
+        self.tool_list_misses += 1
+        tools = await self._pick().workbench.list_tools()
+        self._tools = tools
+        self._tools_expiry = time.monotonic() + (self.tools_ttl or 0)
+        return tools
+
+    def _pick(self, exclude: Optional[_Session] = None) -> _Session:
+        candidates = [session for session in self._sessions
+                      if session is not exclude and session.index not in self._restarting]
+        return min(candidates or self._sessions, key=lambda session: session.in_flight)
+
+    async def call_tool(
+            self,
+            name: str,
+            arguments: Optional[Mapping[str, Any]] = None,
+            cancellation_token: Optional[CancellationToken] = None,
+            call_id: Optional[str] = None,
+    ) -> ToolResult:
+        await self.start()
+        start = time.perf_counter()
+        session = self._pick()
+        result = await self._call(session, name, arguments, cancellation_token, call_id)
+        if result.is_error and any(text in result.to_text() for text in _SESSION_DOWN):
+            # The call never reached the server: restart the session and retry elsewhere.
+            self._schedule_restart(session)
+            result = await self._call(self._pick(exclude=session), name, arguments,
+                                      cancellation_token, call_id)
+        self.latencies.append(time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    async def _call(session: _Session, name: str, arguments: Optional[Mapping[str, Any]],
+                    cancellation_token: Optional[CancellationToken],
+                    call_id: Optional[str]) -> ToolResult:
+        session.in_flight += 1
+        session.calls += 1
+        try:
+            return await session.workbench.call_tool(name, arguments, cancellation_token, call_id)
+        finally:
+            session.in_flight -= 1
+            session.last_used = time.monotonic()
+
+    def report(self) -> Dict[str, Any]:
+        """Return the calls per session, restarts, tool list cache and call latencies."""
+        latencies = summarize_latencies(self.latencies)
+        return {
+            "calls": [session.calls for session in self._sessions],
+            "restarts": self.restarts,
+            "tool_list_hits": self.tool_list_hits,
+            "tool_list_misses": self.tool_list_misses,
+            **{name: round(value, 1) for name, value in latencies.items() if name != "count"},
+        }
+
+    async def reset(self) -> None:
+        pass
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return {}
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        pass
+
+    def _to_config(self) -> McpServerPoolConfig:
+        return McpServerPoolConfig(
+            server_params=self.server_params,
+            size=self.size,
+            tool_overrides=self.tool_overrides,
+            tools_ttl=self.tools_ttl,
+            health_interval=self.health_interval,
+            probe_timeout=self.probe_timeout,
+        )
+
+    @classmethod
+    def _from_config(cls, config: McpServerPoolConfig) -> "McpServerPool":
+        return get_mcp_pool(
+            config.server_params,
+            config.size,
+            tool_overrides=config.tool_overrides,
+            tools_ttl=config.tools_ttl,
+            health_interval=config.health_interval,
+            probe_timeout=config.probe_timeout,
+        )
+
+
+def get_mcp_pool(server_params: McpServerParams, size: int = DEFAULT_SIZE,
+                 **kwargs: Any) -> McpServerPool:
+    """
+    Return the process-wide pool of a server, creating it on first use.
+
+    The pool starts on its first request; stop it (or use it as an async context
+    manager) at the end of the program to end its server processes.
+
+    Args:
+        server_params (McpServerParams): The server to run.
+        size (int): Sessions to keep, used when the pool is created.
+        **kwargs: Other :class:`McpServerPool` arguments, used when the pool is created.
+
+    Returns:
+        McpServerPool: The shared pool.
+    """
+    key = server_params.model_dump_json()
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = McpServerPool(server_params, size, **kwargs)
+    return pool
@@ -0,0 +1,217 @@
+"""
+A registry of precompiled function tool schemas.
+
+Every time an ``AssistantAgent`` is built with plain functions, ``FunctionTool``
+introspects each signature and generates a pydantic model for its arguments, and
+every model request turns each of those models into a JSON schema again. With a
+few dozen tools this costs tens of milliseconds per agent and per request.
+
+:class:`ToolRegistry` compiles each function once per process and hands the same
+tool to every agent, with its JSON schema computed once. The schemas are also
+saved to a JSON cache file, keyed by a hash of the function's source, so a new
+process gets them without any introspection; the argument model of such a tool
+is only generated when the tool is first called.
+
+The key covers the function's own source, name, description and the installed
+autogen-core and pydantic versions. A change to a type defined elsewhere (such as
+a pydantic model used as an argument) does not change the key; delete the cache
+file after such a change.
+
+Usage:
+    from autogen_exploration.tools import get_tool_registry
+
+    agent = AssistantAgent("assistant", model_client=model_client,
+                           tools=get_tool_registry().tools([web_search, get_weather]))
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from importlib.metadata import version
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from autogen_core.tools import BaseTool, FunctionTool, ToolSchema
+
+_registry: Optional["ToolRegistry"] = None
+_registry_lock = threading.Lock()
+_VERSIONS = f"autogen-core={version('autogen-core')};pydantic={version('pydantic')}"
+
+
+def tool_key(func: Callable[..., Any], description: str, name: str, strict: bool) -> Optional[str]:
+    """
+    Return the cache key of a function tool, or None when its source is unavailable.
+
+    Args:
+        func (Callable[..., Any]): The tool function.
+        description (str): The tool description.
+        name (str): The tool name.
+        strict (bool): Whether the tool uses strict mode.
+
+    Returns:
+        Optional[str]: A key that changes whenever the function's source does.
+    """
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        return None
+    digest = hashlib.sha256("\0".join(
+        (source, description, name, str(strict), _VERSIONS)).encode()).hexdigest()
+    return f"{func.__module__}.{func.__qualname__}:{digest[:24]}"
+
+
+class RegisteredTool(FunctionTool):
+    """
+    A function tool with a precompiled schema and a lazily built argument model.
+
+    ``FunctionTool.__init__`` (signature introspection and argument model
+    generation) only runs the first time the tool needs its argument model, which
+    is when it is called or serialized.
+
+    :param func: The tool function.
+    :param description: The tool description.
+    :param name: The tool name.
+    :param schema: The tool's JSON schema, as ``FunctionTool.schema`` returns it.
+    """
+
+    # pylint: disable-next=super-init-not-called
+    def __init__(self, func: Callable[..., Any], description: str, name: str,
+                 schema: ToolSchema) -> None:
+        self._func = func
+        self._name = name
+        self._description = description
+        self._strict = bool(schema.get("strict", False))
+        self._global_imports = []
+        self._schema = schema
+        self._compile_lock = threading.RLock()
+
+    def __getattr__(self, attribute: str) -> Any:
+        # Only reached for the attributes FunctionTool.__init__ has not set yet.
+        if attribute.startswith("__") or attribute in ("_compile_lock", "_compiled"):
+            raise AttributeError(attribute)
+        with self._compile_lock:
+            if not self.__dict__.get("_compiled"):
+                FunctionTool.__init__(self, self._func, self._description, name=self._name,
+                                      strict=self._strict)
+                self._compiled = True
+        return object.__getattribute__(self, attribute)
+
+    @property
+    def compiled(self) -> bool:
+        """True once the argument model has been generated."""
+        return bool(self.__dict__.get("_compiled"))
+
+    @property
+    def schema(self) -> ToolSchema:
+        return self._schema
+
+
+@dataclass
+class RegistryStats:
+    """How the tools handed out by a :class:`ToolRegistry` were obtained."""
+
+    compiled: int = 0
+    loaded: int = 0
+    reused: int = 0
+
+
+class ToolRegistry:
+    """
+    Compiles function tools once and shares them across agents and processes.
+
+    The tools carry no per-agent state, so one instance per function is handed to
+    every agent that uses it.
+
+    :param path: A JSON file to load schemas from and save new ones to, None for
+        an in-memory registry.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.stats = RegistryStats()
+        self._schemas: Dict[str, ToolSchema] = {}
+        self._tools: Dict[Any, FunctionTool] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    self._schemas = json.load(file)
+            except (OSError, ValueError):
+                self._schemas = {}
+
+    def tool(self, func: Callable[..., Any], description: Optional[str] = None,
+             name: Optional[str] = None, strict: bool = False) -> FunctionTool:
+        """
+        Return the tool of a function, compiling it only if no process has before.
+
+        Args:
+            func (Callable[..., Any]): The tool function.
+            description (Optional[str]): The description, defaults to the docstring.
+            name (Optional[str]): The tool name, defaults to the function name.
+            strict (bool): Whether to use strict mode.
+
+        Returns:
+            FunctionTool: The shared tool.
+        """
+        description = description if description is not None else func.__doc__ or ""
+        name = name or func.__name__
+        memo_key = (func, description, name, strict)
+        with self._lock:
+            tool = self._tools.get(memo_key)
+            if tool is not None:
+                self.stats.reused += 1
+                return tool
+            key = tool_key(func, description, name, strict)
+            schema = self._schemas.get(key) if key else None
+            if schema is not None:
+                tool = RegisteredTool(func, description, name, schema)
+                self.stats.loaded += 1
+            else:
+                compiled = FunctionTool(func, description, name=name, strict=strict)
+                tool = RegisteredTool(func, description, name, compiled.schema)
+                # Keep the argument model that was just generated.
+                tool.__dict__.update(vars(compiled), _compiled=True)
+                self.stats.compiled += 1
+                if key:
+                    self._schemas[key] = tool.schema
+                    self._dirty = True
+            self._tools[memo_key] = tool
+            return tool
+
+    def tools(self, tools: Sequence[Union[BaseTool[Any, Any], Callable[..., Any]]]
+              ) -> List[BaseTool[Any, Any]]:
+        """Return the tools of a list of functions, passing tool objects through, and save."""
+        result = [tool if isinstance(tool, BaseTool) else self.tool(tool) for tool in tools]
+        self.save()
+        return result
+
+    def save(self) -> None:
+        """Write new schemas to the cache file, atomically."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(self._schemas, file)
+            os.replace(temporary, self.path)
+            self._dirty = False
+
+
+def get_tool_registry() -> ToolRegistry:
+    """
+    Return the process-wide tool registry.
+
+    Its schemas are cached in the file named by ``AUTOGEN_TOOL_SCHEMA_CACHE``, or only
+    in memory when the variable is not set.
+    """
+    global _registry  # pylint: disable=global-statement
+    with _registry_lock:
+        if _registry is None:
+            _registry = ToolRegistry(os.environ.get("AUTOGEN_TOOL_SCHEMA_CACHE") or None)
+        return _registry
@@ -16,37 +16,26 @@ Usage:
 """
 
 import asyncio
-import os
 
 from autogen_agentchat.agents import AssistantAgent
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
+from autogen_exploration.clients import get_model_client
+from autogen_exploration.tools import cached_tool
+
 load_dotenv()
 
 
 # Define a tool that searches the web for information.
 # For simplicity, we will use a mock function here that returns a static string.
+@cached_tool(ttl=600)
 async def web_search(query: str) -> str:
     """Find information on the web"""
     return "AutoGen is a programming framework for building multi-agent applications."
 
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
-
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider,
-)
+# Get the shared model client
+model_client = get_model_client()
 
 agent = AssistantAgent(
     name="assistant",
@@ -5,9 +5,12 @@ This script fetches a random image, constructs a multi-modal message containing
 text and image, and sends it to an AssistantAgent powered by Azure OpenAI. The agent
 processes the message and returns a description of the image content.
 
+The image is fetched asynchronously by an ImagePipeline, which also downscales it to
+the detail the model needs and encodes it once in its most compact format.
+
 Dependencies:
 - PIL (Pillow)
-- requests
+- httpx
 - autogen_agentchat
 - autogen_core
 - autogen_ext
@@ -19,43 +22,21 @@ uv run src/introduction/01-asst-agent/example_02_multimodal_msg.py
 """
 
 import asyncio
-import os
-from io import BytesIO
 
-import PIL
-import requests
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import MultiModalMessage
-from autogen_core import Image
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-load_dotenv()
+from autogen_exploration.clients import get_model_client
+from autogen_exploration.images import ImagePipeline
 
-# Create a multi-modal message with random image and text.
-pil_image = PIL.Image.open(
-    BytesIO(requests.get("https://picsum.photos/300/200").content) # pylint: disable=missing-timeout
-)
-img = Image(pil_image)
-multi_modal_message = MultiModalMessage(
-    content=["Can you describe the content of this image?", img], source="user"
-)
+load_dotenv()
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+# Loads images from paths, URLs or bytes, sized for the detail level the model needs.
+image_pipeline = ImagePipeline(detail="auto")
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider,
-)
+# Get the shared model client
+model_client = get_model_client()
 
 agent = AssistantAgent(
     name="assistant",
@@ -72,8 +53,14 @@ async def main():
     This function runs the agent with a user message containing both text and an image,
     then prints the last message content from the agent's response and closes the model client.
     """
+    # Create a multi-modal message with random image and text.
+    img = await image_pipeline.load("https://picsum.photos/300/200")
+    multi_modal_message = MultiModalMessage(
+        content=["Can you describe the content of this image?", img], source="user"
+    )
     result = await agent.run(task=multi_modal_message)
     print(result.messages[-1].content)  # type: ignore
+    await image_pipeline.close()
     await model_client.close()
 
 
@@ -12,14 +12,12 @@ Usage:
 """
 
 import asyncio
-import os
 
 from autogen_agentchat.agents import AssistantAgent
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
+from autogen_exploration.clients import get_model_client
+
 load_dotenv()
 
 
@@ -30,20 +28,8 @@ async def web_search(query: str) -> str:
     return "Tintin is a comic character created by Belgian cartoonist Hergé."
 
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
-
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider,
-    parallel_tool_calls=False,
-)
+# Get the shared model client
+model_client = get_model_client(parallel_tool_calls=False)
 
 agent = AssistantAgent(
     name="assistant",
@@ -5,29 +5,17 @@ The agent will stream its responses token by token, allowing for real-time inter
 """
 
 import asyncio
-import os
 
 from autogen_agentchat.agents import AssistantAgent
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-load_dotenv()
+from autogen_exploration.clients import get_model_client
+from autogen_exploration.streaming import StreamTelemetry
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+load_dotenv()
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider,
-)
+# Get the shared model client
+model_client = get_model_client()
 
 streaming_assistant = AssistantAgent(
     name="assistant",
@@ -44,9 +32,12 @@ async def main():
     :return:
     """
     # Use an async function and asyncio.run() in a script.
-    async for message in (streaming_assistant.run_stream
+    # The telemetry tap passes every message through and times the streamed chunks.
+    telemetry = StreamTelemetry()
+    async for message in telemetry.tap(streaming_assistant.run_stream
         (task="Name two cities in South America")):  # type: ignore
         print(message)
+    telemetry.print_summary()
     await model_client.close()
 
 
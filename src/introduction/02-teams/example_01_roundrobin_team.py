@@ -5,52 +5,45 @@ the content. The interaction continues until the critic approves the content by
 with "APPROVE".
 """
 import asyncio
-import os
 
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.base import TaskResult
-from autogen_agentchat.conditions import TextMentionTermination
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
+from autogen_exploration.clients import get_model_client
+from autogen_exploration.context import SummarizingChatCompletionContext
+from autogen_exploration.stopping import StopPhraseTermination
+from autogen_exploration.teams import TeamPool
+
 load_dotenv()
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+# Get the shared model client
+model_client = get_model_client()
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider,
-)
+# Define a termination condition that stops the task if the critic approves. Its client
+# ends the critic's completion as soon as "APPROVE" is generated.
+text_termination = StopPhraseTermination("APPROVE", sources=["critic"])
 
 # Create the primary agent.
 primary_agent = AssistantAgent(
     "primary",
     model_client=model_client,
+    # Send the last turns verbatim and a running summary of the older ones.
+    model_context=SummarizingChatCompletionContext(model_client),
     system_message="You are a helpful AI assistant.",
 )
 
 # Create the critic agent.
 critic_agent = AssistantAgent(
     "critic",
-    model_client=model_client,
+    model_client=text_termination.wrap(model_client),
+    model_context=SummarizingChatCompletionContext(model_client),
     system_message="Provide constructive feedback. "
                    "Respond with 'APPROVE' to when your feedbacks are addressed.",
 )
 
-# Define a termination condition that stops the task if the critic approves.
-text_termination = TextMentionTermination("APPROVE")
-
 # Create a team with the primary and critic agents.
 team = RoundRobinGroupChat([primary_agent, critic_agent], termination_condition=text_termination)
 
@@ -82,6 +75,15 @@ async def main():
         team.run_stream(
             task="Write a short poem about the fall season."))  # Stream the msgs to the console.
 
+    print("===================================================")
+    # A team runs one task at a time; a pool of clones of the team runs several at once.
+    pool = TeamPool(team, size=3)
+    results = await pool.run_many([f"Write a short poem about the {season} season."
+                                   for season in ("spring", "summer", "winter")])
+    for result in results:
+        print(result.messages[-2].to_text() if isinstance(result, TaskResult) else result)
+    print(pool.stats.summary())
+
     await model_client.close()
 
 
@@ -10,37 +10,27 @@ The team runs until either the external termination condition is triggered
 or the critic agent responds with "APPROVE".
 """
 import asyncio
-import os
 
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.conditions import TextMentionTermination, ExternalTermination
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-load_dotenv()
+from autogen_exploration.clients import get_model_client
+from autogen_exploration.context import SummarizingChatCompletionContext
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+load_dotenv()
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider,
-)
+# Get the shared model client
+model_client = get_model_client()
 
 # Create the primary agent.
 primary_agent = AssistantAgent(
     "primary",
     model_client=model_client,
+    # Send the last turns verbatim and a running summary of the older ones.
+    model_context=SummarizingChatCompletionContext(model_client),
     system_message="You are a helpful AI assistant.",
 )
 
@@ -48,6 +38,7 @@ primary_agent = AssistantAgent(
 critic_agent = AssistantAgent(
     "critic",
     model_client=model_client,
+    model_context=SummarizingChatCompletionContext(model_client),
     system_message="Provide constructive feedback. "
                    "Respond with 'APPROVE' to when your feedbacks are addressed.",
 )
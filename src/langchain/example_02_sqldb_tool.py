@@ -10,38 +10,26 @@ from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.conditions import TextMentionTermination
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
-from autogen_ext.auth.azure import AzureTokenProvider
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 from autogen_ext.tools.langchain import LangChainToolAdapter
-from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
 from langchain_community.utilities.sql_database import SQLDatabase
 from langchain_openai import AzureChatOpenAI
 from sqlalchemy import Engine, create_engine
 
-load_dotenv()
+from autogen_exploration.clients import get_model_client, get_token_provider
 
-# Create the token provider
-token_provider = AzureTokenProvider(
-    DefaultAzureCredential(),
-    "https://cognitiveservices.azure.com/.default",
-)
+load_dotenv()
 
-model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-    api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider
-)
+# Get the shared model client
+model_client = get_model_client()
 
 llm = AzureChatOpenAI(
     azure_deployment=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
     model=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
     api_version=os.environ.get("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
     azure_endpoint=os.environ.get("AZURE_OPENAI_API_INSTANCE_NAME"),
-    azure_ad_token_provider=token_provider,
+    azure_ad_token_provider=get_token_provider(),
     temperature=0,
 )
 
@@ -0,0 +1,83 @@
+"""
+Benchmark comparing one model client per agent against the shared, pooled client.
+
+Both variants run the same sequence of small team tasks against a local stub
+server: every task builds a few agents that each issue several create() calls
+concurrently. The per-agent variant builds a new client (and therefore a new HTTP
+connection pool) for every agent, which is what the examples used to do. The
+shared variant takes every agent's client from autogen_exploration.clients. The
+stub counts the TCP connections it accepts, which shows how many handshakes each
+variant pays for.
+
+Usage:
+    uv run src/performance/01-shared-client/example_01_connection_reuse.py
+"""
+
+import asyncio
+import time
+from typing import Callable, List
+
+from autogen_core.models import ChatCompletionClient, UserMessage
+
+from autogen_exploration.clients import (
+    close_shared_clients,
+    create_http_client,
+    create_model_client,
+    get_model_client,
+)
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.stub_server import StubOpenAIServer
+
+TASKS = 25
+AGENTS_PER_TASK = 4
+CALLS_PER_AGENT = 5
+STUB_LATENCY = 0.005
+
+
+async def run_agent(client: ChatCompletionClient, samples: List[float]) -> None:
+    """Issue sequential create() calls from one agent and record their latency."""
+    for _ in range(CALLS_PER_AGENT):
+        start = time.perf_counter()
+        await client.create([UserMessage(content="What is the capital of France?", source="user")])
+        samples.append(time.perf_counter() - start)
+
+
+async def run_tasks(client_for_agent: Callable[[], ChatCompletionClient]) -> List[float]:
+    """Run every task in turn, with the agents of a task running concurrently."""
+    samples: List[float] = []
+    for _ in range(TASKS):
+        clients = [client_for_agent() for _ in range(AGENTS_PER_TASK)]
+        await asyncio.gather(*(run_agent(client, samples) for client in clients))
+    return samples
+
+
+def report(name: str, server: StubOpenAIServer, samples: List[float]) -> None:
+    """Print connection reuse and latency percentiles for a variant."""
+    stats = summarize_latencies(samples)
+    print(f"{name:<18} connections={server.connections:<4} requests={server.requests:<5} "
+          f"p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms")
+
+
+async def main():
+    """
+    Run the per-agent and the shared-pool variants and print their statistics.
+    """
+    async with StubOpenAIServer(ttft=STUB_LATENCY) as server:
+        pools = []
+
+        def client_per_agent() -> ChatCompletionClient:
+            pools.append(create_http_client())
+            return create_model_client(server.settings(), http_client=pools[-1])
+
+        samples = await run_tasks(client_per_agent)
+        report("client per agent", server, samples)
+        for pool in pools:
+            await pool.shutdown()
+
+    async with StubOpenAIServer(ttft=STUB_LATENCY) as server:
+        samples = await run_tasks(lambda: get_model_client(server.settings()))
+        report("shared pool", server, samples)
+        await close_shared_clients()
+
+
+asyncio.run(main())
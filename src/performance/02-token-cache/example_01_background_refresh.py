@@ -0,0 +1,85 @@
+"""
+Benchmark showing that the caching token provider keeps token refreshes off the request path.
+
+A fake credential stands in for Azure AD: every token request takes a while (like
+the DefaultAzureCredential chain probe) and tokens expire after a few seconds, so
+several refreshes happen during the run. The same stream of create() calls is sent
+to a local stub server, first with the stock AzureTokenProvider, which refreshes
+on the calling thread, and then with the CachingTokenProvider, which refreshes in
+the background.
+
+Usage:
+    uv run src/performance/02-token-cache/example_01_background_refresh.py
+"""
+
+import asyncio
+import dataclasses
+import logging
+import time
+from typing import Any, List
+
+from autogen_core.models import UserMessage
+from autogen_ext.auth.azure import AzureTokenProvider
+from azure.core.credentials import AccessToken
+
+from autogen_exploration.auth import CachingTokenProvider
+from autogen_exploration.clients import AZURE_COGNITIVE_SERVICES_SCOPE, create_model_client
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.stub_server import StubOpenAIServer
+
+TOKEN_LIFETIME = 4.0
+TOKEN_DELAY = 0.3
+RUN_SECONDS = 10.0
+
+
+class FakeCredential:
+    """A credential that is slow to answer and hands out short-lived tokens."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:  # pylint: disable=unused-argument
+        """Return a new token after a simulated round trip to Azure AD."""
+        self.calls += 1
+        time.sleep(TOKEN_DELAY)
+        return AccessToken(f"fake-token-{self.calls}", int(time.time() + TOKEN_LIFETIME))
+
+
+async def run(name: str, server: StubOpenAIServer, token_provider: AzureTokenProvider,
+              credential: FakeCredential) -> None:
+    """Send create() calls for RUN_SECONDS and print latency statistics."""
+    settings = dataclasses.replace(server.settings(), api_key=None)
+    client = create_model_client(settings, token_provider=token_provider)
+    samples: List[float] = []
+    deadline = time.perf_counter() + RUN_SECONDS
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.create([UserMessage(content="What is the capital of France?", source="user")])
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+    stats = summarize_latencies(samples)
+    print(f"{name:<22} token requests={credential.calls:<3} calls={stats['count']:<5} "
+          f"p50={stats['p50_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms max={stats['max_ms']:.1f}ms")
+
+
+async def main():
+    """
+    Compare the stock and the caching token providers against the stub server.
+    """
+    async with StubOpenAIServer() as server:
+        credential = FakeCredential()
+        await run("AzureTokenProvider", server,
+                  AzureTokenProvider(credential, AZURE_COGNITIVE_SERVICES_SCOPE), credential)
+
+        credential = FakeCredential()
+        provider = CachingTokenProvider(credential, AZURE_COGNITIVE_SERVICES_SCOPE,
+                                        refresh_margin=1.0).start()
+        await run("CachingTokenProvider", server, provider, credential)
+        provider.close()
+        print(f"credential chain probe took {provider.probe_seconds:.3f}s, "
+              f"{provider.refreshes} background refreshes")
+
+
+logging.basicConfig(format="%(name)s: %(message)s")
+logging.getLogger("autogen_exploration").setLevel(logging.INFO)
+asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Benchmark of the response cache on the repeated prompts used by the examples.
+
+The quick-start question and the primary/critic poem task are run three times each
+against a slow local stub server, first through a fresh cache (as in a first run of
+the examples) and then through a new cache opened on the same SQLite file (as in
+any later run). The cache counters show where each answer came from and how much
+model latency was saved.
+
+Usage:
+    uv run src/performance/03-response-cache/example_01_repeated_prompts.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.teams import RoundRobinGroupChat
+from autogen_core.models import UserMessage
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.models import CachingChatCompletionClient, ResponseCache
+from autogen_exploration.stub_server import StubOpenAIServer
+
+STUB_LATENCY = 0.2
+RUNS = 3
+
+
+async def run_examples(model_client: CachingChatCompletionClient) -> float:
+    """Run the quick-start question and the poem team RUNS times, returning the wall time."""
+    primary_agent = AssistantAgent("primary", model_client=model_client,
+                                   system_message="You are a helpful AI assistant.")
+    critic_agent = AssistantAgent("critic", model_client=model_client,
+                                  system_message="Provide constructive feedback. "
+                                                 "Respond with 'APPROVE' to when your "
+                                                 "feedbacks are addressed.")
+    team = RoundRobinGroupChat([primary_agent, critic_agent],
+                               termination_condition=MaxMessageTermination(4))
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        await model_client.create(
+            [UserMessage(content="What is the capital of France?", source="user")])
+        await team.reset()
+        await team.run(task="Write a short poem about the fall season.")
+    return time.perf_counter() - start
+
+
+async def main():
+    """
+    Run the examples through a cold and a warm on-disk cache and print the statistics.
+    """
+    path = os.path.join(tempfile.mkdtemp(), "responses.sqlite")
+    async with StubOpenAIServer(ttft=STUB_LATENCY) as server:
+        for label in ("first run", "later run"):
+            cache = ResponseCache(path=path, ttl=24 * 3600)
+            model_client = CachingChatCompletionClient(
+                create_model_client(server.settings(), temperature=0), cache)
+            elapsed = await run_examples(model_client)
+            print(f"{label:<10} wall={elapsed:.2f}s upstream requests={server.requests:<3} "
+                  f"{cache.stats.summary()}")
+            cache.close()
+        await close_shared_clients()
+
+
+asyncio.run(main())
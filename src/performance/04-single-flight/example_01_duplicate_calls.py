@@ -0,0 +1,51 @@
+"""
+Benchmark of single-flight coalescing under concurrent duplicate model calls.
+
+One hundred callers send the same request at the same time to a slow local stub
+server, once straight through the shared client and once through the single-flight
+wrapper. The stub counts the upstream requests it receives: without coalescing it
+sees every call, with coalescing it sees exactly one.
+
+Usage:
+    uv run src/performance/04-single-flight/example_01_duplicate_calls.py
+"""
+
+import asyncio
+import time
+
+from autogen_core.models import ChatCompletionClient, UserMessage
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.models import SingleFlightChatCompletionClient
+from autogen_exploration.stub_server import StubOpenAIServer
+
+CALLERS = 100
+STUB_LATENCY = 0.2
+
+
+async def run(name: str, server: StubOpenAIServer, client: ChatCompletionClient) -> None:
+    """Send CALLERS concurrent identical requests and report the upstream request count."""
+    before = server.requests
+    messages = [UserMessage(content="What is the capital of France?", source="user")]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client.create(messages) for _ in range(CALLERS)))
+    elapsed = time.perf_counter() - start
+    assert all(result.content == results[0].content for result in results)
+    print(f"{name:<14} callers={CALLERS} upstream requests={server.requests - before:<4} "
+          f"wall={elapsed * 1000:.0f}ms")
+
+
+async def main():
+    """
+    Compare the plain and the single-flight clients against the stub server.
+    """
+    async with StubOpenAIServer(ttft=STUB_LATENCY) as server:
+        model_client = create_model_client(server.settings())
+        await run("plain", server, model_client)
+        single_flight = SingleFlightChatCompletionClient(model_client)
+        await run("single-flight", server, single_flight)
+        print(f"single-flight stats: {single_flight.stats}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
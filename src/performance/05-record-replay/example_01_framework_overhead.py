@@ -0,0 +1,75 @@
+"""
+Measure framework overhead by replaying a recorded team run without the network.
+
+The primary/critic team from the 02-teams examples is first run against a slow
+local stub server while its model exchanges are recorded to a cassette. The same
+run is then replayed from the cassette at the recorded pace and instantly. The
+instant replay contains no model latency at all, so its wall time is the
+overhead AutoGen itself adds around the model calls.
+
+Any example can be recorded and replayed the same way through environment
+variables, for example:
+    AUTOGEN_CASSETTE=lesson_one.jsonl.gz AUTOGEN_CASSETTE_MODE=record uv run src/quick-start/lesson_one.py
+    AUTOGEN_CASSETTE=lesson_one.jsonl.gz AUTOGEN_REPLAY_SPEED=0 uv run src/quick-start/lesson_one.py
+
+Usage:
+    uv run src/performance/05-record-replay/example_01_framework_overhead.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.teams import RoundRobinGroupChat
+from autogen_core.models import ChatCompletionClient
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.models import Cassette, CassetteChatCompletionClient
+from autogen_exploration.stub_server import StubOpenAIServer
+
+STUB_LATENCY = 0.1
+MESSAGES = 11
+TASK = "Write a short poem about the fall season."
+
+
+async def run_team(model_client: ChatCompletionClient) -> float:
+    """Run the primary/critic team once and return its wall time."""
+    primary_agent = AssistantAgent("primary", model_client=model_client,
+                                   system_message="You are a helpful AI assistant.")
+    critic_agent = AssistantAgent("critic", model_client=model_client,
+                                  system_message="Provide constructive feedback. "
+                                                 "Respond with 'APPROVE' to when your "
+                                                 "feedbacks are addressed.")
+    team = RoundRobinGroupChat([primary_agent, critic_agent],
+                               termination_condition=MaxMessageTermination(MESSAGES))
+    start = time.perf_counter()
+    await team.run(task=TASK)
+    return time.perf_counter() - start
+
+
+async def main():
+    """
+    Record the team run against the stub server, then replay it at two speeds.
+    """
+    path = os.path.join(tempfile.mkdtemp(), "poem.jsonl.gz")
+    async with StubOpenAIServer(ttft=STUB_LATENCY) as server:
+        real_client = create_model_client(server.settings())
+        recorded = await run_team(
+            CassetteChatCompletionClient(real_client, Cassette(path), mode="record"))
+        calls = server.requests
+    print(f"recorded        wall={recorded * 1000:7.1f}ms model calls={calls} "
+          f"cassette={os.path.getsize(path)} bytes")
+
+    # The stub server is gone: from here on nothing touches the network.
+    for label, speed in (("replay 1x", 1.0), ("replay instant", 0.0)):
+        elapsed = await run_team(
+            CassetteChatCompletionClient(real_client, Cassette(path), speed=speed))
+        print(f"{label:<15} wall={elapsed * 1000:7.1f}ms "
+              f"per call={elapsed / calls * 1000:.2f}ms")
+    await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+Load test of the RoundRobinGroupChat, SelectorGroupChat, Swarm and GraphFlow teams.
+
+Each team from the examples is run many times concurrently against the local stub
+server with streaming model clients, first under a steady latency profile and then
+under a noisy one with a long jitter tail and occasional server errors that the
+OpenAI SDK retries. The run latency percentiles and the throughput show how each
+orchestration pattern behaves as the model gets slower and less predictable.
+
+Usage:
+    uv run src/performance/06-stub-server/example_01_team_load_test.py
+"""
+
+import asyncio
+import random
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import Team
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.teams import (
+    DiGraphBuilder,
+    GraphFlow,
+    RoundRobinGroupChat,
+    SelectorGroupChat,
+    Swarm,
+)
+from autogen_core.models import ChatCompletionClient
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.stub_server import StubOpenAIServer
+
+CONCURRENT_RUNS = 25
+MAX_MESSAGES = 5
+PROFILES = {
+    "steady": {"ttft": 0.15, "tokens_per_second": 100, "jitter": 0.0, "error_rate": 0.0},
+    "noisy": {"ttft": 0.15, "tokens_per_second": 100, "jitter": 0.25, "error_rate": 0.02},
+}
+
+_SELECTOR_CANDIDATES = re.compile(r"select the next role from \[(.*?)\]")
+_rng = random.Random(7)
+
+
+def select_speaker(body: Dict[str, Any]) -> Optional[str]:
+    """Answer the SelectorGroupChat speaker prompt with one of the candidates."""
+    for message in body.get("messages", []):
+        match = _SELECTOR_CANDIDATES.search(str(message.get("content", "")))
+        if match:
+            return _rng.choice(re.findall(r"'([^']+)'", match.group(1)))
+    return None
+
+
+def refund_flight(flight_id: str) -> str:
+    """Refund a flight"""
+    return f"Flight {flight_id} refunded"
+
+
+def round_robin_team(model_client: ChatCompletionClient) -> Team:
+    """The primary/critic poem team."""
+    primary = AssistantAgent("primary", model_client=model_client, model_client_stream=True,
+                             system_message="You are a helpful AI assistant.")
+    critic = AssistantAgent("critic", model_client=model_client, model_client_stream=True,
+                            system_message="Provide constructive feedback.")
+    return RoundRobinGroupChat([primary, critic],
+                               termination_condition=MaxMessageTermination(MAX_MESSAGES))
+
+
+def selector_team(model_client: ChatCompletionClient) -> Team:
+    """A planner and two specialists picked by the model."""
+    agents = [
+        AssistantAgent(name, model_client=model_client, model_client_stream=True,
+                       description=f"The {name}.", system_message=f"You are the {name}.")
+        for name in ("planner", "researcher", "analyst")
+    ]
+    return SelectorGroupChat(agents, model_client=model_client,
+                             termination_condition=MaxMessageTermination(MAX_MESSAGES))
+
+
+def swarm_team(model_client: ChatCompletionClient) -> Team:
+    """The travel agent and flight refunder of the customer support example."""
+    travel_agent = AssistantAgent("travel_agent", model_client=model_client,
+                                  model_client_stream=True, handoffs=["flights_refunder"],
+                                  system_message="You are a travel agent.")
+    flights_refunder = AssistantAgent("flights_refunder", model_client=model_client,
+                                      model_client_stream=True, tools=[refund_flight],
+                                      handoffs=["travel_agent"],
+                                      system_message="You refund flights.")
+    return Swarm([travel_agent, flights_refunder],
+                 termination_condition=MaxMessageTermination(MAX_MESSAGES))
+
+
+def graph_flow_team(model_client: ChatCompletionClient) -> Team:
+    """The writer/reviewer sequential flow."""
+    writer = AssistantAgent("writer", model_client=model_client, model_client_stream=True,
+                            system_message="Draft a short paragraph on climate change.")
+    reviewer = AssistantAgent("reviewer", model_client=model_client, model_client_stream=True,
+                              system_message="Review the draft and suggest improvements.")
+    builder = DiGraphBuilder()
+    builder.add_node(writer).add_node(reviewer)
+    builder.add_edge(writer, reviewer)
+    return GraphFlow([writer, reviewer], graph=builder.build())
+
+
+TEAMS: Dict[str, Callable[[ChatCompletionClient], Team]] = {
+    "RoundRobinGroupChat": round_robin_team,
+    "SelectorGroupChat": selector_team,
+    "Swarm": swarm_team,
+    "GraphFlow": graph_flow_team,
+}
+
+
+async def timed_run(team: Team) -> float:
+    """Run a team once and return the seconds it took."""
+    start = time.perf_counter()
+    await team.run(task="Write a short poem about the fall season.")
+    return time.perf_counter() - start
+
+
+async def load_test(server: StubOpenAIServer, name: str, model_client: ChatCompletionClient) -> None:
+    """Run CONCURRENT_RUNS copies of a team at once and print latency and throughput."""
+    requests, tokens = server.requests, server.completion_tokens
+    start = time.perf_counter()
+    latencies = await asyncio.gather(
+        *(timed_run(TEAMS[name](model_client)) for _ in range(CONCURRENT_RUNS)))
+    elapsed = time.perf_counter() - start
+    summary = summarize_latencies(latencies)
+    print(f"  {name:<20} p50={summary['p50_ms']:>6.0f}ms p95={summary['p95_ms']:>6.0f}ms "
+          f"p99={summary['p99_ms']:>6.0f}ms runs/s={CONCURRENT_RUNS / elapsed:>5.1f} "
+          f"requests={server.requests - requests:<4} "
+          f"tokens/s={(server.completion_tokens - tokens) / elapsed:>6.0f}")
+
+
+async def main():
+    """
+    Load test every team under each stub server profile.
+    """
+    async with StubOpenAIServer(responses=select_speaker, seed=7) as server:
+        model_client = create_model_client(server.settings())
+        for profile, knobs in PROFILES.items():
+            for knob, value in knobs.items():
+                setattr(server, knob, value)
+            failed = server.failed
+            print(f"{profile} profile {knobs}")
+            for name in TEAMS:
+                await load_test(server, name, model_client)
+            print(f"  server errors retried: {server.failed - failed}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
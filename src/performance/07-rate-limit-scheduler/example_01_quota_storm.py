@@ -0,0 +1,98 @@
+"""
+Benchmark of the rate-limit-aware scheduler against a deployment with quotas.
+
+A burst of interactive requests and a larger burst of batch requests hit a local
+stub server that enforces requests-per-minute and tokens-per-minute quotas over a
+one-second window, the way Azure OpenAI does. The burst is sent three ways:
+straight through the shared client (the OpenAI SDK retries each 429 on its own),
+through a scheduler that only adapts its concurrency to 429 answers, and through a
+scheduler that also knows the quotas. The stub counts the 429 answers, and the
+latency percentiles per priority class show interactive requests overtaking the
+batch work.
+
+Usage:
+    uv run src/performance/07-rate-limit-scheduler/example_01_quota_storm.py
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from autogen_core.models import ChatCompletionClient, UserMessage
+from openai import RateLimitError
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.models import RateLimitScheduler, ScheduledChatCompletionClient
+from autogen_exploration.stub_server import StubOpenAIServer
+
+INTERACTIVE_REQUESTS = 30
+BATCH_REQUESTS = 150
+REQUESTS_PER_MINUTE = 1200
+TOKENS_PER_MINUTE = 30000
+QUOTA_WINDOW = 1.0
+
+
+async def timed_create(client: ChatCompletionClient, number: int,
+                       latencies: List[float]) -> bool:
+    """Send one request, recording its latency, and return False when it was rejected."""
+    start = time.perf_counter()
+    try:
+        await client.create([UserMessage(content=f"Classify support ticket {number}.",
+                                         source="user")])
+    except RateLimitError:
+        return False
+    latencies.append(time.perf_counter() - start)
+    return True
+
+
+async def run(name: str, server: StubOpenAIServer, interactive: ChatCompletionClient,
+              batch: ChatCompletionClient,
+              scheduler: Optional[RateLimitScheduler] = None) -> None:
+    """Send the burst of batch and interactive requests and print what happened."""
+    await asyncio.sleep(QUOTA_WINDOW)
+    rate_limited = server.rate_limited
+    latencies: Dict[str, List[float]] = {"interactive": [], "batch": []}
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(timed_create(batch, n, latencies["batch"]) for n in range(BATCH_REQUESTS)),
+        *(timed_create(interactive, n, latencies["interactive"])
+          for n in range(INTERACTIVE_REQUESTS)),
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{name}: wall={elapsed:.1f}s 429s={server.rate_limited - rate_limited} "
+          f"failed={outcomes.count(False)}")
+    for priority, samples in latencies.items():
+        summary = summarize_latencies(samples)
+        print(f"  {priority:<12} p50={summary['p50_ms']:>6.0f}ms "
+              f"p95={summary['p95_ms']:>6.0f}ms max={summary['max_ms']:>6.0f}ms")
+    if scheduler is not None:
+        print(f"  scheduler {scheduler.stats.summary()}")
+
+
+async def main():
+    """
+    Send the same burst through the shared client and through both schedulers.
+    """
+    async with StubOpenAIServer(ttft=0.05, rate_limit_rpm=REQUESTS_PER_MINUTE,
+                                rate_limit_tpm=TOKENS_PER_MINUTE,
+                                rate_limit_window=QUOTA_WINDOW) as server:
+        settings = server.settings()
+        sdk_client = create_model_client(settings)
+        await run("SDK retries", server, sdk_client, sdk_client)
+
+        model_client = create_model_client(settings, max_retries=0, max_tokens=16)
+        for name, scheduler in (
+                ("AIMD only", RateLimitScheduler(initial_concurrency=32)),
+                ("quotas + AIMD", RateLimitScheduler(
+                    requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                    window=QUOTA_WINDOW, initial_concurrency=32)),
+        ):
+            await run(name, server,
+                      ScheduledChatCompletionClient(model_client, scheduler, "interactive"),
+                      ScheduledChatCompletionClient(model_client, scheduler, "batch"),
+                      scheduler)
+        await close_shared_clients()
+
+
+asyncio.run(main())
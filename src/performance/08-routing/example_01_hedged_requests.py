@@ -0,0 +1,87 @@
+"""
+Benchmark of load balancing and hedging across several deployments.
+
+Three local stub servers stand in for three regional deployments of the same
+model. All of them stall now and then, the way a busy shared deployment does, and
+one of them also fails a third of its requests. The same load is sent to a single
+deployment, balanced across all three, and balanced with hedging. The per-backend
+histograms show the failing deployment being ejected, and the overall latency
+percentiles show hedging cutting the tail.
+
+Usage:
+    uv run src/performance/08-routing/example_01_hedged_requests.py
+"""
+
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from typing import List
+
+from autogen_core.models import ChatCompletionClient, UserMessage
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.models import RoutingChatCompletionClient
+from autogen_exploration.stub_server import StubOpenAIServer
+
+REQUESTS = 300
+CONCURRENCY = 20
+PROFILE = {"ttft": 0.1, "jitter": 0.05, "stall_rate": 0.05, "stall_seconds": 2.0}
+
+
+async def run(name: str, client: ChatCompletionClient) -> None:
+    """Send REQUESTS requests, CONCURRENCY at a time, and print the latency percentiles."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies: List[float] = []
+    failures = 0
+
+    async def request(number: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.create([UserMessage(content=f"Summarize report {number}.",
+                                                 source="user")])
+            except Exception:  # pylint: disable=broad-exception-caught
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(number) for number in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    summary = summarize_latencies(latencies)
+    print(f"{name:<16} wall={elapsed:.1f}s failed={failures:<3} p50={summary['p50_ms']:.0f}ms "
+          f"p95={summary['p95_ms']:.0f}ms p99={summary['p99_ms']:.0f}ms "
+          f"max={summary['max_ms']:.0f}ms")
+
+
+async def main():
+    """
+    Compare a single deployment with balanced and hedged routing over three stubs.
+    """
+    async with AsyncExitStack() as stack:
+        servers = [
+            await stack.enter_async_context(StubOpenAIServer(**PROFILE, seed=1)),
+            await stack.enter_async_context(StubOpenAIServer(**PROFILE, seed=2)),
+            await stack.enter_async_context(StubOpenAIServer(**PROFILE, seed=3,
+                                                             error_rate=0.3)),
+        ]
+        # The router fails requests over itself, the SDK must not retry them first.
+        clients = {f"region-{index}": create_model_client(server.settings(), max_retries=0)
+                   for index, server in enumerate(servers)}
+
+        await run("single", clients["region-0"])
+        balanced = RoutingChatCompletionClient(clients)
+        await run("balanced", balanced)
+        # Until a backend has enough samples for its p95, hedge after half a second.
+        hedged = RoutingChatCompletionClient(clients, hedge=True, hedge_delay=0.5)
+        await run("balanced+hedged", hedged)
+
+        print(f"hedged router: {hedged.stats}")
+        for backend, report in hedged.report().items():
+            print(f"  {backend}: {report}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+Benchmark of start-up time: import cost per module and time to first request.
+
+The first part runs ``python -X importtime -c "import <module>"`` for the modules
+the examples pull in and reports each one's cumulative import time, with the
+biggest contributors to ``autogen_exploration.clients``.
+
+The second part starts every example script under ``src`` against a local stub
+server and measures the time from process start until the stub receives the
+script's first model request, once run directly and once through the
+fast-start launcher (``python -m autogen_exploration.launch``). The script is
+killed as soon as its first request arrives. Scripts that exit, or wait for
+input, before sending a request are reported as such.
+
+Usage:
+    uv run src/performance/09-startup/example_01_startup_time.py
+"""
+
+import asyncio
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from autogen_exploration.stub_server import (
+    STUB_API_KEY,
+    STUB_API_VERSION,
+    STUB_DEPLOYMENT,
+    StubOpenAIServer,
+)
+
+SOURCE_ROOT = Path(__file__).resolve().parents[2]
+MODULES = (
+    "autogen_core",
+    "autogen_agentchat.agents",
+    "autogen_agentchat.teams",
+    "openai",
+    "azure.identity",
+    "autogen_ext.auth.azure",
+    "autogen_ext.models.openai",
+    "autogen_exploration.clients",
+    "autogen_exploration.models",
+)
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\s*)(\S+)")
+TOP_CONTRIBUTORS = 8
+REPEATS = 3
+FIRST_REQUEST_TIMEOUT = 20.0
+
+
+def import_times(module: str) -> Optional[List[Tuple[str, int, int, int]]]:
+    """
+    Import a module in a fresh interpreter and parse its ``-X importtime`` report.
+
+    Returns:
+        Optional[List[Tuple[str, int, int, int]]]: ``(name, self_us, cumulative_us, depth)``
+            for every imported module, or None when the module is not installed.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, check=False)
+    if completed.returncode != 0:
+        return None
+    return [(match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2)
+            for match in map(IMPORT_LINE.match, completed.stderr.splitlines()) if match]
+
+
+def report_import_times() -> None:
+    """Print the cumulative import time of every module in MODULES."""
+    print("Import time (cumulative, fresh interpreter)")
+    for module in MODULES:
+        samples = [import_times(module) for _ in range(REPEATS)]
+        if samples[0] is None:
+            print(f"  {module:<32} not installed")
+            continue
+        cumulative = statistics.median(next(total for name, _, total, _ in sample
+                                            if name == module) for sample in samples)
+        print(f"  {module:<32} {cumulative / 1000:>7.0f}ms")
+        if module == "autogen_exploration.clients":
+            # Top-level packages only, so that nested modules are not counted twice.
+            packages = [entry for entry in samples[0] if entry[3] == 0 and entry[0] != module]
+            packages.sort(key=lambda entry: entry[2], reverse=True)
+            for name, _, total, _ in packages[:TOP_CONTRIBUTORS]:
+                print(f"      {name:<28} {total / 1000:>7.0f}ms")
+
+
+def example_scripts() -> List[Path]:
+    """Return every example script under ``src``, leaving out the benchmarks."""
+    return sorted(path for path in SOURCE_ROOT.glob("*/**/*.py")
+                  if path.parts[len(SOURCE_ROOT.parts)] not in ("performance",
+                                                                 "autogen_exploration"))
+
+
+def stub_environment(server: StubOpenAIServer) -> Dict[str, str]:
+    """Return the environment that points both deployments the examples use at the stub."""
+    environment = {name: value for name, value in os.environ.items()
+                   if not name.startswith(("AZURE_OPENAI_", "AUTOGEN_"))}
+    for suffix in ("", "_O_4_MINI"):
+        environment[f"AZURE_OPENAI_API_INSTANCE_NAME{suffix}"] = server.url
+        environment[f"AZURE_OPENAI_API_DEPLOYMENT_NAME{suffix}"] = STUB_DEPLOYMENT
+        # The reasoning model example reads its deployment without the _NAME suffix.
+        environment[f"AZURE_OPENAI_API_DEPLOYMENT{suffix}"] = STUB_DEPLOYMENT
+        environment[f"AZURE_OPENAI_API_VERSION{suffix}"] = STUB_API_VERSION
+    environment["AZURE_OPENAI_API_KEY"] = STUB_API_KEY
+    return environment
+
+
+async def time_to_first_request(command: List[str], environment: Dict[str, str],
+                                first_request: asyncio.Event) -> Tuple[Optional[float], str]:
+    """
+    Start a script and wait for its first model request.
+
+    Returns:
+        Tuple[Optional[float], str]: The seconds until the first request, or None with
+            the reason it never came.
+    """
+    first_request.clear()
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *command, env=environment, cwd=SOURCE_ROOT.parent, stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    request = asyncio.ensure_future(first_request.wait())
+    exited = asyncio.ensure_future(process.wait())
+    try:
+        await asyncio.wait({request, exited}, timeout=FIRST_REQUEST_TIMEOUT,
+                           return_when=asyncio.FIRST_COMPLETED)
+        if request.done():
+            return time.perf_counter() - start, ""
+        if exited.done():
+            return None, f"exit {process.returncode}"
+        return None, "timeout"
+    finally:
+        request.cancel()
+        if process.returncode is None:
+            process.kill()
+        await exited
+
+
+async def report_first_requests() -> None:
+    """Print the time to first request of every example, run directly and through the launcher."""
+    first_request = asyncio.Event()
+
+    def responder(_body):
+        first_request.set()
+
+    async with StubOpenAIServer(responses=responder) as server:
+        environment = stub_environment(server)
+        print("\nTime to first request (median of "
+              f"{REPEATS}, direct vs. python -m autogen_exploration.launch)")
+        totals: Dict[str, List[float]] = {"direct": [], "launcher": []}
+        for script in example_scripts():
+            relative = script.relative_to(SOURCE_ROOT)
+            results = []
+            for mode, command in (
+                    ("direct", [sys.executable, str(script)]),
+                    ("launcher", [sys.executable, "-m", "autogen_exploration.launch",
+                                  str(script)]),
+            ):
+                samples = [await time_to_first_request(command, environment, first_request)
+                           for _ in range(REPEATS)]
+                seconds = [sample for sample, _ in samples if sample is not None]
+                if len(seconds) < REPEATS:
+                    results.append(f"{samples[-1][1] or 'unstable':>9}")
+                    continue
+                totals[mode].append(statistics.median(seconds))
+                results.append(f"{statistics.median(seconds) * 1000:>7.0f}ms")
+            print(f"  {str(relative):<72} {results[0]} {results[1]}")
+        for mode, seconds in totals.items():
+            if seconds:
+                print(f"{mode}: {len(seconds)} scripts, "
+                      f"median {statistics.median(seconds) * 1000:.0f}ms, "
+                      f"mean {statistics.mean(seconds) * 1000:.0f}ms")
+
+
+def main():
+    """
+    Report import times, then the time to first request of every example.
+    """
+    report_import_times()
+    asyncio.run(report_first_requests())
+
+
+main()
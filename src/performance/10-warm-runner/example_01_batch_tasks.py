@@ -0,0 +1,109 @@
+"""
+Benchmark of the warm runner against starting a fresh process per task.
+
+The primary/critic team of the 02-teams round-robin example runs on many small
+writing tasks against a local stub server whose critic approves straight away.
+Each task is first run cold, in a new ``python -m autogen_exploration.runner run``
+process, then submitted to a warm runner one at a time, and finally submitted
+to the warm runner as one batch that runs concurrently.
+
+Usage:
+    uv run src/performance/10-warm-runner/example_01_batch_tasks.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from autogen_exploration.clients import close_shared_clients
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.runner import RunnerServer, submit
+from autogen_exploration.stub_server import (
+    STUB_API_KEY,
+    STUB_API_VERSION,
+    STUB_DEPLOYMENT,
+    StubOpenAIServer,
+)
+
+EXAMPLE = str(Path(__file__).resolve().parents[2]
+              / "introduction" / "02-teams" / "example_01_roundrobin_team.py")
+COLD_RUNS = 5
+WARM_RUNS = 20
+BATCH_JOBS = 300
+MAX_JOBS = 64
+
+
+def approve(body: Dict[str, Any]) -> Optional[str]:
+    """Let the critic approve every draft, so that each task takes two model calls."""
+    system_message = body["messages"][0].get("content") or ""
+    return "APPROVE" if "feedback" in system_message else None
+
+
+def task(number: int) -> str:
+    """Return the writing task of a job."""
+    return f"Write a two-line poem about season number {number}."
+
+
+async def run_cold(number: int) -> float:
+    """Run one task in a fresh process and return its wall time."""
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "autogen_exploration.runner", "run", EXAMPLE, task(number),
+        stdout=asyncio.subprocess.DEVNULL)
+    await process.wait()
+    return time.perf_counter() - start
+
+
+async def run_warm(server: RunnerServer, jobs: List[Dict[str, Any]]) -> List[float]:
+    """Submit jobs to the warm runner and return the run time of each one."""
+    seconds = []
+    async for event in submit(jobs, *server.address):
+        if event["event"] == "error":
+            raise RuntimeError(event["error"])
+        if event["event"] == "result":
+            seconds.append(event["seconds"])
+    return seconds
+
+
+async def main():
+    """
+    Compare cold processes with one-at-a-time and batched jobs on a warm runner.
+    """
+    async with StubOpenAIServer(ttft=0.05, responses=approve) as stub:
+        # The runner, and the cold processes inheriting the environment, use the stub.
+        os.environ.update({
+            "AZURE_OPENAI_API_INSTANCE_NAME": stub.url,
+            "AZURE_OPENAI_API_DEPLOYMENT_NAME": STUB_DEPLOYMENT,
+            "AZURE_OPENAI_API_VERSION": STUB_API_VERSION,
+            "AZURE_OPENAI_API_KEY": STUB_API_KEY,
+        })
+        cold = [await run_cold(number) for number in range(COLD_RUNS)]
+        print(f"cold process    per task={statistics.median(cold) * 1000:.0f}ms "
+              f"({60 / statistics.median(cold):.0f} tasks/min)")
+
+        async with RunnerServer(port=0, max_jobs=MAX_JOBS) as server:
+            warm = []
+            for number in range(WARM_RUNS):
+                start = time.perf_counter()
+                await run_warm(server, [{"example": EXAMPLE, "task": task(number)}])
+                warm.append(time.perf_counter() - start)
+            print(f"warm, one by one per task={statistics.median(warm) * 1000:.0f}ms "
+                  f"({60 / statistics.median(warm):.0f} tasks/min)")
+
+            start = time.perf_counter()
+            seconds = await run_warm(server, [{"example": EXAMPLE, "task": task(number)}
+                                              for number in range(BATCH_JOBS)])
+            elapsed = time.perf_counter() - start
+            summary = summarize_latencies(seconds)
+            print(f"warm, batch     jobs={len(seconds)} wall={elapsed:.1f}s "
+                  f"({len(seconds) / elapsed * 60:.0f} tasks/min) "
+                  f"p50={summary['p50_ms']:.0f}ms p95={summary['p95_ms']:.0f}ms")
+            print(f"stub: connections={stub.connections} requests={stub.requests}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark of pre-flight token counting and token budgets on a growing critic loop.
+
+The first part counts the prompt of every turn of a growing conversation, the
+way each agent of a team does before each request, with a counter that
+tokenizes every message again and with the memoizing counter that only
+tokenizes new messages.
+
+The second part runs the primary/critic team of the 02-teams examples against
+a local stub server whose critic never approves. Only the token budgets stop
+the loop: each agent has its own budget and both share the budget of the run.
+Each message shows the prompt tokens predicted before sending next to the
+actual ones.
+
+Usage:
+    uv run src/performance/11-token-budget/example_01_critic_loop.py
+"""
+
+import asyncio
+import time
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.teams import RoundRobinGroupChat
+from autogen_core.models import AssistantMessage, SystemMessage, UserMessage
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.models import (
+    BudgetedChatCompletionClient,
+    TokenBudget,
+    TokenCounter,
+)
+from autogen_exploration.stub_server import StubOpenAIServer
+
+TURNS = 200
+DRAFT = ("Crimson leaves drift down in the cooling air, the orchard hums with the last bees "
+         "of the year, and the light turns amber over the quiet fields. ") * 6
+AGENT_BUDGET = 4000
+RUN_BUDGET = 6000
+
+
+def time_counting(counter: TokenCounter) -> float:
+    """Count the prompt of every turn of a growing conversation and return the seconds."""
+    messages = [SystemMessage(content="You are a helpful AI assistant.")]
+    start = time.perf_counter()
+    for turn in range(TURNS):
+        if turn % 2:
+            messages.append(AssistantMessage(content=f"{turn}: {DRAFT}", source="primary"))
+        else:
+            messages.append(UserMessage(content=f"{turn}: Tighten the imagery. {DRAFT}",
+                                        source="critic"))
+        counter.count(messages)
+    return time.perf_counter() - start
+
+
+async def main():
+    """
+    Compare token counting with and without memoization, then run a budgeted critic loop.
+    """
+    uncached = time_counting(TokenCounter(max_entries=0))
+    counter = TokenCounter()
+    cached = time_counting(counter)
+    print(f"counting {TURNS} turns: every message={uncached * 1000:.0f}ms "
+          f"memoized={cached * 1000:.0f}ms ({counter.stats})")
+
+    async with StubOpenAIServer(ttft=0.01, reply=DRAFT) as server:
+        model_client = create_model_client(server.settings())
+        run_budget = TokenBudget(RUN_BUDGET, "run")
+        budgets = {name: TokenBudget(AGENT_BUDGET, name) for name in ("primary", "critic")}
+        clients = {name: BudgetedChatCompletionClient(model_client, [budget, run_budget])
+                   for name, budget in budgets.items()}
+        primary_agent = AssistantAgent(
+            "primary",
+            model_client=clients["primary"],
+            system_message="You are a helpful AI assistant.",
+        )
+        critic_agent = AssistantAgent(
+            "critic",
+            model_client=clients["critic"],
+            system_message="Provide constructive feedback. "
+                           "Respond with 'APPROVE' to when your feedbacks are addressed.",
+        )
+        team = RoundRobinGroupChat([primary_agent, critic_agent])
+        try:
+            async for message in team.run_stream(task="Write a short poem about the fall season."):
+                if isinstance(message, TaskResult):
+                    continue
+                if message.models_usage is not None and message.source in clients:
+                    prediction = clients[message.source].predictions[-1]
+                    print(f"  {message.source:<8} predicted={prediction.predicted_prompt_tokens:>5} "
+                          f"actual={prediction.prompt_tokens:>5} "
+                          f"completion={prediction.completion_tokens}")
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            print(f"stopped: {str(error).strip().splitlines()[-1]}")
+        for budget in (*budgets.values(), run_budget):
+            print(f"  {budget.name:<8} {budget.summary()}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Benchmark of serial and concurrent execution of slow tool calls.
+
+A local stub server answers the first request of every run with one call to
+each of N simulated tools, the way a model answering with parallel tool calls
+does, and the agent then executes them:
+
+- I/O-bound tools (a blocking ``time.sleep`` and an ``asyncio.sleep``) run one
+  at a time, with AutoGen's default workbench, and with the bounded executor at
+  a few concurrency limits;
+- CPU-bound tools run in the executor's thread pool and in its process pool,
+  which only wins on a machine with several cores;
+- a tool that hangs is cut off by the executor's per-tool timeout.
+
+Usage:
+    uv run src/performance/12-tool-executor/example_01_parallel_tools.py
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Dict, Optional
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_core.tools import FunctionTool, StaticWorkbench, Workbench
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.stub_server import StubOpenAIServer, StubReply, StubToolCall
+from autogen_exploration.tools import ToolExecutor
+
+TOOL_CALLS = 16
+TOOL_SECONDS = 0.2
+CPU_CALLS = 8
+CPU_LOOPS = 3_000_000
+
+
+def blocking_lookup(query: str) -> str:
+    """Look a query up in a slow synchronous service."""
+    time.sleep(TOOL_SECONDS)
+    return f"result for {query}"
+
+
+async def async_lookup(query: str) -> str:
+    """Look a query up in a slow asynchronous service."""
+    await asyncio.sleep(TOOL_SECONDS)
+    return f"result for {query}"
+
+
+def checksum(query: str) -> str:
+    """Compute an expensive checksum of a query."""
+    total = 0
+    for number in range(CPU_LOOPS):
+        total = (total + number * len(query)) % 1_000_003
+    return str(total)
+
+
+def hanging_lookup(query: str) -> str:
+    """Look a query up in a service that sometimes never answers."""
+    time.sleep(5 if query == "q0" else TOOL_SECONDS)
+    return f"result for {query}"
+
+
+def call_every_tool(body: Dict[str, Any]) -> Optional[StubReply]:
+    """Stub responder: call the offered tool as often as the task asks, then answer."""
+    if body["messages"][-1]["role"] == "tool":
+        return None
+    calls = int(re.search(r"\d+", body["messages"][-1]["content"]).group())
+    name = body["tools"][0]["function"]["name"]
+    return StubReply(tool_calls=[StubToolCall(name, {"query": f"q{number}"})
+                                 for number in range(calls)])
+
+
+async def run_agent(server: StubOpenAIServer, name: str, workbench: Workbench,
+                    calls: int) -> float:
+    """Run one agent turn that makes `calls` tool calls and print its wall time."""
+    agent = AssistantAgent("assistant", model_client=create_model_client(server.settings()),
+                           workbench=workbench)
+    start = time.perf_counter()
+    await agent.run(task=f"Look up {calls} queries.")
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<34} wall={elapsed * 1000:>6.0f}ms")
+    return elapsed
+
+
+async def main():
+    """
+    Run the same tool calls serially, with AutoGen's defaults and with the executor.
+    """
+    async with StubOpenAIServer(responses=call_every_tool) as server:
+        for tool in (blocking_lookup, async_lookup):
+            print(f"{TOOL_CALLS} calls of {tool.__name__} ({TOOL_SECONDS * 1000:.0f}ms each)")
+            await run_agent(server, "serial (max_concurrency=1)",
+                            ToolExecutor([tool], max_concurrency=1), TOOL_CALLS)
+            await run_agent(server, "AutoGen default workbench",
+                            StaticWorkbench([FunctionTool(tool, tool.__doc__)]), TOOL_CALLS)
+            for limit in (4, 16):
+                await run_agent(server, f"executor max_concurrency={limit}",
+                                ToolExecutor([tool], max_concurrency=limit), TOOL_CALLS)
+
+        print(f"{CPU_CALLS} calls of checksum (CPU-bound)")
+        await run_agent(server, "thread pool", ToolExecutor([checksum]), CPU_CALLS)
+        processes = ToolExecutor([checksum], process_tools={"checksum"})
+        await run_agent(server, "process pool", processes, CPU_CALLS)
+        await processes.stop()
+
+        print(f"{TOOL_CALLS} calls of hanging_lookup, one hangs for 5s")
+        executor = ToolExecutor([hanging_lookup], max_concurrency=TOOL_CALLS, timeout=1.0)
+        await run_agent(server, "executor timeout=1s", executor, TOOL_CALLS)
+        for tool, report in executor.report().items():
+            print(f"  {tool}: {report}")
+        await executor.stop()
+        await close_shared_clients()
+
+
+if __name__ == "__main__":
+    # Guarded, because the process pool imports this module in its workers.
+    asyncio.run(main())
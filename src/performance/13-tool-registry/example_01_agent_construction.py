@@ -0,0 +1,136 @@
+"""
+Benchmark of agent construction with 50 tools, with and without the tool registry.
+
+A module of 50 typed tool functions is written to a temporary directory, and
+the time to build an ``AssistantAgent`` with all of them is measured:
+
+- in this process, from plain functions (every agent compiles every tool), from
+  one shared list of ``FunctionTool`` objects, and from the registry;
+- in fresh processes, the way short-lived workers start, with no schema cache
+  file, then with the one the first process saved;
+- per model request, where the agent lists its tools and each ``FunctionTool``
+  generates its JSON schema again.
+
+Usage:
+    uv run src/performance/13-tool-registry/example_01_agent_construction.py
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from typing import Callable, List
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_core.tools import FunctionTool, StaticWorkbench
+
+from autogen_exploration.stub_server import StubOpenAIServer
+from autogen_exploration.clients import create_model_client
+from autogen_exploration.tools import ToolRegistry
+
+TOOLS = 50
+AGENTS = 20
+REQUESTS = 100
+
+TOOL_SOURCE = '''
+def lookup_{number}(city: Annotated[str, "The city"], days: int = 3,
+                    units: Literal["metric", "imperial"] = "metric",
+                    fields: Optional[List[str]] = None) -> Dict[str, str]:
+    """Look up dataset {number} for a city."""
+    return {{"city": city, "dataset": "{number}", "days": str(days), "units": units}}
+'''
+
+CHILD = textwrap.dedent('''
+    import sys, time
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_ext.models.replay import ReplayChatCompletionClient
+    from autogen_exploration.tools import get_tool_registry
+    sys.path.insert(0, sys.argv[1])
+    import bench_tools
+    imported = time.perf_counter()
+    tools = get_tool_registry().tools(bench_tools.TOOLS) if sys.argv[2] == "registry" \\
+        else bench_tools.TOOLS
+    model_client = ReplayChatCompletionClient([], model_info={
+        "vision": False, "function_calling": True, "json_output": False,
+        "family": "unknown", "structured_output": False})
+    AssistantAgent("assistant", model_client=model_client, tools=tools)
+    print((time.perf_counter() - imported) * 1000)
+''')
+
+
+def write_tools(directory: str) -> None:
+    """Write a module of TOOLS tool functions, so that their source can be hashed."""
+    with open(os.path.join(directory, "bench_tools.py"), "w", encoding="utf-8") as file:
+        file.write("from typing import Annotated, Dict, List, Literal, Optional\n")
+        for number in range(TOOLS):
+            file.write(TOOL_SOURCE.format(number=number))
+        file.write(f"\nTOOLS = [{', '.join(f'lookup_{n}' for n in range(TOOLS))}]\n")
+
+
+def time_agents(model_client, tools: Callable[[], List]) -> float:
+    """Build AGENTS agents with the tools returned by `tools` and return ms per agent."""
+    start = time.perf_counter()
+    for _ in range(AGENTS):
+        AssistantAgent("assistant", model_client=model_client, tools=tools())
+    return (time.perf_counter() - start) * 1000 / AGENTS
+
+
+def time_child(directory: str, mode: str, cache: str) -> float:
+    """Build one agent in a fresh process and return its construction time in ms."""
+    env = {**os.environ, "AUTOGEN_TOOL_SCHEMA_CACHE": cache}
+    process = subprocess.run([sys.executable, "-c", CHILD, directory, mode], env=env,
+                             check=False, capture_output=True, text=True)
+    if process.returncode:
+        raise RuntimeError(process.stderr)
+    return float(process.stdout)
+
+
+async def time_requests(tools: List) -> float:
+    """List the tools' schemas REQUESTS times, as the agent does per request, in ms each."""
+    workbench = StaticWorkbench(tools)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await workbench.list_tools()
+    return (time.perf_counter() - start) * 1000 / REQUESTS
+
+
+async def main():
+    """
+    Time agent construction and per-request tool listing with and without the registry.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_tools(directory)
+        sys.path.insert(0, directory)
+        import bench_tools  # pylint: disable=import-error,import-outside-toplevel
+
+        async with StubOpenAIServer() as server:
+            model_client = create_model_client(server.settings())
+            shared = [FunctionTool(tool, tool.__doc__) for tool in bench_tools.TOOLS]
+            registry = ToolRegistry()
+            print(f"AssistantAgent with {TOOLS} tools, mean of {AGENTS} agents")
+            print(f"  plain functions        {time_agents(model_client, lambda: bench_tools.TOOLS):>7.1f}ms")
+            print(f"  shared FunctionTools   {time_agents(model_client, lambda: shared):>7.1f}ms")
+            print(f"  registry               "
+                  f"{time_agents(model_client, lambda: registry.tools(bench_tools.TOOLS)):>7.1f}ms"
+                  f"  ({registry.stats})")
+            await model_client.close()
+
+        cache = os.path.join(directory, "schemas.json")
+        print("AssistantAgent in a fresh process")
+        print(f"  plain functions        {time_child(directory, 'plain', cache):>7.1f}ms")
+        print(f"  registry, no cache     {time_child(directory, 'registry', cache):>7.1f}ms")
+        with open(cache, encoding="utf-8") as file:
+            print(f"  (cache file: {len(json.load(file))} schemas, {os.path.getsize(cache)} bytes)")
+        print(f"  registry, warm cache   {time_child(directory, 'registry', cache):>7.1f}ms")
+
+        print(f"Listing {TOOLS} tool schemas, once per request")
+        print(f"  FunctionTool           {await time_requests(shared):>7.2f}ms")
+        print(f"  registry               "
+              f"{await time_requests(registry.tools(bench_tools.TOOLS)):>7.2f}ms")
+
+
+asyncio.run(main())
@@ -0,0 +1,46 @@
+"""
+Streaming telemetry of a two-agent team, rendered by Console with a summary table.
+
+A local stub server streams every response at a fixed pace, after a time to
+first token with an exponential tail, and stalls some responses. The writer and
+editor agents of a round-robin team stream their tokens with
+``model_client_stream=True``; :class:`StreamTelemetry` taps the team's stream,
+``Console`` renders it as usual, and the table printed at the end shows each
+agent's time to first token, inter-chunk gaps, tokens per second and wall time.
+
+Usage:
+    uv run src/performance/14-streaming-telemetry/example_01_streaming_telemetry.py
+"""
+
+import asyncio
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.teams import RoundRobinGroupChat
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.stub_server import StubOpenAIServer
+from autogen_exploration.streaming import StreamTelemetry
+
+REPLY = ("Autumn settles on the hills, the maples burn in red and gold, and the river "
+         "carries their leaves toward the sea.")
+
+
+async def main():
+    """
+    Run a streaming writer/editor team against the stub server and print its telemetry.
+    """
+    async with StubOpenAIServer(ttft=0.15, tokens_per_second=80, jitter=0.1, stall_rate=0.2,
+                                stall_seconds=0.5, reply=REPLY, seed=7) as server:
+        model_client = create_model_client(server.settings())
+        writer = AssistantAgent("writer", model_client=model_client, model_client_stream=True,
+                                system_message="You write short poems.")
+        editor = AssistantAgent("editor", model_client=model_client, model_client_stream=True,
+                                system_message="You suggest one improvement to the poem.")
+        team = RoundRobinGroupChat([writer, editor], termination_condition=MaxMessageTermination(7))
+        await StreamTelemetry().console(team.run_stream(task="Write a short poem about autumn."),
+                                        output_stats=True)
+        await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Benchmark of per-token streaming events against coalesced chunk events.
+
+A local stub server streams a long answer at a fast model's pace. The consumer
+prints every message of the agent's stream (to an in-memory buffer, so the
+terminal does not dominate), first straight from ``run_stream`` with one event
+per token, then through :class:`ChunkCoalescer` with a few time windows. For each
+run it reports the events received, events per second, the consumer's time per
+1000 streamed tokens and the process CPU time per 1000 tokens. The process time
+includes the stub server and the agent, which still build one object per token,
+so it falls less than the consumer's share.
+
+The last runs use a consumer that takes 2ms per event: the coalescer's queue
+stays bounded and the events grow instead.
+
+Usage:
+    uv run src/performance/15-chunk-coalescing/example_01_coalesced_stream.py
+"""
+
+import asyncio
+import io
+import time
+from typing import AsyncIterable, Optional
+
+from autogen_agentchat.agents import AssistantAgent
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.streaming import ChunkCoalescer
+from autogen_exploration.stub_server import StubOpenAIServer
+
+REPLY = " ".join(f"word{number}" for number in range(3000))
+TOKENS_PER_SECOND = 5000
+
+
+async def consume(name: str, server: StubOpenAIServer, stream: AsyncIterable,
+                  coalescer: Optional[ChunkCoalescer] = None, delay: float = 0.0) -> None:
+    """Print every message of a stream to a buffer and report the events and CPU time."""
+    output = io.StringIO()
+    tokens = server.completion_tokens
+    events = 0
+    handling = 0.0
+    wall, cpu = time.perf_counter(), time.process_time()
+    async for message in stream:
+        start = time.perf_counter()
+        print(message, file=output)
+        handling += time.perf_counter() - start
+        events += 1
+        if delay:
+            await asyncio.sleep(delay)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    per_1k = 1000 * 1000 / (server.completion_tokens - tokens)
+    line = (f"  {name:<24} events={events:>5} events/s={events / wall:>6.0f} "
+            f"consumer/1k tokens={handling * per_1k:>5.1f}ms process/1k tokens={cpu * per_1k:>5.0f}ms "
+            f"wall={wall:>5.2f}s")
+    if coalescer is not None:
+        stats = coalescer.stats
+        line += f" chunks/event={stats.chunks_per_event:.0f} max queued={stats.max_queued}"
+    print(line)
+
+
+async def main():
+    """
+    Stream the same answer with and without coalescing, to a fast and a slow consumer.
+    """
+    async with StubOpenAIServer(tokens_per_second=TOKENS_PER_SECOND, reply=REPLY) as server:
+        agent = AssistantAgent("assistant", model_client=create_model_client(server.settings()),
+                               model_client_stream=True)
+
+        def stream():
+            return agent.run_stream(task="Write a long answer.")
+
+        print(f"{len(REPLY.split())} words streamed at {TOKENS_PER_SECOND} tokens/s")
+        await consume("one event per token", server, stream())
+        for window in (0.01, 0.05, 0.2):
+            coalescer = ChunkCoalescer(stream(), window=window)
+            await consume(f"coalesced window={window * 1000:.0f}ms", server, coalescer, coalescer)
+
+        print("consumer taking 2ms per event")
+        await consume("one event per token", server, stream(), delay=0.002)
+        coalescer = ChunkCoalescer(stream(), window=0.01, max_pending=8)
+        await consume("coalesced, 8 pending", server, coalescer, coalescer, delay=0.002)
+        await close_shared_clients()
+
+
+asyncio.run(main())
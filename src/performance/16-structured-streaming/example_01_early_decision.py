@@ -0,0 +1,119 @@
+"""
+Benchmark of latency to decision with incremental structured output parsing.
+
+The agent of example_07_structured_output.py categorizes its input as happy, sad
+or neutral. A local stub server streams its JSON answer at 50 tokens per second,
+with a few sentences of thoughts. The time until the program knows the category
+is measured:
+
+- with full-completion validation (``output_content_type`` without streaming),
+  the category is known when the whole answer has arrived and been validated;
+- with :class:`StructuredStream` on the streamed answer, it is known as soon as
+  the ``response`` field is complete: at the end when the model writes its
+  thoughts first, as ``AgentResponse`` asks, and almost at once with a model
+  whose decision comes first;
+- when the model answers with a category that does not exist, full validation
+  fails at the end, and the incremental parser fails at the first wrong token
+  and cancels the request.
+
+Usage:
+    uv run src/performance/16-structured-streaming/example_01_early_decision.py
+"""
+
+import asyncio
+import json
+import time
+from contextlib import aclosing
+from typing import Any, Dict, Literal, Type
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_core import CancellationToken
+from pydantic import BaseModel
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.structured import StructuredOutputError, StructuredStream
+from autogen_exploration.stub_server import StubOpenAIServer
+
+THOUGHTS = ("The speaker states plainly that they are happy, with no hedging or irony, "
+            "and nothing in the sentence suggests sadness or a neutral report of facts. ") * 3
+
+
+class AgentResponse(BaseModel):
+    """The response format of example_07, with the thoughts first."""
+    thoughts: str
+    response: Literal["happy", "sad", "neutral"]
+
+
+class DecisionFirst(BaseModel):
+    """The same response format with the decision first."""
+    response: Literal["happy", "sad", "neutral"]
+    thoughts: str
+
+
+def answer(body: Dict[str, Any]) -> str:
+    """Stub responder: answer in the requested field order, with the task's category."""
+    schema = body["response_format"]["json_schema"]["schema"]
+    category = "ecstatic" if "ecstatic" in body["messages"][-1]["content"] else "happy"
+    values = {"thoughts": THOUGHTS, "response": category}
+    return json.dumps({name: values[name] for name in schema["properties"]})
+
+
+def make_agent(server: StubOpenAIServer, model: Type[BaseModel], stream: bool) -> AssistantAgent:
+    """Build the categorizing agent with a structured output model."""
+    return AssistantAgent(
+        "assistant",
+        model_client=create_model_client(server.settings()),
+        system_message="Categorize the input as happy, sad, or neutral following the JSON format.",
+        output_content_type=model,
+        model_client_stream=stream,
+    )
+
+
+async def full_completion(server: StubOpenAIServer, model: Type[BaseModel], task: str) -> str:
+    """Return when the category is known with validation of the complete answer."""
+    start = time.perf_counter()
+    try:
+        result = await make_agent(server, model, stream=False).run(task=task)
+        outcome = result.messages[-1].content.response
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        outcome = f"error ({type(error).__name__})"
+    return f"{outcome:<28} after {(time.perf_counter() - start) * 1000:>5.0f}ms"
+
+
+async def incremental(server: StubOpenAIServer, model: Type[BaseModel], task: str) -> str:
+    """Return when the category is known with incremental parsing of the streamed answer."""
+    token = CancellationToken()
+    structured = StructuredStream(model, cancellation_token=token)
+    start = time.perf_counter()
+    stream = make_agent(server, model, stream=True).run_stream(task=task, cancellation_token=token)
+    try:
+        async with aclosing(structured.tap(stream)) as messages:
+            async for _ in messages:
+                if "response" in structured.fields:
+                    outcome = structured.fields["response"]
+                    break
+    except StructuredOutputError as error:
+        outcome = f"error ({type(error).__name__})"
+    return f"{outcome:<28} after {(time.perf_counter() - start) * 1000:>5.0f}ms"
+
+
+async def main():
+    """
+    Compare the time to the category with full and incremental validation.
+    """
+    async with StubOpenAIServer(tokens_per_second=50, responses=answer) as server:
+        # Warm the imports and the connection pool up before timing.
+        await full_completion(server, DecisionFirst, "I am happy.")
+        cases = [
+            ("thoughts first", AgentResponse, "I am happy."),
+            ("decision first", DecisionFirst, "I am happy."),
+            ("invalid category", DecisionFirst, "I am ecstatic."),
+        ]
+        for name, model, task in cases:
+            print(name)
+            print(f"  full completion  {await full_completion(server, model, task)}")
+            print(f"  incremental      {await incremental(server, model, task)}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
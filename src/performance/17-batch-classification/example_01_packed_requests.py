@@ -0,0 +1,135 @@
+"""
+Benchmark of batch sentiment classification with packed structured output requests.
+
+A local stub server answers like a model with a 300ms time to first token and
+200 tokens per second, and classifies every numbered input of a request by its
+words. A file of short texts is classified:
+
+- by the agent of example_07_structured_output.py, one run per text, eight at a
+  time;
+- by :class:`BatchClassifier` with one text per request, then with packs of 10
+  and 50 texts, eight requests at a time.
+
+A few texts make the stub drop their result, so their packs fail and are split
+until the bad text is alone. The last run is interrupted half way and started
+again, and skips the lines its output file already holds.
+
+Usage:
+    uv run src/performance/17-batch-classification/example_01_packed_requests.py
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from typing import Any, Dict
+
+from autogen_agentchat.agents import AssistantAgent
+
+from autogen_exploration.batch import BatchClassifier, SentimentResponse, read_inputs
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.stub_server import StubOpenAIServer
+
+LINES = 2000
+AGENT_LINES = 200
+TEXTS = ["I am happy with the new release.", "The meeting was moved to Tuesday.",
+         "I miss my old team and feel sad.", "The package arrived this morning.",
+         "What a happy surprise the party was!", "I am sad the trip was cancelled."]
+POISON = "poison"
+
+
+def classify_text(text: str) -> Dict[str, str]:
+    """Classify a text by its words, with a short explanation."""
+    for category in ("happy", "sad"):
+        if category in text:
+            return {"thoughts": f"The text says {category}.", "response": category}
+    return {"thoughts": "The text states facts.", "response": "neutral"}
+
+
+def answer(body: Dict[str, Any]) -> str:
+    """Stub responder: classify every numbered input, dropping the poisoned ones."""
+    prompt = body["messages"][-1]["content"]
+    numbered = re.findall(r"^\[(\d+)\] (.*)$", prompt, re.MULTILINE)
+    if not numbered:
+        return json.dumps(classify_text(prompt))
+    return json.dumps({"results": [{**classify_text(text), "index": int(index)}
+                                   for index, text in numbered if POISON not in text]})
+
+
+def write_inputs(path: str) -> None:
+    """Write LINES texts, a few of them poisoned."""
+    generator = random.Random(1)
+    with open(path, "w", encoding="utf-8") as file:
+        for number in range(LINES):
+            text = generator.choice(TEXTS)
+            file.write(f"{text} ({POISON})\n" if number % 500 == 7 else f"{text}\n")
+
+
+async def run_agents(server: StubOpenAIServer, path: str) -> None:
+    """Classify AGENT_LINES texts with one structured output agent run each."""
+    model_client = create_model_client(server.settings())
+    slots = asyncio.Semaphore(8)
+    tokens = server.completion_tokens
+
+    async def classify(text: str) -> None:
+        async with slots:
+            agent = AssistantAgent("assistant", model_client=model_client,
+                                   system_message="Categorize the input as happy, sad, or neutral "
+                                                  "following the JSON format.",
+                                   output_content_type=SentimentResponse)
+            await agent.run(task=text)
+
+    start = time.perf_counter()
+    texts = [text for _, text in read_inputs(path)][:AGENT_LINES]
+    await asyncio.gather(*(classify(text) for text in texts))
+    elapsed = time.perf_counter() - start
+    print(f"  {'agent run per text':<22} items={len(texts):>5} items/s={len(texts) / elapsed:>6.1f} "
+          f"completion tokens/item={(server.completion_tokens - tokens) / len(texts):.1f}")
+
+
+async def run_batch(server: StubOpenAIServer, path: str, output: str, pack_size: int,
+                    limit: int = LINES) -> BatchClassifier:
+    """Classify the first `limit` lines with packs of `pack_size` and print the statistics."""
+    classifier = BatchClassifier(create_model_client(server.settings()), pack_size=pack_size)
+    inputs = (item for item in read_inputs(path) if item[0] <= limit)
+    stats = await classifier.run(inputs, output)
+    print(f"  {f'packs of {pack_size}':<22} {stats.summary()}")
+    return classifier
+
+
+async def main():
+    """
+    Classify the same texts one run per text and in packs, then resume an interrupted run.
+    """
+    async with StubOpenAIServer(ttft=0.3, tokens_per_second=200, responses=answer) as server:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "texts.txt")
+            write_inputs(path)
+            print(f"{LINES} texts, {LINES // 500} of them poisoned")
+            await run_agents(server, path)
+            await run_batch(server, path, os.path.join(directory, "single.jsonl"), 1,
+                            limit=AGENT_LINES)
+            for pack_size in (10, 50):
+                await run_batch(server, path, os.path.join(directory, f"{pack_size}.jsonl"),
+                                pack_size)
+
+            print("interrupted after 2s, then restarted")
+            output = os.path.join(directory, "resumed.jsonl")
+            try:
+                await asyncio.wait_for(run_batch(server, path, output, 10), 2)
+            except asyncio.TimeoutError:
+                with open(output, encoding="utf-8") as file:
+                    print(f"  interrupted with {sum(1 for _ in file)} lines written")
+            await run_batch(server, path, output, 10)
+            with open(output, encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+            errors = [record for record in records if "error" in record]
+            print(f"  {len(records)} lines in the output, {len({r['line'] for r in records})} "
+                  f"distinct, {len(errors)} errors: {errors[0]['error'] if errors else ''}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
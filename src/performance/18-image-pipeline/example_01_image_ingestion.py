@@ -0,0 +1,124 @@
+"""
+Benchmark of image preparation for multimodal messages.
+
+A local directory of generated images, photos saved as large JPEGs and flat
+screenshots saved as PNGs, stands in for remote images and is also served over
+HTTP on localhost. Each image is referenced twice. The images are prepared:
+
+- the way example_02_multimodal_msg.py does: read synchronously, wrapped in
+  ``autogen_core.Image`` at full size, and encoded to PNG and base64 each time a
+  request is built;
+- by :class:`ImagePipeline` from the URLs, at ``auto`` and ``low`` detail, with
+  the repeated images served from its cache;
+- by the same pipeline once more, with every image in the cache.
+
+For each it reports the wall time, the base64 bytes uploaded per request and the
+image tokens of one request (AutoGen sends images at ``auto`` detail, where the
+model downscales large images itself, so only ``low`` saves tokens), and the CPU
+time of building the image parts of a request, which every later turn of a
+conversation carrying the images pays again.
+
+Usage:
+    uv run src/performance/18-image-pipeline/example_01_image_ingestion.py
+"""
+
+import asyncio
+import functools
+import os
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from autogen_core import Image
+from PIL import Image as PILImage
+from PIL import ImageDraw
+
+from autogen_exploration.images import ImagePipeline, vision_tokens
+
+PHOTOS = 4
+SCREENSHOTS = 2
+
+
+def write_images(directory: str) -> List[str]:
+    """Write photo-like JPEGs and screenshot-like PNGs and return their file names."""
+    names = []
+    for number in range(PHOTOS):
+        fractal = PILImage.effect_mandelbrot((3000, 2000), (-2.2 + number * 0.05, -1, 1, 1), 60)
+        noise = PILImage.effect_noise((3000, 2000), 8)
+        photo = PILImage.merge("RGB", (fractal, noise, PILImage.linear_gradient("L").resize(
+            (3000, 2000))))
+        names.append(f"photo_{number}.jpg")
+        photo.save(os.path.join(directory, names[-1]), quality=95)
+    for number in range(SCREENSHOTS):
+        screenshot = PILImage.new("RGB", (1920, 1080), "white")
+        draw = ImageDraw.Draw(screenshot)
+        for row in range(40):
+            draw.rectangle((40, 30 + row * 25, 400 + (row * 97 + number * 31) % 1400, 45 + row * 25),
+                           fill=(30, 30, 30 + row * 5))
+        names.append(f"screenshot_{number}.png")
+        screenshot.save(os.path.join(directory, names[-1]))
+    return names
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """A static file handler that does not log every request."""
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+def serve(directory: str) -> ThreadingHTTPServer:
+    """Serve a directory over HTTP on a free localhost port, in a background thread."""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def request_cost(images: List[Image], detail: str = "auto") -> str:
+    """Build the image parts of one request and describe their bytes and tokens."""
+    payload = sum(len(image.to_openai_format()["image_url"]["url"]) for image in images)
+    tokens = sum(vision_tokens(*image.image.size, detail=detail) for image in images)
+    return f"upload={payload / 1e6:>6.2f}MB tokens={tokens:>6}"
+
+
+def request_cpu(images: List[Image]) -> float:
+    """Return the CPU seconds of building the image parts of one request."""
+    start = time.process_time()
+    for image in images:
+        image.to_openai_format()
+    return time.process_time() - start
+
+
+async def main():
+    """
+    Prepare the same images the example's way and with the pipeline, and compare.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        names = write_images(directory) * 2
+        server = serve(directory)
+        urls = [f"http://127.0.0.1:{server.server_port}/{name}" for name in names]
+        print(f"{len(names)} images ({PHOTOS} photos 3000x2000, {SCREENSHOTS} screenshots "
+              f"1920x1080, each twice)")
+
+        start = time.perf_counter()
+        baseline = [Image(PILImage.open(os.path.join(directory, name))) for name in names]
+        print(f"  {'example_02 (full size)':<24} load={time.perf_counter() - start:>5.2f}s "
+              f"{request_cost(baseline)} cpu/request={request_cpu(baseline):>5.2f}s")
+
+        for detail in ("auto", "low"):
+            pipeline = ImagePipeline(detail=detail)
+            for run in ("cold", "cached"):
+                start = time.perf_counter()
+                images = await pipeline.load_many(urls)
+                elapsed = time.perf_counter() - start
+                print(f"  {f'pipeline {detail}, {run}':<24} load={elapsed:>5.2f}s "
+                      f"{request_cost(images, detail)} cpu/request={request_cpu(images):>5.2f}s")
+            print(f"    {pipeline.stats.summary()}")
+            await pipeline.close()
+        server.shutdown()
+
+
+asyncio.run(main())
@@ -0,0 +1,39 @@
+"""
+A local MCP server over stdio, for the MCP pool benchmark.
+
+Its tools answer at once (``echo``), after a delay (``slow_echo``), or end the
+server process (``crash``), the way a server that died mid-session does.
+
+Usage:
+    uv run src/performance/19-mcp-pool/echo_server.py
+"""
+
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("echo")
+
+
+@server.tool()
+def echo(text: str) -> str:
+    """Return the text unchanged."""
+    return text
+
+
+@server.tool()
+async def slow_echo(text: str, seconds: float) -> str:
+    """Return the text unchanged after a delay."""
+    await asyncio.sleep(seconds)
+    return text
+
+
+@server.tool()
+def crash() -> str:
+    """End the server process without answering."""
+    os._exit(1)
+
+
+if __name__ == "__main__":
+    server.run()
@@ -0,0 +1,89 @@
+"""
+Benchmark of MCP server startup, tool listing and concurrent tool calls.
+
+A local echo MCP server (echo_server.py, started over stdio) is used:
+
+- the way example_05_mcp_workbench.py does, with a new ``McpWorkbench`` for
+  every agent run, which starts a server process, lists its tools and stops it;
+- through a warm :class:`McpServerPool`, where a run only lists the cached tools
+  and calls one;
+- with concurrent slow calls through pools of one and four sessions, to show the
+  calls spread over the server processes;
+- with a call that kills its server, after which the pool restarts the session
+  and the next calls still succeed.
+
+Usage:
+    uv run src/performance/19-mcp-pool/example_01_warm_servers.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from autogen_ext.tools.mcp import McpWorkbench, StdioServerParams
+
+from autogen_exploration.tools.mcp_pool import McpServerPool
+
+RUNS = 10
+CALLS = 16
+CALL_SECONDS = 0.2
+
+echo_server = StdioServerParams(command=sys.executable,
+                                args=[str(Path(__file__).with_name("echo_server.py"))],
+                                read_timeout_seconds=30)
+
+
+async def agent_run(workbench) -> None:
+    """Do what an agent run does with its workbench: list the tools and call one."""
+    await workbench.list_tools()
+    result = await workbench.call_tool("echo", {"text": "hello"})
+    assert not result.is_error, result.to_text()
+
+
+async def main():
+    """
+    Compare a workbench per run with a warm pool, then load and break the pool.
+    """
+    print(f"{RUNS} agent runs, each listing the tools and calling echo")
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        async with McpWorkbench(echo_server) as workbench:
+            await agent_run(workbench)
+    cold = (time.perf_counter() - start) / RUNS
+    print(f"  {'new McpWorkbench per run':<28} per run={cold * 1000:>7.1f}ms")
+
+    pool = McpServerPool(echo_server, size=2)
+    start = time.perf_counter()
+    await pool.start()
+    print(f"  {'pool startup (2 servers)':<28} once   ={(time.perf_counter() - start) * 1000:>7.1f}ms")
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        await agent_run(pool)
+    warm = (time.perf_counter() - start) / RUNS
+    print(f"  {'warm pool':<28} per run={warm * 1000:>7.1f}ms  ({cold / warm:.0f}x)")
+    print(f"  {pool.report()}")
+    await pool.stop()
+
+    print(f"{CALLS} concurrent slow_echo calls ({CALL_SECONDS * 1000:.0f}ms each)")
+    for size in (1, 4):
+        async with McpServerPool(echo_server, size=size) as pool:
+            start = time.perf_counter()
+            await asyncio.gather(*(pool.call_tool("slow_echo", {"text": str(number),
+                                                                "seconds": CALL_SECONDS})
+                                   for number in range(CALLS)))
+            print(f"  size={size} wall={(time.perf_counter() - start) * 1000:>6.0f}ms"
+                  f"  calls per session={pool.report()['calls']}")
+
+    print("A call that kills its server, then more calls")
+    async with McpServerPool(echo_server, size=2) as pool:
+        crashed = await pool.call_tool("crash")
+        print(f"  crash is_error={crashed.is_error}")
+        results = await asyncio.gather(*(pool.call_tool("echo", {"text": str(number)})
+                                         for number in range(CALLS)))
+        await asyncio.sleep(0.5)  # Let the background restart finish.
+        print(f"  {sum(not result.is_error for result in results)}/{CALLS} later calls succeeded,"
+              f" restarts={pool.report()['restarts']}")
+
+
+asyncio.run(main())
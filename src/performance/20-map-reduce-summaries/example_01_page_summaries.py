@@ -0,0 +1,110 @@
+"""
+Benchmark of single-shot and map-reduce summarization of fetched pages.
+
+Local HTML fixtures stand in for fetched Wikipedia pages of three sizes, with
+navigation, scripts and a footer around the article. A local stub server answers
+like a model with a 300ms time to first token, 5000 prompt tokens read per second
+and 100 completion tokens per second. Each page is summarized:
+
+- in one request with the whole page text, the way the fetcher agent of
+  example_05_mcp_workbench.py does;
+- by :class:`DocumentSummarizer` in chunks of 2000 tokens, sixteen requests at
+  a time;
+- by the same summarizer again, as when an unchanged page is fetched again;
+- after one paragraph of the page changed.
+
+Usage:
+    uv run src/performance/20-map-reduce-summaries/example_01_page_summaries.py
+"""
+
+import asyncio
+import hashlib
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Dict
+
+from autogen_core.models import SystemMessage, UserMessage
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.stub_server import StubOpenAIServer, count_tokens
+from autogen_exploration.summarize import DocumentSummarizer, html_to_text
+
+PAGES = {"small": 8, "seattle": 40, "large": 160}  # Sections of about 700 words.
+WORDS = ("city harbor population economy ferry rain coffee software aircraft port lake sound "
+         "neighborhood mountain salmon music university railroad timber census bridge").split()
+SINGLE_SHOT = "Summarize the document."
+
+
+def sentence(rng: random.Random) -> str:
+    """Return a random sentence of 8 to 20 words."""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def fixture(title: str, sections: int, seed: int = 0) -> str:
+    """Build an HTML page shaped like a Wikipedia article."""
+    rng = random.Random(seed)
+    body = []
+    for section in range(sections):
+        body.append(f"<h2>Section {section}</h2>")
+        for _ in range(5):
+            body.append("<p>" + " ".join(sentence(rng) for _ in range(10)) + "</p>")
+    return (f"<html><head><title>{title}</title><script>var config = {{}};</script>"
+            "<style>p { margin: 0 }</style></head><body>"
+            "<nav><ul><li><a href='/'>Main page</a></li><li>Contents</li></ul></nav>"
+            f"<main><h1>{title}</h1>{''.join(body)}</main>"
+            "<footer>Text is available under the Creative Commons license.</footer></body></html>")
+
+
+def answer(body: Dict[str, Any]) -> str:
+    """Stub responder: short chunk summaries, longer merged and single-shot summaries."""
+    instructions, text = (message["content"] for message in body["messages"])
+    length = 60 if instructions.startswith("Summarize this part") else 200
+    # A summary depends on its text, so an edit changes the merges above it too.
+    digest = hashlib.sha256(text.encode()).hexdigest()[:8]
+    return " ".join([digest] + ["summary"] * (length - 1))
+
+
+async def timed(label: str, coroutine: Awaitable[Any], server: StubOpenAIServer) -> Any:
+    """Await a summarization, print its wall time and requests, and return its result."""
+    requests = server.requests
+    start = time.perf_counter()
+    result = await coroutine
+    print(f"  {label:<24} wall={time.perf_counter() - start:>6.2f}s "
+          f"requests={server.requests - requests:>3}")
+    return result
+
+
+async def main():
+    """
+    Summarize each fixture page in one request and with map-reduce.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for name, sections in PAGES.items():
+            Path(directory, f"{name}.html").write_text(fixture(name.title(), sections))
+        async with StubOpenAIServer(ttft=0.3, tokens_per_second=100,
+                                    prefill_tokens_per_second=5000, responses=answer) as server:
+            model_client = create_model_client(server.settings())
+            for name in PAGES:
+                html = Path(directory, f"{name}.html").read_text()
+                text = html_to_text(html)
+                print(f"{name}: {len(html) // 1024} KB of HTML, {count_tokens(text)} tokens of text")
+                single = await timed("single shot", model_client.create(
+                    [SystemMessage(content=SINGLE_SHOT), UserMessage(content=text, source="user")]),
+                    server)
+                print(f"    prompt_tokens={single.usage.prompt_tokens} "
+                      f"completion_tokens={single.usage.completion_tokens}")
+
+                summarizer = DocumentSummarizer(model_client, max_concurrency=16)
+                await timed("map-reduce", summarizer.summarize(html, html=True), server)
+                print(f"    {summarizer.stats.summary()}")
+                await timed("map-reduce, same page", summarizer.summarize(html, html=True), server)
+                edited = html.replace("<p>", "<p>An edited paragraph. ", 1)
+                await timed("map-reduce, 1 paragraph", summarizer.summarize(edited, html=True),
+                            server)
+            await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark of a search tool with and without the tool result cache.
+
+A local stub server answers the first request of every agent run with parallel
+calls to ``search_web_tool`` (a mock search that takes 300ms), the way the
+selector group chat examples look statistics up, then answers in text. Every run
+asks for the same seasons, spelled a little differently, and for a season the
+tool knows nothing about. The runs are made:
+
+- with the plain tool;
+- with the tool decorated by :func:`cached_tool`, whose tool call events carry
+  the outcome of every call, the latency saved and the hit rate.
+
+Usage:
+    uv run src/performance/21-tool-cache/example_01_repeated_searches.py
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.messages import ToolCallExecutionEvent
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.stub_server import StubOpenAIServer, StubReply, StubToolCall
+from autogen_exploration.tools import annotate_tool_events, cached_tool
+
+RUNS = 5
+SEARCH_SECONDS = 0.3
+QUERIES = [["Miami Heat 2006-2007 points", "miami heat  2006-2007 POINTS"],
+           ["Dwayne Wade rebounds 2007-2008", "Dwayne Wade rebounds 2008-2009"],
+           ["Miami Heat 2006-2007 points ", "Dwayne Wade rebounds 2010-2011"]]
+
+
+def search_web_tool(query: str) -> str:
+    """Search the web for basketball statistics."""
+    time.sleep(SEARCH_SECONDS)
+    if "2006-2007" in query:
+        return "Udonis Haslem: 844 points, Dwayne Wade: 1397 points, James Posey: 550 points."
+    if "2007-2008" in query:
+        return "The number of total rebounds for Dwayne Wade in 2007-2008 is 214."
+    if "2008-2009" in query:
+        return "The number of total rebounds for Dwayne Wade in 2008-2009 is 398."
+    return "No data found."
+
+
+cached_search_web_tool = cached_tool(search_web_tool, ttl=600, negative=["No data found."])
+
+
+def search_queries(body: Dict[str, Any]) -> Optional[StubReply]:
+    """Stub responder: search every query of the task at once, then answer."""
+    if body["messages"][-1]["role"] == "tool":
+        return None
+    queries = json.loads(body["messages"][-1]["content"])
+    return StubReply(tool_calls=[StubToolCall("search_web_tool", {"query": query})
+                                 for query in queries])
+
+
+async def run_all(server: StubOpenAIServer, tool, annotate: bool) -> float:
+    """Make every run with a tool, print annotated tool events, and return the wall time."""
+    start = time.perf_counter()
+    for run in range(RUNS):
+        for queries in QUERIES:
+            agent = AssistantAgent("analyst", model_client=create_model_client(server.settings()),
+                                   tools=[tool])
+            stream = agent.run_stream(task=json.dumps(queries))
+            async for message in annotate_tool_events(stream) if annotate else stream:
+                if annotate and run < 2 and isinstance(message, ToolCallExecutionEvent):
+                    print(f"  run {run}: {message.metadata}")
+    return time.perf_counter() - start
+
+
+async def main():
+    """
+    Make the same runs with the plain and the cached search tool.
+    """
+    async with StubOpenAIServer(responses=search_queries) as server:
+        plain = await run_all(server, search_web_tool, annotate=False)
+        print(f"{'plain tool':<12} wall={plain:.2f}s")
+        cached = await run_all(server, cached_search_web_tool, annotate=True)
+        print(f"{'cached tool':<12} wall={cached:.2f}s ({plain / cached:.1f}x)")
+        print(f"  {cached_search_web_tool.cache.stats.summary()}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark of running many tasks on one team and on a pool of cloned teams.
+
+The primary/critic team of example_01_roundrobin_team.py writes a poem, the critic
+asks for one revision and then approves it, so a task takes four model requests.
+A local stub server answers like a model with a 300ms time to first token and 100
+tokens per second. The same tasks are run:
+
+- on the one team, a task at a time with ``team.reset()`` in between, as the
+  example does;
+- on a :class:`TeamPool` of 4 and of 16 clones.
+
+Building and initializing a clone from the component config is also timed against
+resetting a used one.
+
+Usage:
+    uv run src/performance/22-team-pool/example_01_parallel_tasks.py
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.conditions import TextMentionTermination
+from autogen_agentchat.teams import RoundRobinGroupChat
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.stub_server import StubOpenAIServer
+from autogen_exploration.teams import TeamPool
+
+TASKS = 16
+POEM = ("Leaves of amber drift and fall, the maple lets go one by one, "
+        "the evening comes before the call of geese that follow the sun.")
+
+
+def answer(body: Dict[str, Any]) -> str:
+    """Stub responder: a poem from the primary, one revision request, then approval."""
+    messages = body["messages"]
+    if "feedback" not in messages[0]["content"]:
+        return POEM
+    return "APPROVE" if len(messages) > 3 else "Make the second line more vivid."
+
+
+def build_team(model_client):
+    """Build the primary/critic team of the round robin example."""
+    primary_agent = AssistantAgent("primary", model_client=model_client,
+                                   system_message="You are a helpful AI assistant.")
+    critic_agent = AssistantAgent("critic", model_client=model_client,
+                                  system_message="Provide constructive feedback. "
+                                                 "Respond with 'APPROVE' to when your feedbacks are addressed.")
+    return RoundRobinGroupChat([primary_agent, critic_agent],
+                               termination_condition=TextMentionTermination("APPROVE"))
+
+
+async def main():
+    """
+    Run the tasks on one team, then on pools of clones.
+    """
+    tasks = [f"Write a short poem about the fall season, number {number}." for number in range(TASKS)]
+    async with StubOpenAIServer(ttft=0.3, tokens_per_second=100, responses=answer) as server:
+        model_client = create_model_client(server.settings())
+        team = build_team(model_client)
+
+        latencies = []
+        start = time.perf_counter()
+        for task in tasks:
+            task_start = time.perf_counter()
+            await team.run(task=task)
+            latencies.append(time.perf_counter() - task_start)
+            await team.reset()
+        elapsed = time.perf_counter() - start
+        summary = summarize_latencies(latencies)
+        print(f"{'one team, in sequence':<24} tasks/s={TASKS / elapsed:>5.2f} "
+              f"p50={summary['p50_ms']:>5.0f}ms p95={summary['p95_ms']:>5.0f}ms")
+
+        for size in (4, 16):
+            pool = TeamPool(team, size=size)
+            await pool.run_many(tasks)
+            report = pool.stats.summary()
+            print(f"{f'pool of {size}':<24} tasks/s={report['tasks_per_s']:>5.2f} "
+                  f"p50={report['p50_ms']:>5.0f}ms p95={report['p95_ms']:>5.0f}ms "
+                  f"clones={report['clones']} reuses={report['reuses']}")
+
+        # A new clone registers its agents with its runtime on its first reset or run.
+        start = time.perf_counter()
+        for _ in range(100):
+            await pool.clone().reset()
+        built = (time.perf_counter() - start) / 100
+        async with pool.team() as clone:
+            await clone.run(task=tasks[0])
+        start = time.perf_counter()
+        for _ in range(100):
+            await clone.reset()
+        reset = (time.perf_counter() - start) / 100
+        print(f"build and initialize a clone {built * 1000:.2f}ms, "
+              f"reset a used clone {reset * 1000:.2f}ms")
+        await close_shared_clients()
+
+
+asyncio.run(main())
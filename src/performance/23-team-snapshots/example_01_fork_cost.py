@@ -0,0 +1,94 @@
+"""
+Benchmark of forking teams from a snapshot of their state, by thread length.
+
+The primary/critic team of example_01_roundrobin_team.py discusses a poem for
+10, 100 and 500 messages against a local stub server that answers at once, so
+only the cost of the state itself is measured. For each thread length:
+
+- the JSON of ``team.save_state()`` is compared with the size of a
+  :class:`TeamSnapshot`, whose strings are stored once and compressed;
+- capturing the snapshot and forking a team from it are timed;
+- a fork continues for a turn of each agent with a different prompt, and the
+  original team is checked to be unchanged by it.
+
+Re-running the turns of the thread instead of forking costs one model request
+per message; with the 300ms time to first token and 100 tokens per second of the
+other benchmarks, that is printed next to the fork time.
+
+Usage:
+    uv run src/performance/23-team-snapshots/example_01_fork_cost.py
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.teams import RoundRobinGroupChat
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.stub_server import StubOpenAIServer
+from autogen_exploration.teams import TeamSnapshot
+
+LENGTHS = (10, 100, 500)
+FORKS = 20
+# The time a request of the stub below would take with a 300ms time to first token
+# and 100 tokens per second.
+REQUEST_SECONDS = 0.3 + 30 / 100
+
+
+def answer(body: Dict[str, Any]) -> str:
+    """Stub responder: a verse or a remark of about 30 tokens that depends on the turn."""
+    turn = len(body["messages"])
+    return (f"Verse {turn}: leaves of amber drift and fall, the maple lets go one by one, "
+            f"the evening comes before the call of geese that follow the sun.")
+
+
+def build_team(model_client, max_messages: int):
+    """Build the primary/critic team of the round robin example."""
+    primary_agent = AssistantAgent("primary", model_client=model_client,
+                                   system_message="You are a helpful AI assistant.")
+    critic_agent = AssistantAgent("critic", model_client=model_client,
+                                  system_message="Provide constructive feedback. "
+                                                 "Respond with 'APPROVE' to when your feedbacks are addressed.")
+    return RoundRobinGroupChat([primary_agent, critic_agent],
+                               termination_condition=MaxMessageTermination(max_messages))
+
+
+async def main():
+    """
+    Build threads of each length, snapshot them and fork them.
+    """
+    async with StubOpenAIServer(responses=answer) as server:
+        model_client = create_model_client(server.settings())
+        for length in LENGTHS:
+            team = build_team(model_client, length)
+            await team.run(task="Write a short poem about the fall season.")
+            state = await team.save_state()
+            raw = len(json.dumps(state).encode())
+
+            start = time.perf_counter()
+            snapshot = await TeamSnapshot.capture(team)
+            captured = time.perf_counter() - start
+            start = time.perf_counter()
+            await snapshot.fork_many(FORKS)
+            forked = (time.perf_counter() - start) / FORKS
+
+            fork = await snapshot.fork(termination_condition=MaxMessageTermination(3))
+            result = await fork.run(task="Now make it rhyme.")
+            thread = (await fork.save_state())["agent_states"]["RoundRobinGroupChatManager"]
+            unchanged = await team.save_state() == state
+
+            print(f"{length:>4} messages: state={raw / 1024:>7.1f}KB "
+                  f"snapshot={len(snapshot.to_bytes()) / 1024:>6.1f}KB "
+                  f"({raw / len(snapshot.to_bytes()):.0f}x) "
+                  f"capture={captured * 1000:>6.1f}ms fork={forked * 1000:>6.1f}ms "
+                  f"re-run={(length - 1) * REQUEST_SECONDS:>5.0f}s")
+            print(f"      fork continued with {len(result.messages)} messages to a thread of "
+                  f"{len(thread['message_thread'])}, original unchanged: {unchanged}")
+        await close_shared_clients()
+
+
+asyncio.run(main())
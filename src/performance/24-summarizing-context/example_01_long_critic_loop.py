@@ -0,0 +1,106 @@
+"""
+Benchmark of a 30-turn critic loop with the full history and with a summarizing context.
+
+The primary/critic team of the 02-teams examples runs for 30 turns against a
+local stub server that answers like a model with a 300ms time to first token,
+5000 prompt tokens read per second and 100 completion tokens per second: the
+primary sends a new draft of about 150 tokens, and the critic asks for another
+revision. The loop is run:
+
+- with the default model context, which sends the whole conversation every turn;
+- with :class:`SummarizingChatCompletionContext`, which sends the last 6 messages
+  and a summary of the rest, updated in the background, within 2000 tokens.
+
+The prompt tokens and the latency of each turn are printed, then the totals,
+which include the summary requests.
+
+Usage:
+    uv run src/performance/24-summarizing-context/example_01_long_critic_loop.py
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.teams import RoundRobinGroupChat
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.context import SummarizingChatCompletionContext
+from autogen_exploration.metrics import summarize_latencies
+from autogen_exploration.stub_server import StubOpenAIServer
+
+TURNS = 30
+DRAFT = ("Crimson leaves drift down in the cooling air, the orchard hums with the last bees "
+         "of the year, and the light turns amber over the quiet fields. ") * 4
+
+
+def answer(body: Dict[str, Any]) -> str:
+    """Stub responder: drafts from the primary, feedback from the critic, and summaries."""
+    instructions = body["messages"][0]["content"]
+    if instructions.startswith("You maintain a running summary"):
+        return "The primary drafts a fall poem; the critic asks for sharper imagery. " * 10
+    if instructions.startswith("Provide constructive feedback"):
+        return "The imagery is vague in the second stanza; make the orchard more concrete."
+    return DRAFT
+
+
+def build_team(model_client, summarize: bool) -> Tuple[RoundRobinGroupChat, List[Any]]:
+    """Build the primary/critic team, with summarizing contexts if asked, and return the contexts."""
+    contexts = [SummarizingChatCompletionContext(model_client, keep_turns=6, max_tokens=2000)
+                if summarize else None for _ in range(2)]
+    primary_agent = AssistantAgent("primary", model_client=model_client,
+                                   system_message="You are a helpful AI assistant.",
+                                   model_context=contexts[0])
+    critic_agent = AssistantAgent("critic", model_client=model_client,
+                                  system_message="Provide constructive feedback. "
+                                                 "Respond with 'APPROVE' to when your feedbacks are addressed.",
+                                  model_context=contexts[1])
+    team = RoundRobinGroupChat([primary_agent, critic_agent],
+                               termination_condition=MaxMessageTermination(TURNS + 1))
+    return team, [context for context in contexts if context is not None]
+
+
+async def run_loop(server: StubOpenAIServer, summarize: bool) -> None:
+    """Run the loop and print the prompt tokens and latency of its turns."""
+    team, contexts = build_team(create_model_client(server.settings()), summarize)
+    prompt_tokens: List[int] = []
+    latencies: List[float] = []
+    requests = server.requests
+    start = last = time.perf_counter()
+    async for message in team.run_stream(task="Write a short poem about the fall season."):
+        if isinstance(message, TaskResult) or message.models_usage is None:
+            continue
+        now = time.perf_counter()
+        prompt_tokens.append(message.models_usage.prompt_tokens)
+        latencies.append(now - last)
+        last = now
+    elapsed = time.perf_counter() - start
+    print(f"{'summarizing context' if summarize else 'full history'}:")
+    for turn in range(0, TURNS, 5):
+        print(f"  turn {turn + 1:>2} prompt_tokens={prompt_tokens[turn]:>5} "
+              f"latency={latencies[turn] * 1000:>5.0f}ms")
+    summary = summarize_latencies(latencies)
+    summary_tokens = sum(context.stats.summary_prompt_tokens + context.stats.summary_completion_tokens
+                         for context in contexts)
+    print(f"  wall={elapsed:.2f}s requests={server.requests - requests} "
+          f"p50={summary['p50_ms']:.0f}ms p95={summary['p95_ms']:.0f}ms "
+          f"turn_prompt_tokens={sum(prompt_tokens)} summary_tokens={summary_tokens}")
+    for context in contexts:
+        print(f"  {context.stats.summary()}")
+
+
+async def main():
+    """
+    Run the critic loop with the full history, then with summarizing contexts.
+    """
+    async with StubOpenAIServer(ttft=0.3, tokens_per_second=100, prefill_tokens_per_second=5000,
+                                responses=answer) as server:
+        await run_loop(server, summarize=False)
+        await run_loop(server, summarize=True)
+        await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Benchmark of stopping a streamed completion at "APPROVE" against waiting for the whole message.
+
+The primary/critic team of example_01_roundrobin_team.py streams its messages
+with ``model_client_stream=True`` against a local stub server that answers like a
+model with a 300ms time to first token and 100 tokens per second. The primary
+writes a poem, the critic asks for one revision, then approves it and, like many
+models, goes on to explain its approval for a couple of hundred tokens. The task
+is run:
+
+- with ``TextMentionTermination("APPROVE")``, which sees the approval once the
+  whole message has streamed;
+- with :class:`StopPhraseTermination`, whose client stops the critic's request
+  as soon as "APPROVE" streams.
+
+For each, the wall time, the completion tokens the server generated, the
+streams it saw closed early and the stop reason of the ``TaskResult`` are printed.
+
+Usage:
+    uv run src/performance/25-stop-phrases/example_01_early_approval.py
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.conditions import TextMentionTermination
+from autogen_agentchat.teams import RoundRobinGroupChat
+
+from autogen_exploration.clients import close_shared_clients, create_model_client
+from autogen_exploration.stopping import StopPhraseTermination
+from autogen_exploration.stub_server import StubOpenAIServer
+
+RUNS = 3
+POEM = ("Leaves of amber drift and fall, the maple lets go one by one, "
+        "the evening comes before the call of geese that follow the sun.")
+EXPLANATION = ("The revision addresses the feedback: the imagery of the second line is now "
+               "concrete, the rhythm is steady and the closing image ties the poem together. ") * 6
+
+
+def answer(body: Dict[str, Any]) -> str:
+    """Stub responder: a poem from the primary, one revision request, then a long approval."""
+    messages = body["messages"]
+    if "feedback" not in messages[0]["content"]:
+        return POEM
+    if len(messages) > 3:
+        return f"APPROVE. {EXPLANATION}"
+    return "Make the second line more vivid."
+
+
+async def run_task(server: StubOpenAIServer, early: bool) -> None:
+    """Run the task a few times with one termination condition and print what it cost."""
+    model_client = create_model_client(server.settings())
+    termination = (StopPhraseTermination("APPROVE", sources=["critic"]) if early
+                   else TextMentionTermination("APPROVE", sources=["critic"]))
+    primary_agent = AssistantAgent("primary", model_client=model_client, model_client_stream=True,
+                                   system_message="You are a helpful AI assistant.")
+    critic_agent = AssistantAgent(
+        "critic",
+        model_client=termination.wrap(model_client) if early else model_client,
+        model_client_stream=True,
+        system_message="Provide constructive feedback. "
+                       "Respond with 'APPROVE' to when your feedbacks are addressed.",
+    )
+    team = RoundRobinGroupChat([primary_agent, critic_agent], termination_condition=termination)
+    tokens, cancelled = server.completion_tokens, server.cancelled
+    start = time.perf_counter()
+    result = None
+    for _ in range(RUNS):
+        await team.reset()
+        async for message in team.run_stream(task="Write a short poem about the fall season."):
+            if isinstance(message, TaskResult):
+                result = message
+    elapsed = (time.perf_counter() - start) / RUNS
+    # The server notices a closed stream on its next write.
+    await asyncio.sleep(0.1)
+    print(f"{'stop phrase' if early else 'text mention':<14} wall={elapsed:.2f}s "
+          f"completion_tokens={(server.completion_tokens - tokens) / RUNS:.0f} "
+          f"cancelled={(server.cancelled - cancelled) / RUNS:.0f} "
+          f"stop_reason={result.stop_reason!r} last={result.messages[-1].to_text()[:40]!r}")
+
+
+async def main():
+    """
+    Run the task with the text mention condition, then with the stop phrase condition.
+    """
+    async with StubOpenAIServer(ttft=0.3, tokens_per_second=100, responses=answer) as server:
+        await run_task(server, early=False)
+        await run_task(server, early=True)
+        await close_shared_clients()
+
+
+asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Tests of :class:`SingleFlightChatCompletionClient` against the local stub server.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Union
+
+import httpx
+import openai
+import pytest
+from autogen_core import CancellationToken
+from autogen_core.models import CreateResult, UserMessage
+
+from autogen_exploration.clients import create_model_client
+from autogen_exploration.models import SingleFlightChatCompletionClient
+from autogen_exploration.stub_server import StubOpenAIServer
+
+CALLERS = 100
+MESSAGES = [UserMessage(content="What is the capital of France?", source="user")]
+
+
+def run_with_server(test: Callable[[StubOpenAIServer, SingleFlightChatCompletionClient], Awaitable[None]],
+                    **server_args: Any) -> None:
+    """Run a test against a fresh stub server and a single-flight client without retries."""
+    async def main() -> None:
+        async with StubOpenAIServer(**server_args) as server, httpx.AsyncClient() as http_client:
+            client = SingleFlightChatCompletionClient(
+                create_model_client(server.settings(), http_client=http_client, max_retries=0))
+            await test(server, client)
+
+    asyncio.run(main())
+
+
+def test_concurrent_duplicates_send_one_request() -> None:
+    async def test(server: StubOpenAIServer, client: SingleFlightChatCompletionClient) -> None:
+        results = await asyncio.gather(*(client.create(MESSAGES) for _ in range(CALLERS)))
+        assert server.requests == 1
+        assert client.stats.upstream_requests == 1
+        assert client.stats.coalesced_requests == CALLERS - 1
+        assert {result.content for result in results} == {"Paris is the capital of France."}
+        # Every caller gets its own result.
+        assert len({id(result) for result in results}) == CALLERS
+
+    run_with_server(test, ttft=0.2)
+
+
+def test_cancelled_first_caller_detaches_only_itself() -> None:
+    async def test(server: StubOpenAIServer, client: SingleFlightChatCompletionClient) -> None:
+        token = CancellationToken()
+        first = asyncio.ensure_future(client.create(MESSAGES, cancellation_token=token))
+        await asyncio.sleep(0.05)
+        others = [asyncio.ensure_future(client.create(MESSAGES)) for _ in range(CALLERS - 1)]
+        await asyncio.sleep(0.05)
+        token.cancel()
+        results = await asyncio.gather(*others)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert server.requests == 1
+        assert all(result.content == "Paris is the capital of France." for result in results)
+
+    run_with_server(test, ttft=0.3)
+
+
+def test_upstream_error_reaches_every_caller() -> None:
+    async def test(server: StubOpenAIServer, client: SingleFlightChatCompletionClient) -> None:
+        results = await asyncio.gather(*(client.create(MESSAGES) for _ in range(CALLERS)),
+                                       return_exceptions=True)
+        assert server.requests == 1
+        assert all(isinstance(result, openai.InternalServerError) for result in results)
+
+    run_with_server(test, ttft=0.2, error_rate=1.0)
+
+
+def test_stream_fans_out_to_every_subscriber() -> None:
+    async def collect(client: SingleFlightChatCompletionClient) -> List[Union[str, CreateResult]]:
+        return [item async for item in client.create_stream(MESSAGES)]
+
+    async def test(server: StubOpenAIServer, client: SingleFlightChatCompletionClient) -> None:
+        first = asyncio.ensure_future(collect(client))
+        # A subscriber that joins after the first chunks arrived gets them replayed.
+        await asyncio.sleep(0.3)
+        streams = [first, *(asyncio.ensure_future(collect(client)) for _ in range(CALLERS - 1))]
+        items = await asyncio.gather(*streams)
+        assert server.requests == 1
+        assert client.stats.coalesced_requests == CALLERS - 1
+        chunks = [[item for item in stream if isinstance(item, str)] for stream in items]
+        assert len(chunks[0]) > 1
+        assert all(stream == chunks[0] for stream in chunks)
+        assert all(isinstance(stream[-1], CreateResult) for stream in items)
+        assert "".join(chunks[0]) == "Paris is the capital of France."
+
+    run_with_server(test, ttft=0.1, tokens_per_second=20)